@@ -0,0 +1,269 @@
+# File: benchmarks/fakes.py
+"""
+In-process stand-ins for the services the function apps call, for load
+tests that must not reach Azure OpenAI, GitHub or Table Storage:
+
+  FakeOpenAI   - chat.completions.create with scripted replies: the last
+                 user message is looked up in `script`, which maps it to
+                 reply text or to tool calls [(name, args)]
+  FakeGitHub   - the contents and Git Data APIs of one repository, with
+                 ETags, 409 on a stale blob SHA and 422 on a ref update
+                 that is not a fast-forward
+  FakeTable    - an Azure Table client with ETag match conditions
+
+Each waits a random latency around its configured mean before answering.
+install() puts them behind the shared client getters in config.clients,
+so the app code runs unchanged:
+
+    install(FakeOpenAI(script), FakeGitHub({"index.html": html}), FakeTable())
+"""
+import json
+import base64
+import asyncio
+import hashlib
+import random
+from types import SimpleNamespace as NS
+
+
+async def _delay(mean: float) -> None:
+    if mean > 0:
+        await asyncio.sleep(random.uniform(0.5, 1.5) * mean)
+
+
+def _blob_sha(text: str) -> str:
+    data = text.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class FakeOpenAI:
+    """
+    Azure OpenAI chat completions. A turn whose last message is a tool or
+    function result gets a short wrap-up; anything not in `script` gets
+    plain text.
+    """
+
+    def __init__(self, script: dict | None = None, latency: float = 0.0):
+        self.script = dict(script or {})
+        self.latency = latency
+        self.calls = 0
+        self.chat = NS(completions=NS(create=self._create))
+
+    def _reply(self, kwargs: dict):
+        messages = kwargs["messages"]
+        if messages[-1]["role"] in ("tool", "function"):
+            return "Done."
+        if "tools" not in kwargs and "functions" not in kwargs:
+            return "OK."
+        return self.script.get(messages[-1]["content"], "OK.")
+
+    async def _create(self, **kwargs):
+        self.calls += 1
+        await _delay(self.latency)
+        reply = self._reply(kwargs)
+        usage = NS(prompt_tokens=sum(len(json.dumps(m)) for m in kwargs["messages"]) // 4,
+                   completion_tokens=20, total_tokens=0)
+        usage.total_tokens = usage.prompt_tokens + usage.completion_tokens
+        if isinstance(reply, str):
+            message = NS(content=reply, tool_calls=None, function_call=None)
+            finish = "stop"
+        elif "functions" in kwargs:
+            name, args = reply[0]
+            message = NS(content=None, tool_calls=None, function_call=NS(name=name, arguments=json.dumps(args)))
+            finish = "function_call"
+        else:
+            calls = [
+                NS(id=f"call_{self.calls}_{i}", type="function", function=NS(name=name, arguments=json.dumps(args)))
+                for i, (name, args) in enumerate(reply)
+            ]
+            message = NS(content=None, tool_calls=calls, function_call=None)
+            finish = "tool_calls"
+        return NS(choices=[NS(message=message, finish_reason=finish)], usage=usage)
+
+
+class _Response:
+    def __init__(self, status: int, data: dict | None = None, headers: dict | None = None, latency: float = 0.0):
+        self.status = status
+        self.headers = {"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "5000", **(headers or {})}
+        self._data = data
+        self._latency = latency
+
+    async def __aenter__(self):
+        await _delay(self._latency)
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self, content_type=None):
+        return self._data
+
+    async def text(self):
+        return json.dumps(self._data)
+
+
+class FakeGitHub:
+    """
+    One repository on one branch, served the way github_client.request
+    calls aiohttp: request(method, url, params=, json=, headers=, timeout=).
+    Every commit is recorded in `commits`, every call as (method, path,
+    params) in `requests`.
+    """
+    closed = False
+
+    def __init__(self, files: dict[str, str], latency: float = 0.0):
+        self.latency = latency
+        self.trees: dict[str, dict[str, str]] = {"tree0": dict(files)}
+        self.parents: dict[str, tuple[str, str | None]] = {"commit0": ("tree0", None)}  # commit -> (tree, parent)
+        self.head = "commit0"
+        self.commits: list[str] = []
+        self.requests: list[tuple] = []
+        self.conflicts = 0
+
+    @property
+    def files(self) -> dict[str, str]:
+        return self.trees[self.parents[self.head][0]]
+
+    def _advance(self, files: dict[str, str], parent: str) -> str:
+        number = len(self.parents)
+        tree, commit = f"tree{number}", f"commit{number}"
+        self.trees[tree] = files
+        self.parents[commit] = (tree, parent)
+        return commit
+
+    def _move(self, commit: str) -> None:
+        self.head = commit
+        self.commits.append(commit)
+
+    def request(self, method: str, url: str, params=None, json=None, headers=None, timeout=None) -> _Response:
+        path = url.split("/repos/", 1)[1].split("/", 2)[2]
+        self.requests.append((method, path, params))
+        status, data, extra = self._handle(method, path, json or {}, headers or {})
+        return _Response(status, data, extra, self.latency)
+
+    def _handle(self, method: str, path: str, body: dict, headers: dict):
+        if path.startswith("contents/"):
+            return self._contents(method, path[len("contents/"):], body, headers)
+        if method == "GET" and path.startswith("git/ref/heads/"):
+            return 200, {"object": {"sha": self.head}}, None
+        if method == "GET" and path.startswith("git/commits/"):
+            return 200, {"tree": {"sha": self.parents[path.rsplit("/", 1)[1]][0]}}, None
+        if method == "GET" and path.startswith("git/trees/"):
+            return 200, {"tree": self._listing(path[len("git/trees/"):])}, None
+        if method == "POST" and path == "git/trees":
+            files = dict(self.trees[body["base_tree"]])
+            files.update((entry["path"], entry["content"]) for entry in body["tree"])
+            number = len(self.trees)
+            self.trees[f"tree{number}"] = files
+            return 201, {"sha": f"tree{number}"}, None
+        if method == "POST" and path == "git/commits":
+            number = len(self.parents)
+            self.parents[f"commit{number}"] = (body["tree"], body["parents"][0])
+            return 201, {"sha": f"commit{number}", "html_url": f"fake://commits/{number}"}, None
+        if method == "PATCH" and path.startswith("git/refs/heads/"):
+            if self.parents[body["sha"]][1] != self.head:
+                self.conflicts += 1
+                return 422, {"message": "Update is not a fast forward"}, None
+            self._move(body["sha"])
+            return 200, {"object": {"sha": body["sha"]}}, None
+        return 404, {"message": "Not Found"}, None
+
+    def _listing(self, sha: str) -> list[dict]:
+        # one directory of a tree, like the API without ?recursive: a
+        # subdirectory is listed as a "tree" entry whose sha is "<tree>:<dir>"
+        tree, _, directory = sha.partition(":")
+        prefix = directory + "/" if directory else ""
+        entries = {}
+        for file, content in self.trees[tree].items():
+            if not file.startswith(prefix):
+                continue
+            name, _, rest = file[len(prefix):].partition("/")
+            if rest:
+                entries[name] = {"path": name, "type": "tree", "sha": f"{tree}:{prefix}{name}"}
+            else:
+                entries[name] = {"path": name, "type": "blob", "sha": _blob_sha(content)}
+        return list(entries.values())
+
+    def _contents(self, method: str, file: str, body: dict, headers: dict):
+        current = self.files.get(file)
+        sha = _blob_sha(current) if current is not None else None
+        if method == "GET":
+            if current is None:
+                return 404, {"message": "Not Found"}, None
+            etag = f'"{sha}"'
+            if headers.get("If-None-Match") == etag:
+                return 304, None, {"ETag": etag}
+            content = base64.b64encode(current.encode("utf-8")).decode("ascii")
+            return 200, {"path": file, "sha": sha, "content": content}, {"ETag": etag}
+        if method == "PUT":
+            if body.get("sha") != sha:
+                self.conflicts += 1
+                return 409, {"message": f"{file} does not match {body.get('sha')}"}, None
+            text = base64.b64decode(body["content"]).decode("utf-8")
+            commit = self._advance({**self.files, file: text}, self.head)
+            self._move(commit)
+            return 200, {
+                "content": {"path": file, "sha": _blob_sha(text), "html_url": f"fake://{file}"},
+                "commit":  {"sha": commit, "html_url": f"fake://commits/{commit}"},
+            }, None
+        return 405, {"message": "Method Not Allowed"}, None
+
+
+class _Entity(dict):
+    def __init__(self, props: dict, etag: str):
+        super().__init__(props)
+        self.metadata = {"etag": etag}
+
+
+class FakeTable:
+    """An Azure Table client (async) keyed by (PartitionKey, RowKey)."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.rows: dict[tuple[str, str], tuple[dict, str]] = {}
+        self._version = 0
+
+    def _etag(self) -> str:
+        self._version += 1
+        return f'W/"{self._version}"'
+
+    async def get_entity(self, partition_key: str, row_key: str, **kwargs) -> _Entity:
+        from azure.core.exceptions import ResourceNotFoundError
+        await _delay(self.latency)
+        row = self.rows.get((partition_key, row_key))
+        if row is None:
+            raise ResourceNotFoundError("The specified resource does not exist.")
+        return _Entity(*row)
+
+    async def create_entity(self, entity: dict, **kwargs) -> dict:
+        from azure.core.exceptions import ResourceExistsError
+        await _delay(self.latency)
+        key = (entity["PartitionKey"], entity["RowKey"])
+        if key in self.rows:
+            raise ResourceExistsError("The specified entity already exists.")
+        self.rows[key] = (dict(entity), self._etag())
+        return {"etag": self.rows[key][1]}
+
+    async def update_entity(self, entity: dict, mode=None, etag: str | None = None, match_condition=None, **kwargs) -> dict:
+        from azure.core.exceptions import ResourceModifiedError, ResourceNotFoundError
+        await _delay(self.latency)
+        key = (entity["PartitionKey"], entity["RowKey"])
+        row = self.rows.get(key)
+        if row is None:
+            raise ResourceNotFoundError("The specified resource does not exist.")
+        if etag is not None and row[1] != etag:
+            raise ResourceModifiedError("The update condition specified in the request was not satisfied.")
+        self.rows[key] = (dict(entity), self._etag())
+        return {"etag": self.rows[key][1]}
+
+    async def delete_entity(self, partition_key: str, row_key: str, **kwargs) -> None:
+        await _delay(self.latency)
+        self.rows.pop((partition_key, row_key), None)
+
+
+def install(openai: FakeOpenAI, github: FakeGitHub, table: FakeTable, table_name: str = "CopilotSessions") -> None:
+    """Serves the shared clients of config.clients from the fakes. Call from the running event loop."""
+    import config.clients as clients
+    clients._openai_client = openai
+    clients._http_session = github
+    clients._http_loop = asyncio.get_running_loop()
+    clients._table_clients[table_name] = table
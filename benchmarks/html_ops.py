@@ -0,0 +1,154 @@
+# File: benchmarks/html_ops.py
+"""
+Benchmarks the html_parser edit operations and the commit prettify step on
+synthetic portfolios of several sizes, and checks them against stored
+baselines.
+
+For each operation and size it records:
+  ms          best-of-N wall time
+  alloc_kib   memory still allocated after the operation (tracemalloc)
+  peak_kib    peak traced memory while it ran
+
+update_* are measured cold (index built on the call, as for a freshly
+fetched page) and warm (index already cached for the document version).
+
+Run from the repo root:
+  python -m benchmarks.html_ops                  # print results
+  python -m benchmarks.html_ops --update         # rewrite baselines.json
+  python -m benchmarks.html_ops --check          # exit 1 on a regression
+
+Baselines are machine-specific; refresh them with --update when moving
+to a different machine.
+"""
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.synthetic import generate_portfolio
+from update_content import doc_cache
+from update_content.github_helper import get_formatter
+from update_content.html_parser import (
+    parse_html, index_for, insert_project, insert_experience, update_project, update_experience,
+)
+
+BASELINES = Path(__file__).with_name("baselines.json")
+DEFAULT_SIZES = (50, 250, 1000)
+
+# Absolute differences below these never count as regressions
+NOISE_FLOOR = {"ms": 5.0, "peak_kib": 64.0}
+
+PROJECT = {"title": "Benchmark Project", "description": "Added by the benchmark.", "technologies": ["Python"]}
+EXPERIENCE = {
+    "role": "Benchmark Engineer", "company": "Bench Co", "start_date": "2024",
+    "description": "Added by the benchmark.", "environment": ["Python"],
+}
+
+
+def _warm(soup):
+    """Registers `soup` in the document cache and builds its index, as edit_document does."""
+    doc_cache.invalidate("bench.html")
+    doc_cache.store("bench.html", "bench", "", soup=soup)
+    index_for(soup)
+    return soup
+
+
+def operations(n: int) -> dict:
+    """name -> (setup(soup) -> soup, op(soup)); the middle item is the update target."""
+    mid = n // 2
+    upd_project = {"title": f"Project {mid}", "technologies": ["Rust", "Go"]}
+    upd_experience = {"role": f"Engineer {mid}", "company": f"Company {mid}", "end_date": "Present"}
+    cold = lambda soup: soup
+    return {
+        "insert_project":         (cold,  lambda soup: insert_project(soup, PROJECT)),
+        "insert_experience":      (cold,  lambda soup: insert_experience(soup, EXPERIENCE)),
+        "update_project":         (cold,  lambda soup: update_project(soup, upd_project)),
+        "update_project_warm":    (_warm, lambda soup: update_project(soup, upd_project)),
+        "update_experience":      (cold,  lambda soup: update_experience(soup, upd_experience)),
+        "update_experience_warm": (_warm, lambda soup: update_experience(soup, upd_experience)),
+        "prettify":               (cold,  lambda soup: soup.prettify(formatter=get_formatter())),
+    }
+
+
+def measure(html: str, setup, op, repeats: int) -> dict:
+    best = float("inf")
+    for _ in range(repeats):
+        soup = setup(parse_html(html))
+        start = time.perf_counter()
+        op(soup)
+        best = min(best, time.perf_counter() - start)
+
+    soup = setup(parse_html(html))
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    op(soup)
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    doc_cache.invalidate("bench.html")
+    return {
+        "ms":        round(best * 1000, 3),
+        "alloc_kib": round((after - before) / 1024, 1),
+        "peak_kib":  round((peak - before) / 1024, 1),
+    }
+
+
+def run(sizes, repeats: int) -> dict:
+    results = {}
+    for n in sizes:
+        html = generate_portfolio(n)
+        for name, (setup, op) in operations(n).items():
+            results[f"{name}@{n}"] = measure(html, setup, op, repeats)
+    return results
+
+
+def check(results: dict, baselines: dict, tolerance: float) -> list[str]:
+    """Returns a message per metric that regressed by more than `tolerance`."""
+    failures = []
+    for key, result in results.items():
+        base = baselines.get(key)
+        if base is None:
+            continue
+        for metric in ("ms", "peak_kib"):
+            limit = base[metric] * (1 + tolerance)
+            # ignore noise on operations too small to measure reliably
+            if result[metric] > limit and result[metric] - base[metric] > NOISE_FLOOR[metric]:
+                failures.append(f"{key} {metric}: {result[metric]} > {base[metric]} (+{tolerance:.0%})")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)))
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=1.0, help="allowed slowdown before --check fails")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--check", action="store_true")
+    mode.add_argument("--update", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run([int(s) for s in args.sizes.split(",")], args.repeats)
+    print(f"{'operation':<32}{'ms':>10}{'alloc KiB':>12}{'peak KiB':>12}")
+    for key, r in results.items():
+        print(f"{key:<32}{r['ms']:>10.3f}{r['alloc_kib']:>12.1f}{r['peak_kib']:>12.1f}")
+
+    if args.update:
+        BASELINES.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"baselines written to {BASELINES}")
+    elif args.check:
+        if not BASELINES.exists():
+            print("no baselines.json; run with --update first")
+            return 1
+        failures = check(results, json.loads(BASELINES.read_text()), args.tolerance)
+        for failure in failures:
+            print("REGRESSION", failure)
+        if failures:
+            return 1
+        print("no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+# File: benchmarks/import_time.py
+"""
+Measures the cold-start import cost of the function apps.
+
+Each entry module is imported in a fresh interpreter with -X importtime.
+The script reports the cumulative import time and checks that the heavy
+client libraries, which are only needed once a request reaches them, were
+not loaded at import.
+
+Run from the repo root (the function settings must be set, as for the host):
+  python -m benchmarks.import_time
+  python -m benchmarks.import_time --check       # exit 1 on a regression
+"""
+import re
+import sys
+import argparse
+import subprocess
+
+ENTRY_MODULES = ("copilot", "update_content")
+
+# Imported on first use by config.clients, html_parser and github_helper
+DEFERRED = ("openai", "aiohttp", "bs4", "azure.data.tables", "azure.core")
+
+_LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile(module: str) -> tuple[float, list[str]]:
+    """Imports `module` in a new interpreter; returns (cumulative ms, every module loaded)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{proc.stderr[-2000:]}")
+    total_us, loaded = 0, []
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, name = match.groups()
+        loaded.append(name)
+        if name == module and len(indent) == 1:
+            total_us = int(cumulative)
+    return total_us / 1000, loaded
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--budget-ms", type=float, default=500.0, help="per-module import budget for --check")
+    args = parser.parse_args(argv)
+
+    failures = []
+    for module in ENTRY_MODULES:
+        ms, loaded = profile(module)
+        eager = sorted({d for d in DEFERRED for name in loaded if name == d or name.startswith(d + ".")})
+        print(f"{module:<16}{ms:>10.1f} ms   eager heavy imports: {', '.join(eager) or 'none'}")
+        if eager:
+            failures.append(f"{module} imports {', '.join(eager)} at startup")
+        if ms > args.budget_ms:
+            failures.append(f"{module} took {ms:.1f} ms to import (budget {args.budget_ms:.0f} ms)")
+
+    if args.check:
+        for failure in failures:
+            print("REGRESSION", failure)
+        if failures:
+            return 1
+        print("no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+# File: benchmarks/load_test.py
+"""
+Load test of the copilot and update_content entry points against the
+in-process fakes in benchmarks/fakes.py (no Azure OpenAI, GitHub or Table
+Storage is contacted).
+
+Each of --users virtual users runs --turns turns one after another, all
+users at once, on a synthetic page of --items projects and experience
+entries. A turn is one of:
+
+  fast     - "set the end date of Engineer N at Company N to <year>",
+             handled by the fast path without a model call
+  edit     - a description change the scripted model turns into update_project
+  search   - a question the scripted model answers with search_portfolio
+  chat     - a plain question the model answers with text
+  add      - an add_project request through update_content
+
+Every request is timed by the app's own telemetry; the harness collects
+the "metrics" log lines and reports throughput and p50/p95/p99 latency of
+each request type and pipeline stage. Afterwards the final page must hold
+every user's last description and every added project.
+
+Run from the repo root:  python -m benchmarks.load_test [--users 20] [--turns 5] ...
+Exits non-zero if a request failed or an edit was lost.
+"""
+import os
+
+# The fakes stand in for every service, but the apps check their settings on import
+for _name, _value in (
+    ("AZURE_OPENAI_KEY", "load-test"),
+    ("GITHUB_TOKEN", "load-test"),
+    ("AZURE_STORAGE_CONNECTION_STRING", "DefaultEndpointsProtocol=https;AccountName=loadtest;AccountKey=bG9hZA==;EndpointSuffix=core.windows.net"),
+):
+    os.environ.setdefault(_name, _value)
+
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+from collections import Counter, defaultdict
+
+import azure.functions as func
+import copilot
+import update_content
+from copilot import session_manager
+from benchmarks.fakes import FakeOpenAI, FakeGitHub, FakeTable, install
+from benchmarks.synthetic import generate_portfolio
+from update_content.portfolio_model import extract
+from update_content.html_parser import parse_html
+
+KINDS = {"fast": 3, "edit": 3, "search": 1, "chat": 2, "add": 1}
+
+
+class MetricsCollector(logging.Handler):
+    """Keeps the per-request metrics the apps log through telemetry."""
+
+    def __init__(self):
+        super().__init__(logging.INFO)
+        self.requests: list[dict] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        message = record.getMessage()
+        if message.startswith("metrics "):
+            self.requests.append(json.loads(message[len("metrics "):]))
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+
+def _http(body: dict) -> func.HttpRequest:
+    return func.HttpRequest(method="POST", url="/api/load-test", headers={"Content-Type": "application/json"},
+                            body=json.dumps(body).encode("utf-8"))
+
+
+class Workload:
+    """Generates the turns of every user and what the final page must contain."""
+
+    def __init__(self, openai: FakeOpenAI, items: int, seed: int):
+        self.openai = openai
+        self.items = items
+        self.random = random.Random(seed)
+        self.descriptions: dict[str, str] = {}   # project title -> last description set
+        self.added: set[str] = set()
+
+    def turn(self, user: int, t: int) -> tuple[str, str, dict]:
+        """(kind, endpoint, body) of turn `t` of `user`."""
+        kind = self.random.choices(list(KINDS), weights=list(KINDS.values()))[0]
+        n = user % self.items
+        user_id = f"load-user-{user}"
+        if kind == "fast":
+            message = f"set the end date of Engineer {n} at Company {n} to {2000 + t}"
+        elif kind == "edit":
+            title, description = f"Project {n}", f"Load test description {user}-{t}"
+            message = f"Please change what {title} says to: {description}"
+            self.openai.script[message] = [("update_project", {"project": {"title": title, "description": description}})]
+            self.descriptions[title] = description
+        elif kind == "search":
+            technology = self.random.choice(["python", "rust", "docker"])
+            message = f"Which of my projects use {technology}?"
+            self.openai.script[message] = [("search_portfolio", {"query": technology, "kind": "project"})]
+        elif kind == "chat":
+            message = "How many projects are on my page?"
+            self.openai.script[message] = f"There are {self.items} projects on your page."
+        else:
+            title = f"Load Project {user}-{t}"
+            message = f"Add a project called {title}"
+            self.openai.script[message] = [("add_project", {"project": {
+                "title": title, "description": "Added by the load test.", "technologies": ["Python"],
+            }})]
+            self.added.add(title)
+            return kind, "update_content", {"messages": [{"role": "user", "content": message}]}
+        return kind, "copilot", {"user_id": user_id, "message": message}
+
+    def lost_edits(self, html: str) -> list[str]:
+        model = extract(parse_html(html))
+        found = {project.title: project.description for project in model.projects}
+        lost = [f"{title}: expected '{text}'" for title, text in self.descriptions.items()
+                if not found.get(title, "").startswith(text)]
+        lost += [f"{title}: missing" for title in sorted(self.added - found.keys())]
+        return lost
+
+
+async def run(args) -> int:
+    html = generate_portfolio(args.items)
+    openai = FakeOpenAI(latency=args.openai_ms / 1000)
+    github = FakeGitHub({"index.html": html}, latency=args.github_ms / 1000)
+    table = FakeTable(latency=args.table_ms / 1000)
+    install(openai, github, table)
+    workload = Workload(openai, args.items, args.seed)
+    endpoints = {"copilot": copilot.main, "update_content": update_content.main}
+    statuses: Counter = Counter()
+
+    async def user(u: int) -> None:
+        for t in range(args.turns):
+            kind, endpoint, body = workload.turn(u, t)
+            resp = await endpoints[endpoint](_http(body))
+            statuses[(kind, resp.status_code)] += 1
+
+    collector = MetricsCollector()
+    root = logging.getLogger()
+    level, handlers = root.level, root.handlers[:]
+    root.handlers = [collector]  # the apps log every turn at INFO
+    root.setLevel(logging.INFO)
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(user(u) for u in range(args.users)))
+        wall = time.perf_counter() - start
+        await asyncio.gather(*list(session_manager._flushes.values()), return_exceptions=True)
+    finally:
+        root.handlers = handlers
+        root.setLevel(level)
+
+    requests = collector.requests
+    print(f"{len(requests)} requests from {args.users} users in {wall:.2f}s: "
+          f"{len(requests) / wall:.1f} req/s; {len(github.commits)} commits, "
+          f"{github.conflicts} GitHub conflicts, {openai.calls} model calls")
+    print(f"{'':<32}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    totals, stages = defaultdict(list), defaultdict(list)
+    for metrics in requests:
+        totals[metrics["request"]].append(metrics["total_ms"])
+        for stage, entry in metrics["stages"].items():
+            stages[stage].append(entry["ms"])
+    for label, rows in (("request", totals), ("stage", stages)):
+        for name in sorted(rows):
+            values = rows[name]
+            print(f"{label + ' ' + name:<32}{len(values):>6}"
+                  + "".join(f"{percentile(values, p):>10.1f}" for p in (50, 95, 99)))
+
+    counters = Counter()
+    for metrics in requests:
+        counters.update(metrics["counters"])
+    interesting = ("fast_path.hits", "response_cache.hits", "github.sha_conflicts", "github.retries", "openai.calls")
+    print("counters: " + ", ".join(f"{name}={counters[name]}" for name in interesting))
+
+    failed = sum(count for (kind, status), count in statuses.items() if status != 200)
+    failed += sum(1 for metrics in requests if not metrics.get("ok"))
+    lost = workload.lost_edits(github.files["index.html"])
+    for line in lost:
+        print(f"  lost edit: {line}")
+    if failed:
+        print(f"  {failed} failed requests: " + ", ".join(f"{k}={s}" for (k, s) in statuses if s != 200))
+    return 1 if failed or lost else 0
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load_test")
+    parser.add_argument("--users", type=int, default=20, help="concurrent conversations")
+    parser.add_argument("--turns", type=int, default=5, help="turns per conversation")
+    parser.add_argument("--items", type=int, default=50, help="projects and experience entries on the page")
+    parser.add_argument("--openai-ms", type=float, default=300, help="mean model call latency")
+    parser.add_argument("--github-ms", type=float, default=80, help="mean GitHub API latency")
+    parser.add_argument("--table-ms", type=float, default=10, help="mean Table Storage latency")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    if args.users > args.items:
+        parser.error("--users must not exceed --items; each user edits its own entries")
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
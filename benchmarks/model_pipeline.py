@@ -0,0 +1,63 @@
+# File: benchmarks/model_pipeline.py
+"""
+Compares single edits of a large page through the structured model
+(EDIT_MODE=model) with the section splice (EDIT_MODE=splice):
+
+  splice    - parse the edited section, mutate, splice it back
+  model     - copy the loaded model, apply the record operation, render
+              the changed card into the page
+
+along with the one-off costs of the model: extracting it from the page and
+loading it from its JSON file. Every model edit is checked by extracting
+the rendered page again, which must give back the edited records.
+
+Run from the repo root:  python -m benchmarks.model_pipeline [n_items] [repeats]
+Exits non-zero if a rendered page does not round-trip.
+"""
+import sys
+import json
+import time
+
+from benchmarks.synthetic import generate_portfolio
+from benchmarks.splice_pipeline import edits, splice_pipeline
+from update_content.github_helper import get_formatter
+from update_content.html_parser import parse_html
+from update_content.portfolio_model import PortfolioModel, extract, render_changes
+
+
+def model_pipeline(html: str, model: PortfolioModel, mutate) -> tuple[str, PortfolioModel]:
+    edited = mutate(model.copy())
+    return render_changes(html, edited), edited
+
+
+def best_ms(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.process_time()
+        fn()
+        best = min(best, time.process_time() - start)
+    return best * 1000
+
+
+def main(n_items: int = 1000, repeats: int = 3) -> int:
+    html = parse_html(generate_portfolio(n_items)).prettify(formatter=get_formatter())
+    model = extract(parse_html(html))
+    stored = model.dumps()
+    print(f"page: {n_items} projects + {n_items} experience entries, {len(html) / 1024:.0f} KiB; model {len(stored) / 1024:.0f} KiB")
+    print(f"extract from page  {best_ms(lambda: extract(parse_html(html)), repeats):>9.1f} ms")
+    print(f"load from JSON     {best_ms(lambda: PortfolioModel.from_dict(json.loads(stored)), repeats):>9.1f} ms")
+    print(f"{'edit':<20}{'splice ms':>10}{'model ms':>10}  round-trips")
+
+    failures = 0
+    for name, (section, mutate) in edits(n_items).items():
+        page, edited = model_pipeline(html, model, mutate)
+        same = page is not None and extract(parse_html(page)).to_dict() == edited.to_dict()
+        failures += not same
+        splice_ms = best_ms(lambda: splice_pipeline(html, section, mutate), repeats)
+        model_ms = best_ms(lambda: model_pipeline(html, model, mutate), repeats)
+        print(f"{name:<20}{splice_ms:>10.1f}{model_ms:>10.1f}  {'yes' if same else 'NO'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(a) for a in sys.argv[1:3])))
@@ -0,0 +1,62 @@
+# File: benchmarks/parse_pipeline.py
+"""
+Compares the CPU cost of one add_project edit on a large page:
+
+  legacy    - parse, mutate, str(soup), parse again, prettify
+  single    - parse once, mutate, prettify the same soup
+
+for every installed BeautifulSoup backend.
+
+Run from the repo root:  python -m benchmarks.parse_pipeline [n_items] [repeats]
+"""
+import sys
+import time
+
+from bs4 import BeautifulSoup, FeatureNotFound
+from benchmarks.synthetic import generate_portfolio
+from update_content.github_helper import get_formatter
+from update_content.html_parser import insert_project
+
+PROJECT = {
+    "title": "Benchmark Project",
+    "description": "Added by the parse pipeline benchmark.",
+    "technologies": ["Python", "lxml"],
+}
+
+
+def legacy_pipeline(html: str, parser: str) -> str:
+    updated = str(insert_project(BeautifulSoup(html, parser), PROJECT))
+    return BeautifulSoup(updated, parser).prettify(formatter=get_formatter())
+
+
+def single_parse_pipeline(html: str, parser: str) -> str:
+    soup = insert_project(BeautifulSoup(html, parser), PROJECT)
+    return soup.prettify(formatter=get_formatter())
+
+
+def cpu_time(fn, html: str, parser: str, repeats: int) -> float:
+    """Best-of-`repeats` process CPU time, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.process_time()
+        fn(html, parser)
+        best = min(best, time.process_time() - start)
+    return best * 1000
+
+
+def main(n_items: int = 1000, repeats: int = 5) -> None:
+    html = generate_portfolio(n_items)
+    print(f"page: {n_items} projects + {n_items} experience entries, {len(html) / 1024:.0f} KiB")
+    print(f"{'parser':<12}{'legacy ms':>12}{'single ms':>12}{'saving':>10}")
+    for parser in ("html.parser", "lxml", "html5lib"):
+        try:
+            BeautifulSoup("", parser)
+        except FeatureNotFound:
+            continue
+        legacy = cpu_time(legacy_pipeline, html, parser, repeats)
+        single = cpu_time(single_parse_pipeline, html, parser, repeats)
+        print(f"{parser:<12}{legacy:>12.1f}{single:>12.1f}{1 - single / legacy:>10.0%}")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,83 @@
+# File: benchmarks/search_index.py
+"""
+Measures the fuzzy search index for pages of growing size:
+
+  build     - PortfolioSearch over the extracted model (once per page SHA)
+  query     - median time of one search_portfolio lookup
+  match     - median time of one tolerant update lookup (KeyMatcher)
+
+and checks misspelled titles and roles: each must resolve to the entry it
+was derived from, or be refused as ambiguous (the synthetic keys differ
+only by a number, so "Porject 25" is as close to "Project 250").
+
+Run from the repo root:  python -m benchmarks.search_index [sizes...]
+Exits non-zero if a misspelled key resolves to the wrong entry.
+"""
+import sys
+import time
+import statistics
+
+from benchmarks.synthetic import generate_portfolio
+from update_content.html_parser import parse_html, index_for
+from update_content.portfolio_model import extract
+from update_content.search_index import PortfolioSearch
+
+QUERIES = ("pyton", "azure function", "kubernetes", "Company 1")
+
+
+def _typo(text: str) -> str:
+    """Swaps two letters of the first word, e.g. "Project" -> "Porject"."""
+    return text[0] + text[2] + text[1] + text[3:]
+
+
+def _lookup(find, *key):
+    try:
+        return find(*key)
+    except ValueError:
+        return None
+
+
+def median_ms(fn, repeats: int = 200) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main(sizes: list[int]) -> int:
+    print(f"{'entries':>8}{'build ms':>10}{'query ms':>10}{'match ms':>10}{'resolved':>10}{'refused':>9}{'wrong':>7}")
+    failures = 0
+    for n in sizes:
+        soup = parse_html(generate_portfolio(n))
+        model = extract(soup)
+        index = index_for(soup)
+
+        start = time.perf_counter()
+        search = PortfolioSearch(model)
+        build_ms = (time.perf_counter() - start) * 1000
+        query_ms = statistics.median(median_ms(lambda: search.search(q)) for q in QUERIES)
+
+        matcher = index.matcher()
+        outcomes = {"resolved": 0, "refused": 0, "wrong": 0}
+        for i in range(0, n, max(1, n // 20)):
+            project, entry = model.projects[i], model.experience[i]
+            probes = (
+                (_lookup(matcher.project, _typo(project.title)), index.find_project(project.title)),
+                (_lookup(matcher.experience, _typo(entry.role), entry.company),
+                 index.find_experience(entry.role, entry.company, exact=True)),
+            )
+            for found, expected in probes:
+                outcome = "refused" if found is None else ("resolved" if found is expected else "wrong")
+                outcomes[outcome] += 1
+        title = _typo(model.projects[n // 2].title)
+        match_ms = median_ms(lambda: _lookup(matcher.project, title))
+        failures += outcomes["wrong"]
+        print(f"{2 * n:>8}{build_ms:>10.1f}{query_ms:>10.3f}{match_ms:>10.3f}"
+              f"{outcomes['resolved']:>10}{outcomes['refused']:>9}{outcomes['wrong']:>7}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main([int(a) for a in sys.argv[1:]] or [10, 50, 250, 1000]))
@@ -0,0 +1,77 @@
+# File: benchmarks/session_codec.py
+"""
+Measures the stored size of copilot sessions of growing history length:
+
+  json      - the old `Data` property, json.dumps of the session
+  compact   - the same JSON without whitespace
+  <codec>   - encoded blob per codec (zstd only if zstandard is installed)
+  chunks    - Table properties the default-codec blob is split over
+  enc / dec - median encode and decode time of the default codec
+
+and checks that every encoding round-trips to the original session.
+
+Run from the repo root:  python -m benchmarks.session_codec [turns...]
+Exits non-zero if a session does not round-trip.
+"""
+import sys
+import json
+import time
+import statistics
+
+from copilot import session_codec
+from config.env import SESSION_COMPRESSION
+
+
+def generate_session(turns: int) -> dict:
+    """A session with `turns` edit turns: request, tool call, tool result, reply."""
+    history = []
+    for i in range(turns):
+        args = {"user_id": "bench-user", "project": {"title": f"Project {i}", "technologies": ["Python", "Azure Functions"]}}
+        result = {"status": "success", "section": "projects", "commit_url": f"https://github.com/o/r/commit/{i:040x}"}
+        history += [
+            {"role": "user", "content": f"Add Python and Azure Functions to the technologies of project Project {i}"},
+            {"role": "assistant", "content": None, "tool_calls": [
+                {"id": f"call_{i}", "type": "function",
+                 "function": {"name": "update_project", "arguments": json.dumps(args)}},
+            ]},
+            {"role": "tool", "tool_call_id": f"call_{i}", "content": json.dumps(result)},
+            {"role": "assistant", "content": f"Updated the technologies of Project {i} — committed as {i:07x}."},
+        ]
+    return {"summary": "The user is updating the projects section of their portfolio.", "history": history}
+
+
+def median_ms(fn, repeats: int = 20) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main(turns: list[int]) -> int:
+    codecs = ["none", "zlib"] + (["zstd"] if session_codec._zstd() else [])
+    print(f"{'turns':>6}{'json KiB':>10}{'compact':>9}" + "".join(f"{c:>8}" for c in codecs)
+          + f"{'chunks':>8}{'enc ms':>8}{'dec ms':>8}")
+    failures = 0
+    for n in turns:
+        data = generate_session(n)
+        blobs = {codec: session_codec.encode(data, codec) for codec in codecs}
+        for codec, blob in blobs.items():
+            if session_codec.decode(blob) != data:
+                print(f"  {codec}: session of {n} turns does not round-trip")
+                failures += 1
+        blob = session_codec.encode(data)
+        chunks = -(-len(blob) // session_codec.CHUNK_BYTES)
+        enc_ms = median_ms(lambda: session_codec.encode(data))
+        dec_ms = median_ms(lambda: session_codec.decode(blob))
+        print(f"{n:>6}{len(json.dumps(data)) / 1024:>10.1f}{len(session_codec.dumps(data)) / 1024:>9.1f}"
+              + "".join(f"{len(b) / 1024:>8.1f}" for b in blobs.values())
+              + f"{chunks:>8}{enc_ms:>8.2f}{dec_ms:>8.2f}")
+    print(f"(default codec: {SESSION_COMPRESSION}; sizes in KiB; one entity holds "
+          f"{session_codec.MAX_CHUNKS * session_codec.CHUNK_BYTES // 1024} KiB)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main([int(a) for a in sys.argv[1:]] or [6, 25, 100, 400, 1000]))
@@ -0,0 +1,94 @@
+# File: benchmarks/splice_pipeline.py
+"""
+Compares the two EDIT_MODE pipelines for single edits of a large page:
+
+  full      - parse the page, mutate, prettify the whole document
+  splice    - parse only the edited section, mutate, splice it back
+
+and checks that every spliced page reads the same as the full render
+(see splice.same_document). By default the page
+is prettified first, as it is after any earlier commit by the agent; pass
+--raw to edit the generated markup as-is.
+
+Run from the repo root:  python -m benchmarks.splice_pipeline [n_items] [repeats] [--raw]
+Exits non-zero if any spliced result differs from the full render.
+"""
+import sys
+import time
+import difflib
+
+from benchmarks.synthetic import generate_portfolio
+from update_content import splice
+from update_content.github_helper import get_formatter
+from update_content.html_parser import (
+    parse_html, insert_project, insert_experience, update_project, update_experience,
+)
+
+
+def edits(n: int) -> dict:
+    """name -> (section, mutate)"""
+    mid = n // 2
+    return {
+        "insert_project": ("projects", lambda soup: insert_project(soup, {
+            "title": "Benchmark Project", "description": "Added by the benchmark.", "technologies": ["Python"]})),
+        "insert_experience": ("experience", lambda soup: insert_experience(soup, {
+            "role": "Benchmark Engineer", "company": "Bench Co", "start_date": "2024",
+            "description": "Added by the benchmark.", "environment": ["Python"]})),
+        "update_project": ("projects", lambda soup: update_project(soup, {
+            "title": f"Project {mid}", "technologies": ["Rust", "Go"]})),
+        "update_experience": ("experience", lambda soup: update_experience(soup, {
+            "role": f"Engineer {mid}", "company": f"Company {mid}", "end_date": "Present"})),
+    }
+
+
+def full_pipeline(html: str, section: str, mutate) -> str:
+    return mutate(parse_html(html)).prettify(formatter=get_formatter())
+
+
+def splice_pipeline(html: str, section: str, mutate) -> str:
+    spans = splice.locate(html, [section])
+    soup = mutate(parse_html(splice.fragment(html, spans)))
+    return splice.render(html, spans, splice.top_level_sections(soup), get_formatter())
+
+
+def cpu_time(fn, html: str, section: str, mutate, repeats: int) -> float:
+    """Best-of-`repeats` process CPU time, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.process_time()
+        fn(html, section, mutate)
+        best = min(best, time.process_time() - start)
+    return best * 1000
+
+
+def changed_lines(before: str, after: str) -> int:
+    diff = difflib.unified_diff(before.splitlines(), after.splitlines(), lineterm="", n=0)
+    return sum(1 for line in diff if line[:1] in "+-" and line[:3] not in ("+++", "---"))
+
+
+def reparsed(html: str) -> str:
+    return parse_html(html).prettify(formatter=get_formatter())
+
+
+def main(n_items: int = 1000, repeats: int = 3, raw: bool = False) -> int:
+    html = generate_portfolio(n_items)
+    if not raw:
+        html = reparsed(html)
+    print(f"page: {n_items} projects + {n_items} experience entries, {len(html) / 1024:.0f} KiB")
+    print(f"{'edit':<20}{'full ms':>10}{'splice ms':>11}{'saving':>9}{'full diff':>11}{'splice diff':>13}  same")
+    mismatches = 0
+    for name, (section, mutate) in edits(n_items).items():
+        full = full_pipeline(html, section, mutate)
+        spliced = splice_pipeline(html, section, mutate)
+        same = splice.same_document(spliced, full, get_formatter())
+        mismatches += not same
+        full_ms = cpu_time(full_pipeline, html, section, mutate, repeats)
+        splice_ms = cpu_time(splice_pipeline, html, section, mutate, repeats)
+        print(f"{name:<20}{full_ms:>10.1f}{splice_ms:>11.1f}{1 - splice_ms / full_ms:>9.0%}"
+              f"{changed_lines(html, full):>11}{changed_lines(html, spliced):>13}  {'yes' if same else 'NO'}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if a != "--raw"]
+    sys.exit(main(*(int(a) for a in args[:2]), raw="--raw" in sys.argv))
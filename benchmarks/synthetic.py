@@ -0,0 +1,58 @@
+# File: benchmarks/synthetic.py
+"""
+Generates synthetic portfolio pages that follow the markup html_parser.py
+expects (section.projects / section.experience with div.item cards).
+"""
+
+TECHS = ["Python", "Azure Functions", "BeautifulSoup", "React", "PostgreSQL", "Docker", "Go", "Rust"]
+
+
+def project_item(i: int) -> str:
+    techs = ", ".join(TECHS[j % len(TECHS)] for j in range(i, i + 3))
+    return f"""
+        <div class="item">
+          <h3 class="title"><a href="https://github.com/example/project-{i}" target="_blank">Project {i}</a></h3>
+          <p class="summary">Synthetic project number {i} used for benchmarking the portfolio editor.<br/><b>Technology Stack -</b> {techs}.</p>
+        </div>"""
+
+
+def experience_item(i: int) -> str:
+    envs = ", ".join(TECHS[j % len(TECHS)] for j in range(i, i + 4))
+    start = 1990 + i % 30
+    return f"""
+        <div class="item">
+          <h3 class="title">Engineer {i} - <span class="place"><a href="https://company{i}.example.com" target="_blank">Company {i}</a></span><span class="year">({start} - {start + 2})</span></h3>
+          <p>Built and operated synthetic system {i} for benchmarking.<br/><strong>Environment -</strong> {envs}.</p>
+        </div>"""
+
+
+def generate_portfolio(n_projects: int, n_experience: int | None = None) -> str:
+    """
+    Returns a full index.html with `n_projects` project cards and
+    `n_experience` experience entries (defaults to the same count).
+    """
+    if n_experience is None:
+        n_experience = n_projects
+    projects = "".join(project_item(i) for i in range(n_projects))
+    experience = "".join(experience_item(i) for i in range(n_experience))
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"/><title>Synthetic Portfolio</title></head>
+<body>
+  <section class="experience section">
+    <div class="section-inner">
+      <h2 class="heading">Work Experience</h2>
+      <div class="content">{experience}
+      </div>
+    </div>
+  </section>
+  <section class="projects section">
+    <div class="section-inner">
+      <h2 class="heading">Projects</h2>
+      <div class="content">{projects}
+      </div>
+    </div>
+  </section>
+</body>
+</html>
+"""
@@ -0,0 +1,126 @@
+import json
+import logging as log
+import azure.functions as func
+from update_content.commit_queue import commit_combined
+from update_content.github_helper import submit_edit
+from update_content.html_parser import index_for, insert_project, insert_experience, update_project, update_experience
+from update_content.replies import commit_url
+from config.env import BULK_IMPORT_MAX_RECORDS
+from telemetry import request_metrics, incr
+from .records import parse_body, prepare
+
+INSERT = {"project": insert_project, "experience": insert_experience}
+UPDATE = {"project": update_project, "experience": update_experience}
+SECTIONS = {"project": "projects", "experience": "experience"}
+
+
+def _find(index, kind: str, fields: dict):
+    if kind == "project":
+        return index.find_project(fields["title"])
+    return index.find_experience(fields["role"], fields["company"], exact=True)
+
+
+def _record_edits(entries: list[dict]) -> list[tuple]:
+    """
+    One (mutate, section) edit per accepted record: records matching an
+    existing entry update it, the rest are inserted. The edits are applied
+    to one document through commit_combined, so a record that fails partway
+    is dropped and the rest re-applied without it. The edits of one attempt
+    share the document's lookup index, and each entry's status is (re)set
+    whenever its edit runs, since every attempt starts from a fresh copy.
+    """
+    shared = {"doc": None, "index": None}
+
+    def index_of(soup):
+        if shared["doc"] is not soup:
+            shared.update(doc=soup, index=index_for(soup))
+        return shared["index"]
+
+    def edit(entry: dict):
+        def mutate(soup):
+            index = index_of(soup)
+            kind, fields = entry["kind"], entry["fields"]
+            if _find(index, kind, fields) is not None:
+                UPDATE[kind](soup, fields, index=index)
+                entry["status"] = "updated"
+            elif entry["can_insert"]:
+                INSERT[kind](soup, fields, index=index)
+                entry["status"] = "inserted"
+            else:
+                raise ValueError(f"no existing {kind} matches; a new entry needs: {'; '.join(entry['missing'])}")
+            return soup
+        return mutate, SECTIONS[entry["kind"]]
+
+    return [edit(entry) for entry in entries]
+
+
+def _report(entries: list[dict], result: dict | None = None, error: str | None = None) -> dict:
+    counts: dict[str, int] = {}
+    records = []
+    for entry in entries:
+        counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        incr(f"bulk_import.{entry['status']}")
+        record = {"index": entry["index"], "kind": entry["kind"], "status": entry["status"]}
+        if entry["key"]:
+            record["key"] = list(entry["key"][1:])
+        if entry["error"]:
+            record["error"] = entry["error"]
+        records.append(record)
+
+    applied = counts.get("inserted", 0) + counts.get("updated", 0)
+    report = {
+        "status":  "error" if error or not applied else ("success" if applied == len(entries) else "partial"),
+        "summary": counts,
+        "records": records,
+    }
+    if result is not None:
+        report["commit_url"] = commit_url({"commit": result})
+    if error:
+        report["error"] = error
+    return report
+
+
+def _respond(report: dict, status_code: int) -> func.HttpResponse:
+    return func.HttpResponse(json.dumps(report), status_code=status_code, mimetype="application/json")
+
+
+async def main(req: func.HttpRequest) -> func.HttpResponse:
+    """
+    Imports a batch of project and experience records (JSON or JSONL) into
+    the portfolio page as a single commit and reports the outcome per record.
+    """
+    with request_metrics("bulk_import") as metrics:
+        try:
+            raw_records = parse_body(req.get_body())
+        except ValueError as e:
+            return _respond({"status": "error", "error": str(e)}, 400)
+        if not raw_records:
+            return _respond({"status": "error", "error": "no records in request body"}, 400)
+        if len(raw_records) > BULK_IMPORT_MAX_RECORDS:
+            return _respond({"status": "error", "error": f"at most {BULK_IMPORT_MAX_RECORDS} records per request"}, 413)
+
+        entries = prepare(raw_records)
+        accepted = [entry for entry in entries if entry["status"] is None]
+        metrics["records"] = len(entries)
+        if not accepted:
+            return _respond(_report(entries), 400)
+
+        failed: dict[int, Exception] = {}
+        try:
+            result = await commit_combined(submit_edit, _record_edits(accepted), "index.html", failed)
+        except Exception as e:
+            # every record rejected by the page itself is the caller's problem;
+            # otherwise nothing was published, whatever the edits recorded
+            rejected = len(failed) == len(accepted)
+            error = "none of the records could be applied" if rejected else str(e)
+            log.error(f"[bulk_import] import of {len(accepted)} record(s) failed: {error}")
+            metrics["ok"] = False
+            for i, entry in enumerate(accepted):
+                entry.update(status="failed", error=str(failed.get(i, e)))
+            return _respond(_report(entries, error=error), 400 if rejected else 500)
+        for i, e in failed.items():
+            accepted[i].update(status="failed", error=str(e))
+
+        report = _report(entries, result)
+        log.info(f"[bulk_import] {report['summary']} in one commit: {report['commit_url']}")
+        return _respond(report, 200)
@@ -0,0 +1,105 @@
+# File: bulk_import/records.py
+"""
+Parsing and validation of bulk-import records.
+
+A request body is a JSON array of records, an object with a "records"
+array, or JSONL (one record per line). A record is either wrapped the way
+the tools take it, {"project": {...}} / {"experience": {...}}, or flat with
+a "type" field, {"type": "project", "title": ...}. Its fields are checked
+against the add_* and update_* schemas in function_specs.py.
+"""
+import json
+from function_specs import FUNCTION_SPECS
+from tool_registry import validate
+
+# kind -> (tool that creates an entry, tool that updates one)
+KINDS = {
+    "project":    ("add_project", "update_project"),
+    "experience": ("add_experience", "update_experience"),
+}
+
+_SPECS = {spec["name"]: spec for spec in FUNCTION_SPECS}
+
+
+def _schema(tool: str, kind: str) -> dict:
+    return _SPECS[tool]["parameters"]["properties"][kind]
+
+
+def parse_body(body: bytes) -> list:
+    """Decodes a JSON or JSONL request body into a list of raw records."""
+    text = body.decode("utf-8-sig").strip()
+    if not text:
+        return []
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        return data["records"] if isinstance(data.get("records"), list) else [data]
+
+    records = []
+    for number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError as e:
+            raise ValueError(f"line {number} is not valid JSON: {e}") from None
+    return records
+
+
+def _unwrap(record) -> tuple[str, dict]:
+    if not isinstance(record, dict):
+        raise ValueError("record must be a JSON object")
+    for kind in KINDS:
+        if isinstance(record.get(kind), dict):
+            return kind, record[kind]
+    kind = record.get("type")
+    if kind in KINDS:
+        return kind, {k: v for k, v in record.items() if k != "type"}
+    raise ValueError(f"record must have a 'type' of {' or '.join(KINDS)}, or wrap its fields in one")
+
+
+def _norm(text) -> str:
+    return " ".join(str(text).lower().split())
+
+
+def key_of(kind: str, fields: dict) -> tuple:
+    """Identity used for de-duplication: the title, or (role, company)."""
+    if kind == "project":
+        return kind, _norm(fields["title"])
+    return kind, _norm(fields["role"]), _norm(fields["company"])
+
+
+def prepare(raw_records: list) -> list[dict]:
+    """
+    Validates every record and marks repeats of an earlier record's key.
+    Returns one entry per record: {"index", "kind", "fields", "key",
+    "status", "error", "can_insert", "missing"}, where status is "invalid"
+    or "duplicate" for records that will not be applied and None otherwise.
+    """
+    entries, seen = [], {}
+    for i, record in enumerate(raw_records):
+        entry = {"index": i, "kind": None, "fields": None, "key": None, "status": None, "error": None}
+        entries.append(entry)
+        try:
+            kind, fields = _unwrap(record)
+        except ValueError as e:
+            entry.update(status="invalid", error=str(e))
+            continue
+        add_tool, update_tool = KINDS[kind]
+        add_errors = validate(fields, _schema(add_tool, kind), kind)
+        update_errors = validate(fields, _schema(update_tool, kind), kind)
+        entry.update(kind=kind, fields=fields, can_insert=not add_errors, missing=add_errors)
+        if add_errors and update_errors:
+            entry.update(status="invalid", error="; ".join(add_errors))
+            continue
+
+        key = entry["key"] = key_of(kind, fields)
+        if key in seen:
+            entry.update(status="duplicate", error=f"same {kind} as record {seen[key]}")
+            continue
+        seen[key] = i
+    return entries
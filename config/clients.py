@@ -0,0 +1,77 @@
+# File: config/clients.py
+"""
+Shared async service clients. Each is created on first use and then reused
+by every invocation handled by this worker. The client libraries themselves
+are imported on first use too, so a cold start only loads what the request
+actually touches.
+"""
+import asyncio
+from typing import TYPE_CHECKING
+from config.env import (
+    AZURE_OPENAI_KEY, AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_API_VERSION,
+    AZURE_STORAGE_CONNECTION_STRING,
+)
+
+if TYPE_CHECKING:
+    import aiohttp
+    from openai import AsyncAzureOpenAI
+    from azure.data.tables.aio import TableClient
+
+HTTP_TIMEOUT_SECONDS = 30
+HTTP_POOL_SIZE       = 20
+
+_openai_client = None
+_http_session  = None
+_http_loop     = None
+_table_clients: dict[str, "TableClient"] = {}
+
+
+def get_openai_client() -> "AsyncAzureOpenAI":
+    """
+    Returns the worker's AsyncAzureOpenAI client.
+    """
+    global _openai_client
+    if _openai_client is None:
+        if not AZURE_OPENAI_KEY:
+            raise ValueError("AZURE_OPENAI_KEY environment variable is not set.")
+        from openai import AsyncAzureOpenAI
+        _openai_client = AsyncAzureOpenAI(
+            api_key             = AZURE_OPENAI_KEY,
+            azure_endpoint      = AZURE_OPENAI_ENDPOINT,   # must end in a slash
+            api_version         = AZURE_OPENAI_API_VERSION
+        )
+    return _openai_client
+
+
+def get_http_session() -> "aiohttp.ClientSession":
+    """
+    Returns the pooled aiohttp session for outbound HTTP (GitHub).
+    A session is bound to its event loop, so a new one is opened if the
+    worker's loop has changed.
+    """
+    global _http_session, _http_loop
+    loop = asyncio.get_running_loop()
+    if _http_session is None or _http_session.closed or _http_loop is not loop:
+        import aiohttp
+        _http_session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT_SECONDS),
+            connector=aiohttp.TCPConnector(limit=HTTP_POOL_SIZE),
+        )
+        _http_loop = loop
+    return _http_session
+
+
+def get_table_client(table_name: str) -> "TableClient":
+    """
+    Returns the async Table Storage client for `table_name`.
+    """
+    client = _table_clients.get(table_name)
+    if client is None:
+        if not AZURE_STORAGE_CONNECTION_STRING:
+            raise RuntimeError("Missing AZURE_STORAGE_CONNECTION_STRING connection string")
+        from azure.data.tables.aio import TableClient
+        client = TableClient.from_connection_string(
+            conn_str=AZURE_STORAGE_CONNECTION_STRING, table_name=table_name
+        )
+        _table_clients[table_name] = client
+    return client
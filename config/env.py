@@ -5,10 +5,33 @@ AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT", "https://veerav-ai.op
 AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2025-01-01-preview")
 AZURE_STORAGE_CONNECTION_STRING = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
 DEPLOYMENT_NAME = os.getenv("DEPLOYMENT_NAME", "gpt-4.1")
-REPO_OWNER    = "veeravn"
-REPO_NAME     = "veeravn.github.io"
 API_BASE      = "https://api.github.com"
 DEFAULT_BRANCH= "master"
 GITHUB_BRANCH = os.getenv("GITHUB_BRANCH", DEFAULT_BRANCH)
-GITHUB_REPO   = os.getenv("GITHUB_REPO", "veeravn/veeravn.github.io")
+GITHUB_REPO   = os.getenv("GITHUB_REPO", "veeravn/veeravn.github.io")  # "owner/name"
 GITHUB_TOKEN  = os.getenv("GITHUB_TOKEN")
+GITHUB_TIMEOUT      = float(os.getenv("GITHUB_TIMEOUT", "10"))      # seconds per GitHub API request
+GITHUB_MAX_RETRIES  = int(os.getenv("GITHUB_MAX_RETRIES", "3"))     # retries of 5xx, timeouts and rate limits
+GITHUB_RATE_RESERVE = int(os.getenv("GITHUB_RATE_RESERVE", "100"))  # remaining calls below which requests are spread until the reset
+GITHUB_MAX_WAIT     = float(os.getenv("GITHUB_MAX_WAIT", "30"))     # longest a request waits out rate limits before failing
+HTML_PARSER   = os.getenv("HTML_PARSER", "html.parser")  # any BeautifulSoup backend, e.g. "lxml"
+GITHUB_WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET")          # secret of the push webhook served by github_webhook
+DOC_CACHE_MAX_AGE     = float(os.getenv("DOC_CACHE_MAX_AGE", "0"))  # seconds a fetched page is used without revalidating; 0 always revalidates
+HISTORY_TOKEN_BUDGET   = int(os.getenv("HISTORY_TOKEN_BUDGET", "4000"))    # approx. tokens of stored history
+HISTORY_KEEP_TURNS     = int(os.getenv("HISTORY_KEEP_TURNS", "6"))         # recent turns kept verbatim
+TOOL_RESULT_MAX_CHARS  = int(os.getenv("TOOL_RESULT_MAX_CHARS", "400"))    # larger tool results become references
+SESSION_BACKEND        = os.getenv("SESSION_BACKEND", "table")             # "table", "memory" or "sqlite"
+SESSION_SQLITE_PATH    = os.getenv("SESSION_SQLITE_PATH", "sessions.db")
+SESSION_CACHE_SIZE     = int(os.getenv("SESSION_CACHE_SIZE", "256"))       # sessions kept in-process
+SESSION_CACHE_TTL      = float(os.getenv("SESSION_CACHE_TTL", "300"))      # seconds before re-reading storage
+SESSION_WRITE_BEHIND   = os.getenv("SESSION_WRITE_BEHIND", "true").lower() == "true"
+SESSION_COMPRESSION    = os.getenv("SESSION_COMPRESSION", "zlib")          # "zlib", "zstd" (optional zstandard package) or "none"
+TEMPLATE_REPLIES       = os.getenv("TEMPLATE_REPLIES", "true").lower() == "true"  # skip the follow-up model call on success
+FAST_PATH              = os.getenv("FAST_PATH", "true").lower() == "true"  # parse common edit commands locally instead of asking the model
+RESPONSE_CACHE_SIZE    = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))      # 0 disables the read-only reply cache
+RESPONSE_CACHE_TTL     = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))    # seconds
+EDIT_MODE              = os.getenv("EDIT_MODE", "splice")                  # "splice" (edited sections only), "full" or "model"
+MODEL_FILE             = os.getenv("MODEL_FILE", "portfolio.json")         # structured model stored next to the page (EDIT_MODE=model)
+SPLICE_VERIFY          = os.getenv("SPLICE_VERIFY", "true").lower() == "true"   # compare spliced edits with a full re-render; "false" skips the extra parse
+COMMIT_COALESCE_WINDOW = float(os.getenv("COMMIT_COALESCE_WINDOW", "0"))  # extra seconds an edit waits to share a commit; 0 commits at once
+BULK_IMPORT_MAX_RECORDS = int(os.getenv("BULK_IMPORT_MAX_RECORDS", "500"))   # records accepted per bulk_import request
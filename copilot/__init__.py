@@ -1,13 +1,24 @@
 import json
+import time
+import uuid
+import inspect
 import logging
 import azure.functions as func
-from openai import AzureOpenAI
 import os
+from types import SimpleNamespace
 from .tools import TOOLS
-from .logging_helper import log_info
-from function_specs import FUNCTION_SPECS
-from update_content.ai_helper import add_project, add_experience, edit_project, edit_experience
-from config.env import AZURE_OPENAI_KEY, AZURE_OPENAI_ENDPOINT, DEPLOYMENT_NAME, AZURE_OPENAI_API_VERSION
+from .logging_helper import log_info, log_error
+from . import history as history_manager
+from . import response_cache
+from . import fast_path
+from tool_registry import tools_for
+from update_content.ai_helper import add_project, add_experience, edit_project, edit_experience, search_portfolio
+from update_content.github_helper import run_batched
+from update_content.replies import render_reply
+from update_content.html_parser import fetch_portfolio_html
+from config.env import AZURE_OPENAI_KEY, DEPLOYMENT_NAME, AZURE_OPENAI_API_VERSION, TEMPLATE_REPLIES, RESPONSE_CACHE_SIZE, FAST_PATH
+from config.clients import get_openai_client
+from telemetry import request_metrics, span, record_stage, record_usage, incr
 
 # Extend the tool registry at runtime
 TOOLS.update({
@@ -15,74 +26,178 @@ TOOLS.update({
     "add_experience": add_experience,
     "update_project":    edit_project,
     "update_experience": edit_experience,
+    "search_portfolio":  search_portfolio,
 })
 
-# Initialize OpenAI client once
+# Validate OpenAI settings up front; the shared client is created on first use
 if not AZURE_OPENAI_KEY:
     raise ValueError("AZURE_OPENAI_KEY environment variable is not set.")
 else:
-    log_info(f"[agent] AZURE_OPENAI_KEY is set. {AZURE_OPENAI_KEY}")
+    log_info("[agent] AZURE_OPENAI_KEY is set.")
 if not AZURE_OPENAI_API_VERSION:
     raise ValueError("AZURE_OPENAI_API_VERSION environment variable is not set.")
 else:
     log_info(f"[agent] AZURE_OPENAI_API_VERSION is set. {AZURE_OPENAI_API_VERSION}")
-client = AzureOpenAI(
-    api_key             = AZURE_OPENAI_KEY,        # or OPENAI_API_KEY
-    azure_endpoint      = AZURE_OPENAI_ENDPOINT,   # must end in a slash
-    api_version         = AZURE_OPENAI_API_VERSION
-)
 
-async def main(req: func.HttpRequest) -> func.HttpResponse:
+def _call_args(call) -> dict:
+    """Decoded arguments of a model tool call ({} if they are not valid JSON)."""
     try:
-        body = req.get_json()
-        user_id = body.get("user_id")
-        user_message = body.get("message")
+        return json.loads(call.function.arguments or "{}")
+    except ValueError:
+        return {}
 
-        # Build conversation history
-        messages = [{"role": "system", "content": "You are an AI agent for managing a portfolio website."}]
-        session = TOOLS["get_user_session"](user_id=user_id)
-        for msg in session.get("history", []):
-            messages.append(msg)
-        messages.append({"role": "user", "content": user_message})
-
-        # Ask model to choose a tool or reply directly
-        chat_resp = client.chat.completions.create(
-            model=DEPLOYMENT_NAME,
-            messages=messages,
-            functions=FUNCTION_SPECS,
-            function_call="auto"
-        )
-        msg = chat_resp.choices[0].message
+async def _run_tool_call(call, user_id: str):
+    """Dispatches one model tool call through TOOLS (fast path commands through fast_path)."""
+    command = getattr(call, "command", None)
+    if command is not None:
+        return await fast_path.dispatch(command)
+    name = call.function.name
+    if name not in TOOLS:
+        raise ValueError(f"Unknown tool '{name}'")
+    args = json.loads(call.function.arguments or "{}")
+    args.setdefault("user_id", user_id)  # Ensure user_id is passed to the function
+    result = TOOLS[name](**args)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
 
-        if msg.function_call:
-            # a function call was returned
-            name = msg.function_call.name
-            args = json.loads(msg.function_call.arguments)
-            args.setdefault("user_id", user_id)  # Ensure user_id is passed to the function
-            result = await TOOLS[name](**args)
+def _local_message(command: fast_path.Command):
+    """A model-shaped assistant message carrying the fast path's tool call."""
+    call = SimpleNamespace(
+        id=f"call_local_{uuid.uuid4().hex[:12]}",
+        function=SimpleNamespace(name=command.tool, arguments=json.dumps(command.args)),
+        command=command,
+    )
+    return SimpleNamespace(content=None, tool_calls=[call])
+
+async def _agent_turn(user_id: str, user_message: str, llm_reply: bool = False) -> str:
+    """
+    Runs one conversation turn and returns the reply once the session has
+    been saved. Successful tool calls get a templated reply; the model
+    writes the reply only after an error or when llm_reply is set. Commands
+    the fast path parses are dispatched without asking the model which tool
+    to call.
+    """
+    # Build conversation history: system prompt, running summary, recent turns
+    with span("session.read"):
+        session = await TOOLS["get_user_session"](user_id=user_id)
+    summary, history = history_manager.load(session)
+    prefix = [{"role": "system", "content": "You are an AI agent for managing a portfolio website."}]
+    prefix += history_manager.context_messages(summary)
+    messages = prefix + history
+    messages.append({"role": "user", "content": user_message})
+
+    command = await fast_path.resolve(user_message) if FAST_PATH else None
+
+    # Repeated read-only questions are answered from the response cache,
+    # keyed to this user's conversation and the current page version (a
+    # cheap 304 when it is unchanged); the version is only checked when this
+    # question has been answered in this conversation state before
+    conversation = messages[:-1]
+    cache_key = sha = None
+    if RESPONSE_CACHE_SIZE > 0 and command is None and response_cache.may_hit(user_id, conversation, user_message):
+        try:
+            _, sha = await fetch_portfolio_html()
+            cache_key = response_cache.make_key(user_id, conversation, user_message, sha)
+        except Exception as e:
+            log_error(f"[agent] response cache skipped, page version unavailable: {e}")
+    cached_reply = response_cache.get(cache_key) if cache_key else None
+
+    if cached_reply is not None:
+        agent_reply = cached_reply
+        incr("response_cache.hits")
+        log_info(f"[agent] response cache hit for user_id={user_id}")
+    else:
+        # Ask model to choose tools or reply directly
+        client = get_openai_client()
+        if command is not None:
+            log_info(f"[agent] fast path: {command.tool} for user_id={user_id}")
+            msg = _local_message(command)
+        else:
+            with span("openai.chat"):
+                chat_resp = await client.chat.completions.create(
+                    model=DEPLOYMENT_NAME,
+                    messages=messages,
+                    tools=tools_for(TOOLS),
+                    tool_choice="auto"
+                )
+            record_usage(chat_resp)
+            msg = chat_resp.choices[0].message
 
+        if msg.tool_calls:
+            # one or more tool calls were returned; run them together so
+            # every edit to index.html lands in a single commit
+            calls = msg.tool_calls
             messages.append({
-                "role": "function",
-                "name": name,
-                "content": json.dumps(result)
+                "role": "assistant",
+                "content": msg.content,
+                "tool_calls": [
+                    {
+                        "id": call.id,
+                        "type": "function",
+                        "function": {"name": call.function.name, "arguments": call.function.arguments}
+                    }
+                    for call in calls
+                ]
             })
-            followup = client.chat.completions.create(
-                model=DEPLOYMENT_NAME,
-                messages=messages
-            )
-            agent_reply = followup.choices[0].message.content
+            tools_started = time.perf_counter()
+            results = await run_batched([_run_tool_call(call, user_id) for call in calls])
+            record_stage("tools", (time.perf_counter() - tools_started) * 1000)
+
+            rendered = []
+            for call, result in zip(calls, results):
+                if isinstance(result, Exception):
+                    log_error(f"[agent] tool {call.function.name} failed: {result}")
+                    result = {"status": "error", "error": str(result)}
+                messages.append({
+                    "role": "tool",
+                    "tool_call_id": call.id,
+                    "content": json.dumps(result)
+                })
+                rendered.append((call.function.name, _call_args(call), result))
+
+            agent_reply = None
+            if TEMPLATE_REPLIES and not llm_reply:
+                agent_reply = render_reply(rendered)
+            if agent_reply is None:
+                with span("openai.followup"):
+                    followup = await client.chat.completions.create(
+                        model=DEPLOYMENT_NAME,
+                        messages=messages
+                    )
+                record_usage(followup)
+                agent_reply = followup.choices[0].message.content
 
             # Only _after_ a successful commit, clear the session
-            if result.get("status") == "success":
-                user_id = args.get("user_id", "portfolio_user")
-                TOOLS["delete_user_session"](user_id=user_id)
+            if any(isinstance(r, dict) and r.get("status") == "success" and r.get("commit") for r in results):
+                await TOOLS["delete_user_session"](user_id=user_id)
         else:
             agent_reply = msg.content
+            if RESPONSE_CACHE_SIZE > 0 and command is None and agent_reply:
+                response_cache.remember(user_id, conversation, user_message, agent_reply, sha)
+
+    messages.append({"role": "assistant", "content": agent_reply})
+    log_info(f"[agent] user_id={user_id} message={user_message} agent_reply={agent_reply}")
+    # Persist updated session, kept within the history budget
+    with span("session.compact"):
+        session_data = await history_manager.compact(summary, messages[len(prefix):])
+    with span("session.write"):
+        await TOOLS["save_user_session"](user_id=user_id, session_data=session_data)
+    return agent_reply
+
+async def main(req: func.HttpRequest) -> func.HttpResponse:
+    with request_metrics("copilot") as metrics:
+        return await _handle(req, metrics)
 
-        log_info(f"[agent] user_id={user_id} message={user_message} agent_reply={agent_reply}")
-        # Persist updated session
-        TOOLS["save_user_session"](user_id=user_id, session_data={"history": messages})
+async def _handle(req: func.HttpRequest, metrics: dict) -> func.HttpResponse:
+    try:
+        body = req.get_json()
+        user_id = body.get("user_id")
+        user_message = body.get("message")
+        llm_reply = bool(body.get("llm_reply"))
+        metrics["user_id"] = user_id
 
+        agent_reply = await _agent_turn(user_id, user_message, llm_reply=llm_reply)
         return func.HttpResponse(
             json.dumps({"response": agent_reply}),
             status_code=200,
@@ -91,4 +206,5 @@ async def main(req: func.HttpRequest) -> func.HttpResponse:
 
     except Exception as e:
         logging.exception("Agent error")
+        metrics["ok"] = False
         return func.HttpResponse(str(e), status_code=500)
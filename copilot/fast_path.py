@@ -0,0 +1,286 @@
+# File: copilot/fast_path.py
+"""
+Deterministic parser for common edit commands, tried before the model.
+
+Mechanical edits do not need a model call to become tool arguments:
+
+    set the end date of Senior Engineer at Acme to 2025
+    change description of project Portfolio AI to Serverless chat agent
+    add Rust, Go to technologies of project Portfolio AI
+    remove Java from the environment of Senior Engineer at Acme
+    mark Senior Engineer at Acme as current
+
+parse() recognizes the grammar without any I/O. resolve() then looks the
+target up on the current page: the entry must match exactly (a title, or
+a role and company), and one reading of the command must be left. The
+arguments are checked against the tool's schema in FUNCTION_SPECS.
+Anything not matched this confidently returns None, and the model handles
+the message as before.
+
+dispatch() then commits the command. List edits and a new start date
+(which keeps the current end date) depend on the entry as it is, so they
+are worked out again inside the edit, against the document being
+committed; a concurrent edit of the same list is never overwritten.
+"""
+import re
+import asyncio
+from dataclasses import dataclass
+from function_specs import FUNCTION_SPECS
+from tool_registry import validate
+from update_content.html_parser import index_for, parse_html, fetch_portfolio_html, update_project, update_experience
+from update_content.portfolio_model import PortfolioModel, project_from_item, experience_from_item
+from update_content.github_helper import submit_edit
+from update_content import doc_cache
+from telemetry import span, incr
+from .logging_helper import log_error
+
+# phrase -> (field, kind it belongs to; None when both have it)
+FIELDS = {
+    "end date":         ("end_date", "experience"),
+    "end":              ("end_date", "experience"),
+    "start date":       ("start_date", "experience"),
+    "start":            ("start_date", "experience"),
+    "company link":     ("company_link", "experience"),
+    "company url":      ("company_link", "experience"),
+    "company website":  ("company_link", "experience"),
+    "environment":      ("environment", "experience"),
+    "link":             ("link", "project"),
+    "url":              ("link", "project"),
+    "technologies":     ("technologies", "project"),
+    "technology stack": ("technologies", "project"),
+    "tech stack":       ("technologies", "project"),
+    "stack":            ("technologies", "project"),
+    "description":      ("description", None),
+    "summary":          ("description", None),
+}
+LIST_FIELDS = {"technologies", "environment"}
+
+_FIELD = "|".join(sorted((re.escape(f) for f in FIELDS), key=len, reverse=True))
+_LEAD = r"^(?:please\s+)?"
+_SET_RE = re.compile(
+    _LEAD + rf"(?:set|change|update)\s+(?:the\s+)?(?P<field>{_FIELD})\s+(?:of|for)\s+(?P<target>.+?)\s+to\s+(?P<value>.+)$",
+    re.IGNORECASE | re.DOTALL,
+)
+_LIST_RE = re.compile(
+    _LEAD + rf"(?P<op>add|remove)\s+(?P<items>.+?)\s+(?:to|from)\s+(?:the\s+)?(?P<field>{_FIELD})\s+(?:of|for)\s+(?P<target>.+)$",
+    re.IGNORECASE | re.DOTALL,
+)
+_CURRENT_RE = re.compile(
+    _LEAD + r"mark\s+(?P<target>.+?)\s+as\s+(?:current|ongoing|present)$",
+    re.IGNORECASE | re.DOTALL,
+)
+_DATE_RE = re.compile(r"^(?:present|(?:[a-z]{3,9}\.?\s+)?\d{4})$", re.IGNORECASE)
+_ITEMS_RE = re.compile(r"\s*(?:,|\band\b)\s*", re.IGNORECASE)
+
+_SCHEMAS = {spec["name"]: spec["parameters"] for spec in FUNCTION_SPECS}
+
+# Process-wide counters, see stats()
+_counters = {"attempts": 0, "hits": 0, "misses": 0, "unresolved": 0}
+
+
+@dataclass(slots=True)
+class Intent:
+    """A recognized command, before its target is looked up."""
+    op: str                 # "set", "add", "remove"
+    field: str
+    kind: str | None        # "project", "experience" or None (either)
+    target: str
+    value: object           # str, or a list of items for add/remove
+
+
+@dataclass(slots=True)
+class Command:
+    """A tool call, with arguments as of resolve(); dispatch() commits it."""
+    tool: str
+    args: dict
+    intent: Intent
+
+
+# kind -> (tool, section, update helper)
+_UPDATES = {
+    "project":    ("update_project", "projects", update_project),
+    "experience": ("update_experience", "experience", update_experience),
+}
+
+
+def stats() -> dict:
+    """Counters since the worker started, with the share of messages handled locally."""
+    rate = _counters["hits"] / _counters["attempts"] if _counters["attempts"] else 0.0
+    return {**_counters, "hit_rate": round(rate, 3)}
+
+
+def _clean(text: str) -> str:
+    return " ".join(text.strip().strip("\"'“”‘’").split())
+
+
+def _items(text: str) -> list[str]:
+    return [item for item in (_clean(part) for part in _ITEMS_RE.split(text)) if item]
+
+
+def parse(message: str) -> Intent | None:
+    """Matches `message` against the command grammar."""
+    text = " ".join(message.strip().rstrip(".!").split())
+    match = _SET_RE.match(text)
+    if match:
+        field, kind = FIELDS[match["field"].lower()]
+        value = _clean(match["value"])
+        if field in LIST_FIELDS:
+            value = _items(value)
+        elif field.endswith("_date") and not _DATE_RE.match(value):
+            return None
+        return Intent("set", field, kind, _clean(match["target"]), value)
+    match = _LIST_RE.match(text)
+    if match:
+        field, kind = FIELDS[match["field"].lower()]
+        if field not in LIST_FIELDS:
+            return None
+        return Intent(match["op"].lower(), field, kind, _clean(match["target"]), _items(match["items"]))
+    match = _CURRENT_RE.match(text)
+    if match:
+        return Intent("set", "end_date", "experience", _clean(match["target"]), "Present")
+    return None
+
+
+def _readings(target: str, filler: str) -> list[str]:
+    """`target` as typed, then without a leading or trailing `filler` phrase."""
+    return list(dict.fromkeys((target, re.sub(filler, "", target, flags=re.IGNORECASE).strip())))
+
+
+def _project_titles(target: str) -> list[str]:
+    # "Capstone Project" is a title as typed; "project Atlas" names "Atlas"
+    return _readings(target, r"^(?:the\s+)?project\s+|\s+project$")
+
+
+def _experience_splits(target: str):
+    """Every (role, company) reading of "<role> at <company>"."""
+    for text in _readings(target, r"^(?:the\s+|my\s+)"):
+        for match in re.finditer(r"\s+at\s+", text, re.IGNORECASE):
+            yield text[:match.start()], text[match.end():]
+
+
+def _first(items):
+    return next((item for item in items if item is not None), None)
+
+
+def _targets(index, intent: Intent) -> list[tuple[str, object]]:
+    found = []
+    if intent.kind in (None, "project"):
+        item = _first(index.find_project(title) for title in _project_titles(intent.target))
+        if item is not None:
+            found.append(("project", project_from_item(item)))
+    if intent.kind in (None, "experience"):
+        items = [index.find_experience(role, company, exact=True) for role, company in _experience_splits(intent.target)]
+        for item in {id(item): item for item in items if item is not None}.values():
+            found.append(("experience", experience_from_item(item)))
+    return found
+
+
+def _edit(intent: Intent, current):
+    if intent.op == "set":
+        return intent.value
+    existing = getattr(current, intent.field)
+    if intent.op == "add":
+        known = {item.lower() for item in existing}
+        return existing + [item for item in intent.value if item.lower() not in known]
+    dropped = {item.lower() for item in intent.value}
+    if not dropped & {item.lower() for item in existing}:
+        return None
+    return [item for item in existing if item.lower() not in dropped]
+
+
+def _fields(intent: Intent, kind: str, current) -> dict | None:
+    """The update of `current` (a Project or Experience record) that carries out `intent`."""
+    value = _edit(intent, current)
+    if value is None or value == []:
+        return None
+    if kind == "project":
+        fields = {"title": current.title}
+    else:
+        fields = {"role": current.role, "company": current.company}
+        if intent.field == "start_date" and current.end_date:
+            # the tools reset an end date that is not given to "Present"
+            fields["end_date"] = current.end_date
+    fields[intent.field] = value
+    return fields
+
+
+def build(index, intent: Intent) -> Command | None:
+    """
+    Turns an intent into update_project/update_experience arguments for the
+    one entry it names on the page indexed by `index`, or None.
+    """
+    targets = _targets(index, intent)
+    if len(targets) != 1:
+        return None
+    kind, current = targets[0]
+    fields = _fields(intent, kind, current)
+    if fields is None:
+        return None
+    tool = _UPDATES[kind][0]
+    if validate(fields, _SCHEMAS[tool]["properties"][kind], kind):
+        return None
+    return Command(tool, {kind: fields}, intent)
+
+
+def _record(doc, kind: str, key: dict):
+    """The current record of the entry named by `key` in a soup or PortfolioModel."""
+    lookup = doc if isinstance(doc, PortfolioModel) else index_for(doc)
+    if kind == "project":
+        found = lookup.find_project(key["title"])
+        convert = project_from_item
+    else:
+        found = lookup.find_experience(key["role"], key["company"], exact=True)
+        convert = experience_from_item
+    if found is None:
+        raise ValueError(f"the {kind} named in the command is no longer on the page")
+    return found if isinstance(doc, PortfolioModel) else convert(found)
+
+
+async def dispatch(command: Command) -> dict:
+    """
+    Commits `command` through the commit queue. The update is derived from
+    the entry as it is in the document being edited, so a list edit adds
+    to or removes from whatever is committed by then.
+    """
+    kind = "project" if command.tool == "update_project" else "experience"
+    _, section, update = _UPDATES[kind]
+    key = command.args[kind]
+    # names the entry edited, as update_project/update_experience results do
+    names = {"title": key["title"]} if kind == "project" else {"role": key["role"], "company": key["company"]}
+
+    def mutate(doc):
+        fields = _fields(command.intent, kind, _record(doc, kind, key))
+        if fields is None:
+            raise ValueError(f"nothing to {command.intent.op}: {', '.join(command.intent.value)} is not listed")
+        return update(doc, fields)
+
+    with span(f"tool.{command.tool}"):
+        result = await submit_edit(mutate, section)
+    return {"status": "success", **names, "commit": result}
+
+
+async def resolve(message: str) -> Command | None:
+    """
+    The tool call for `message` if it is a command this parser can handle
+    with confidence, else None. Counts the outcome (fast_path.hits, .misses
+    for messages outside the grammar, .unresolved for commands whose
+    target was not found) and times the fast_path stage.
+    """
+    _counters["attempts"] += 1
+    command = None
+    with span("fast_path"):
+        intent = parse(message)
+        if intent is not None:
+            try:
+                html, sha = await fetch_portfolio_html()
+                soup = doc_cache.parsed("index.html", sha)
+                if soup is None:
+                    soup = await asyncio.to_thread(parse_html, html)
+                    doc_cache.attach_soup("index.html", sha, soup)
+                command = build(index_for(soup), intent)
+            except Exception as e:
+                log_error(f"[fast_path] could not resolve {intent.op} {intent.field}: {e}")
+    outcome = "hits" if command else ("unresolved" if intent else "misses")
+    _counters[outcome] += 1
+    incr(f"fast_path.{outcome}")
+    return command
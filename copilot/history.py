@@ -0,0 +1,132 @@
+# File: copilot/history.py
+"""
+Keeps stored conversations within a token budget.
+
+A session is {"summary": str, "history": [messages]}. Once more than
+twice HISTORY_KEEP_TURNS turns (a turn starts at a user message) or
+HISTORY_TOKEN_BUDGET tokens have piled up, all but the most recent
+HISTORY_KEEP_TURNS are folded into the running summary in one call, so a
+turn only waits for summarization every few turns. Tool results are
+stored as compact references instead of full payloads.
+"""
+import json
+from .logging_helper import log_info, log_error
+from config.env import DEPLOYMENT_NAME, HISTORY_TOKEN_BUDGET, HISTORY_KEEP_TURNS, TOOL_RESULT_MAX_CHARS
+from config.clients import get_openai_client
+
+# Keys worth keeping when a tool result is reduced to a reference
+_REFERENCE_KEYS = ("status", "section", "error", "commit_url")
+
+# Cap for the fallback summary used when the summarization call fails
+_FALLBACK_SUMMARY_CHARS = 2000
+
+# Stored history may grow to this many times HISTORY_KEEP_TURNS before it
+# is folded, and is folded down to the budget divided by it
+_FOLD_FACTOR = 2
+
+
+def estimate_tokens(messages: list) -> int:
+    """Rough token count (~4 characters per token) of a message list."""
+    return sum(len(json.dumps(m)) for m in messages) // 4
+
+
+def compact_tool_result(message: dict) -> dict:
+    """
+    Replaces a large tool/function result with a short reference that keeps
+    its status, section, error, commit URL and the title/role it was about.
+    """
+    if message.get("role") not in ("tool", "function"):
+        return message
+    content = message.get("content") or ""
+    if len(content) <= TOOL_RESULT_MAX_CHARS:
+        return message
+    try:
+        result = json.loads(content)
+    except ValueError:
+        return {**message, "content": content[:TOOL_RESULT_MAX_CHARS] + "…"}
+    if not isinstance(result, dict):
+        return {**message, "content": content[:TOOL_RESULT_MAX_CHARS] + "…"}
+
+    ref = {k: result[k] for k in _REFERENCE_KEYS if result.get(k)}
+    commit = result.get("commit")
+    if isinstance(commit, dict) and "commit_url" not in ref:
+        url = (commit.get("content") or {}).get("html_url") or (commit.get("commit") or {}).get("html_url")
+        if url:
+            ref["commit_url"] = url
+    for field in ("project", "experience"):
+        item = result.get(field)
+        if isinstance(item, dict):
+            ref[field] = {k: item[k] for k in ("title", "role", "company") if k in item}
+    return {**message, "content": json.dumps(ref)}
+
+
+def split_turns(history: list) -> list[list]:
+    """Groups messages into turns, each starting at a user message."""
+    turns = []
+    for msg in history:
+        if msg.get("role") == "user" or not turns:
+            turns.append([])
+        turns[-1].append(msg)
+    return turns
+
+
+def load(session: dict) -> tuple[str, list]:
+    """
+    Returns (summary, history) from a stored session. Older sessions stored
+    the system prompt inside the history; it is dropped here.
+    """
+    history = [m for m in session.get("history", []) if m.get("role") != "system"]
+    return session.get("summary", ""), history
+
+
+def context_messages(summary: str) -> list:
+    """The message that carries the running summary into the prompt, if any."""
+    if not summary:
+        return []
+    return [{"role": "system", "content": f"Summary of the earlier conversation: {summary}"}]
+
+
+async def _fold(summary: str, turns: list[list]) -> str:
+    """Folds `turns` into the running summary with one model call."""
+    transcript = "\n".join(
+        f"{m['role']}: {m.get('content') or json.dumps(m.get('tool_calls', ''))}"
+        for turn in turns for m in turn
+    )
+    prompt = [
+        {"role": "system", "content": "You maintain a terse running summary of a conversation with a "
+                                      "portfolio-editing assistant. Keep facts, decisions and pending requests."},
+        {"role": "user", "content": f"Current summary:\n{summary or '(none)'}\n\nNew messages:\n{transcript}\n\n"
+                                    "Return the updated summary only."},
+    ]
+    try:
+        resp = await get_openai_client().chat.completions.create(model=DEPLOYMENT_NAME, messages=prompt)
+        return resp.choices[0].message.content or summary
+    except Exception as e:
+        # Keep the session usable if the summary call fails: fall back to the user requests
+        log_error(f"[history] summarization failed: {e}")
+        asks = "; ".join(m.get("content") or "" for turn in turns for m in turn if m.get("role") == "user")
+        return f"{summary} {asks}".strip()[-_FALLBACK_SUMMARY_CHARS:]
+
+
+async def compact(summary: str, history: list) -> dict:
+    """
+    Returns the session to store, with tool results reduced to references.
+    Past _FOLD_FACTOR * HISTORY_KEEP_TURNS turns or HISTORY_TOKEN_BUDGET
+    tokens, only the last HISTORY_KEEP_TURNS turns are kept verbatim (fewer
+    if they exceed HISTORY_TOKEN_BUDGET / _FOLD_FACTOR) and everything older
+    is folded into the summary.
+    """
+    turns = [[compact_tool_result(m) for m in turn] for turn in split_turns(history)]
+    if (len(turns) <= _FOLD_FACTOR * HISTORY_KEEP_TURNS
+            and estimate_tokens([m for turn in turns for m in turn]) <= HISTORY_TOKEN_BUDGET):
+        return {"summary": summary, "history": [m for turn in turns for m in turn]}
+
+    keep = turns[-HISTORY_KEEP_TURNS:] if HISTORY_KEEP_TURNS > 0 else []
+    old = turns[:len(turns) - len(keep)]
+    while len(keep) > 1 and estimate_tokens([m for turn in keep for m in turn]) > HISTORY_TOKEN_BUDGET // _FOLD_FACTOR:
+        old.append(keep.pop(0))
+
+    if old:
+        log_info(f"[history] folding {len(old)} turn(s) into the summary")
+        summary = await _fold(summary, old)
+    return {"summary": summary, "history": [m for turn in keep for m in turn]}
@@ -1,9 +1,10 @@
 import logging
+from telemetry import redact
 
 def log_error(message):
-    """Logs error messages for debugging."""
-    logging.error(f"Copilot Error: {message}")
+    """Logs error messages for debugging, with secrets redacted."""
+    logging.error(redact(f"Copilot Error: {message}"))
 
 def log_info(message):
-    """Logs informational messages."""
-    logging.info(f"Copilot Info: {message}")
+    """Logs informational messages, with secrets redacted."""
+    logging.info(redact(f"Copilot Info: {message}"))
@@ -0,0 +1,115 @@
+# File: copilot/response_cache.py
+"""
+Cache of direct (tool-free) model replies, keyed by the user, a hash of
+everything the model saw before the message (system prompt, running
+summary and recent turns), the normalized message and the portfolio blob
+SHA, so a reply is only reused for the same user in the same conversation
+state. Entries for a SHA are dropped as soon as the document cache moves
+past it. may_hit() tells without the SHA whether a lookup could succeed,
+so the page version is only revalidated for messages that have been
+answered.
+"""
+import re
+import json
+import time
+import hashlib
+from collections import OrderedDict
+from update_content import doc_cache
+from config.env import RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL
+
+# key -> (sha, reply, expires), least recently used first
+_entries: "OrderedDict[str, tuple]" = OrderedDict()
+_keys_by_sha: dict[str, set] = {}
+# context part of a key (user, conversation hash and message) -> number of entries
+_contexts: dict[str, int] = {}
+
+
+def normalize_message(message: str) -> str:
+    return re.sub(r"\s+", " ", (message or "").strip().lower()).rstrip("?!. ")
+
+
+def _context(user_id: str, conversation: list, message: str) -> str:
+    digest = hashlib.sha256(json.dumps([user_id, conversation], sort_keys=True).encode()).hexdigest()
+    return f"{digest}:{normalize_message(message)}"
+
+
+def make_key(user_id: str, conversation: list, message: str, sha: str) -> str:
+    """
+    Builds the cache key. `conversation` is the list of messages the model
+    is given ahead of `message`; "yes" or "the first one" only hit after
+    the same conversation of the same user.
+    """
+    return f"{sha}:{_context(user_id, conversation, message)}"
+
+
+def may_hit(user_id: str, conversation: list, message: str) -> bool:
+    """Whether a reply to `message` in this context is cached for any page version."""
+    return _context(user_id, conversation, message) in _contexts
+
+
+def get(key: str) -> str | None:
+    hit = _entries.get(key)
+    if hit is None:
+        return None
+    sha, reply, expires = hit
+    if expires <= time.monotonic():
+        _drop(key)
+        return None
+    _entries.move_to_end(key)
+    return reply
+
+
+def put(key: str, sha: str, reply: str) -> None:
+    if RESPONSE_CACHE_SIZE <= 0:
+        return
+    if key not in _entries:
+        context = key.split(":", 1)[1]
+        _contexts[context] = _contexts.get(context, 0) + 1
+    _entries[key] = (sha, reply, time.monotonic() + RESPONSE_CACHE_TTL)
+    _entries.move_to_end(key)
+    _keys_by_sha.setdefault(sha, set()).add(key)
+    while len(_entries) > RESPONSE_CACHE_SIZE:
+        _drop(next(iter(_entries)))
+
+
+def remember(user_id: str, conversation: list, message: str, reply: str, sha: str | None = None) -> None:
+    """
+    Caches a direct reply. Without `sha` it is filed under the version of
+    the page held by the document cache, if any; this turn did not read it.
+    """
+    if sha is None:
+        cached = doc_cache.get("index.html")
+        if cached is None:
+            return
+        sha = cached["sha"]
+    put(make_key(user_id, conversation, message, sha), sha, reply)
+
+
+def _drop(key: str) -> None:
+    hit = _entries.pop(key, None)
+    if hit is not None:
+        context = key.split(":", 1)[1]
+        _contexts[context] -= 1
+        if not _contexts[context]:
+            del _contexts[context]
+        keys = _keys_by_sha.get(hit[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del _keys_by_sha[hit[0]]
+
+
+def invalidate_sha(sha: str) -> None:
+    """Drops every cached reply computed against blob `sha`."""
+    for key in list(_keys_by_sha.get(sha, ())):
+        _drop(key)
+
+
+def clear() -> None:
+    _entries.clear()
+    _keys_by_sha.clear()
+    _contexts.clear()
+
+
+# A commit (or any other change to the cached page) retires its old SHA
+doc_cache.subscribe(lambda path, old_sha: invalidate_sha(old_sha))
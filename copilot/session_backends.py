@@ -0,0 +1,151 @@
+# File: copilot/session_backends.py
+"""
+Storage backends for copilot sessions.
+
+Every backend stores one session document per user together with an ETag
+and implements the same three coroutines:
+
+    read(user_id)              -> (data, etag) or None
+    write(user_id, data, etag) -> new etag   (etag=None means "create")
+    delete(user_id)            -> None
+
+write() raises SessionConflictError when the stored ETag no longer matches,
+so two writers can never silently overwrite each other. The table and
+SQLite backends store sessions compressed (see session_codec) and still
+read sessions saved as plain JSON.
+"""
+import json
+import asyncio
+import sqlite3
+from config.clients import get_table_client
+from . import session_codec
+
+
+class SessionConflictError(Exception):
+    """The stored session changed since it was read."""
+
+
+class TableSessionBackend:
+    """Azure Table Storage: one entity per user, PartitionKey "session"."""
+
+    def __init__(self, table_name: str = "CopilotSessions"):
+        self.table_name = table_name
+
+    async def read(self, user_id: str) -> tuple[dict, str] | None:
+        from azure.core.exceptions import ResourceNotFoundError
+        try:
+            ent = await get_table_client(self.table_name).get_entity(partition_key="session", row_key=user_id)
+        except ResourceNotFoundError:
+            return None
+        return session_codec.from_entity(ent), ent.metadata["etag"]
+
+    async def write(self, user_id: str, data: dict, etag: str | None) -> str:
+        from azure.core import MatchConditions
+        from azure.core.exceptions import ResourceExistsError, ResourceModifiedError
+        from azure.data.tables import UpdateMode
+        entity = {
+            "PartitionKey": "session",            # EXACT casing required
+            "RowKey":       user_id,              # EXACT casing required
+            **session_codec.to_entity(data),
+        }
+        table = get_table_client(self.table_name)
+        try:
+            if etag is None:
+                meta = await table.create_entity(entity=entity)
+            else:
+                meta = await table.update_entity(
+                    entity=entity,
+                    mode=UpdateMode.REPLACE,
+                    etag=etag,
+                    match_condition=MatchConditions.IfNotModified
+                )
+        except (ResourceExistsError, ResourceModifiedError) as e:
+            raise SessionConflictError(f"session for {user_id} changed concurrently") from e
+        return meta["etag"]
+
+    async def delete(self, user_id: str) -> None:
+        await get_table_client(self.table_name).delete_entity(partition_key="session", row_key=user_id)
+
+
+class MemorySessionBackend:
+    """Process-local dict; for tests and local runs."""
+
+    def __init__(self):
+        self._rows: dict[str, tuple[str, int]] = {}
+
+    async def read(self, user_id: str) -> tuple[dict, str] | None:
+        row = self._rows.get(user_id)
+        if row is None:
+            return None
+        raw, version = row
+        return json.loads(raw), str(version)
+
+    async def write(self, user_id: str, data: dict, etag: str | None) -> str:
+        row = self._rows.get(user_id)
+        current = str(row[1]) if row else None
+        if current != etag:
+            raise SessionConflictError(f"session for {user_id} changed concurrently")
+        version = (row[1] + 1) if row else 1
+        self._rows[user_id] = (json.dumps(data), version)
+        return str(version)
+
+    async def delete(self, user_id: str) -> None:
+        self._rows.pop(user_id, None)
+
+
+class SqliteSessionBackend:
+    """Single-file SQLite store; for local runs that should survive restarts."""
+
+    def __init__(self, path: str = "sessions.db"):
+        self.path = path
+        with sqlite3.connect(self.path) as db:
+            db.execute("CREATE TABLE IF NOT EXISTS sessions (user_id TEXT PRIMARY KEY, data TEXT, version INTEGER)")
+
+    def _read(self, user_id):
+        with sqlite3.connect(self.path) as db:
+            return db.execute("SELECT data, version FROM sessions WHERE user_id = ?", (user_id,)).fetchone()
+
+    def _write(self, user_id, raw, etag):
+        with sqlite3.connect(self.path) as db:
+            if etag is None:
+                try:
+                    db.execute("INSERT INTO sessions VALUES (?, ?, 1)", (user_id, raw))
+                except sqlite3.IntegrityError:
+                    return None
+                return 1
+            cur = db.execute(
+                "UPDATE sessions SET data = ?, version = version + 1 WHERE user_id = ? AND version = ?",
+                (raw, user_id, int(etag))
+            )
+            return int(etag) + 1 if cur.rowcount == 1 else None
+
+    def _delete(self, user_id):
+        with sqlite3.connect(self.path) as db:
+            db.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
+
+    async def read(self, user_id: str) -> tuple[dict, str] | None:
+        row = await asyncio.to_thread(self._read, user_id)
+        if row is None:
+            return None
+        data = row[0]
+        return (json.loads(data) if isinstance(data, str) else session_codec.decode(data)), str(row[1])
+
+    async def write(self, user_id: str, data: dict, etag: str | None) -> str:
+        version = await asyncio.to_thread(self._write, user_id, session_codec.encode(data), etag)
+        if version is None:
+            raise SessionConflictError(f"session for {user_id} changed concurrently")
+        return str(version)
+
+    async def delete(self, user_id: str) -> None:
+        await asyncio.to_thread(self._delete, user_id)
+
+
+def create_backend(kind: str, sqlite_path: str = "sessions.db"):
+    """Builds the backend named by SESSION_BACKEND ("table", "memory" or "sqlite")."""
+    if kind == "memory":
+        return MemorySessionBackend()
+    if kind == "sqlite":
+        return SqliteSessionBackend(sqlite_path)
+    if kind == "table":
+        return TableSessionBackend()
+    raise ValueError(f"Unknown SESSION_BACKEND '{kind}'")
@@ -0,0 +1,125 @@
+# File: copilot/session_codec.py
+"""
+Storage encoding of copilot sessions.
+
+A session used to be stored as one `Data` property holding json.dumps of
+the session. Azure Table Storage caps a property at 64 KiB and an entity at
+1 MiB, so a long conversation eventually failed to save. Sessions are now
+written as:
+
+    compact JSON (no whitespace, UTF-8)  ->  compressed  ->  blob
+
+where the blob starts with a two-byte header (format version, codec) so
+it describes itself. For Table Storage the blob is split over binary
+properties Data0, Data1, ... of at most CHUNK_BYTES, next to "Format" and
+"Chunks" properties:
+
+    props = to_entity(data)     # {"Format": 2, "Chunks": 1, "Data0": b"..."}
+    data  = from_entity(ent)    # also reads the old {"Data": "<json>"} form
+
+The codec is SESSION_COMPRESSION: "zlib" (default, standard library),
+"zstd" (needs the optional `zstandard` package; falls back to zlib when it
+is not installed) or "none". Blobs are decoded by the codec named in their
+header, so the setting can change without migrating stored sessions.
+"""
+import json
+import zlib
+from .logging_helper import log_error
+from config.env import SESSION_COMPRESSION
+
+FORMAT_VERSION = 2  # 1 was the plain `Data` JSON property
+
+# Azure Table Storage limits: 64 KiB per binary property, 1 MiB per entity.
+# 15 full chunks leave room for the keys, timestamps and the other properties.
+CHUNK_BYTES = 64 * 1024
+MAX_CHUNKS  = 15
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+_CODECS = {"none": 0, "zlib": 1, "zstd": 2}
+_NAMES = {code: name for name, code in _CODECS.items()}
+
+
+class SessionTooLargeError(ValueError):
+    """An encoded session does not fit in one storage entity."""
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def _compress(raw: bytes, codec: str) -> tuple[str, bytes]:
+    if codec == "zstd":
+        zstandard = _zstd()
+        if zstandard is not None:
+            return codec, zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+        log_error("[session_codec] SESSION_COMPRESSION=zstd but zstandard is not installed; using zlib")
+        codec = "zlib"
+    if codec == "zlib":
+        return codec, zlib.compress(raw, ZLIB_LEVEL)
+    if codec == "none":
+        return codec, raw
+    raise ValueError(f"Unknown SESSION_COMPRESSION '{codec}'")
+
+
+def _decompress(payload: bytes, codec: str) -> bytes:
+    if codec == "zlib":
+        return zlib.decompress(payload)
+    if codec == "zstd":
+        zstandard = _zstd()
+        if zstandard is None:
+            raise RuntimeError("session was stored with zstd; install the zstandard package to read it")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    return payload
+
+
+def dumps(data: dict) -> bytes:
+    """Compact UTF-8 JSON of a session."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def encode(data: dict, codec: str | None = None) -> bytes:
+    """
+    The stored blob of `data`, compressed with `codec` (default
+    SESSION_COMPRESSION) unless that would not make it smaller.
+    """
+    raw = dumps(data)
+    codec, payload = _compress(raw, codec or SESSION_COMPRESSION)
+    if len(payload) >= len(raw):
+        codec, payload = "none", raw
+    return bytes((FORMAT_VERSION, _CODECS[codec])) + payload
+
+
+def decode(blob: bytes) -> dict:
+    """The session stored in `blob`, as written by encode()."""
+    if len(blob) < 2 or blob[0] != FORMAT_VERSION or blob[1] not in _NAMES:
+        raise ValueError(f"not a session blob (header {blob[:2]!r})")
+    return json.loads(_decompress(blob[2:], _NAMES[blob[1]]))
+
+
+def to_entity(data: dict, codec: str | None = None) -> dict:
+    """
+    The Table Storage properties of `data`: the encoded blob in chunks of
+    CHUNK_BYTES. Raises SessionTooLargeError beyond MAX_CHUNKS.
+    """
+    blob = encode(data, codec)
+    chunks = [blob[i:i + CHUNK_BYTES] for i in range(0, len(blob), CHUNK_BYTES)]
+    if len(chunks) > MAX_CHUNKS:
+        raise SessionTooLargeError(
+            f"session is {len(blob) // 1024} KiB encoded; one entity holds {MAX_CHUNKS * CHUNK_BYTES // 1024} KiB"
+        )
+    props = {"Format": FORMAT_VERSION, "Chunks": len(chunks)}
+    props.update((f"Data{i}", chunk) for i, chunk in enumerate(chunks))
+    return props
+
+
+def from_entity(entity) -> dict:
+    """The session stored in a Table entity, in either the chunked or the legacy `Data` form."""
+    if "Chunks" not in entity:
+        return json.loads(entity["Data"])
+    return decode(b"".join(bytes(entity[f"Data{i}"]) for i in range(entity["Chunks"])))
@@ -1,49 +1,130 @@
 # File: copilot/session_manager.py
 
-import os
 import json
+import time
+import asyncio
+from collections import OrderedDict
 from .logging_helper import log_info, log_error
-from azure.data.tables import TableServiceClient, UpdateMode
-from azure.core.exceptions import ResourceNotFoundError
-from config.env import AZURE_STORAGE_CONNECTION_STRING
+from .session_backends import create_backend, SessionConflictError
+from telemetry import span
+from config.env import (
+    AZURE_STORAGE_CONNECTION_STRING, SESSION_BACKEND, SESSION_SQLITE_PATH,
+    SESSION_CACHE_SIZE, SESSION_CACHE_TTL, SESSION_WRITE_BEHIND,
+)
 
-# Initialize the Table client once
-if not AZURE_STORAGE_CONNECTION_STRING:
+if SESSION_BACKEND == "table" and not AZURE_STORAGE_CONNECTION_STRING:
     raise RuntimeError("Missing AZURE_STORAGE_CONNECTION_STRING connection string")
-_service = TableServiceClient.from_connection_string(conn_str=AZURE_STORAGE_CONNECTION_STRING)
-_table = _service.get_table_client(table_name="CopilotSessions")
 
-def save_user_session(user_id: str, session_data: dict) -> None:
+# Created on first use so importing this module stays cheap
+_backend = None
+
+
+def get_backend():
+    """Returns the session backend selected by SESSION_BACKEND."""
+    global _backend
+    if _backend is None:
+        _backend = create_backend(SESSION_BACKEND, SESSION_SQLITE_PATH)
+    return _backend
+
+# user_id -> {"data", "raw", "etag", "expires", "dirty"}, least recently used first
+_cache: "OrderedDict[str, dict]" = OrderedDict()
+_flushes: dict[str, asyncio.Task] = {}
+
+
+def _remember(user_id: str, data: dict, raw: str, etag: str | None, dirty: bool = False) -> dict:
+    # Update an existing entry in place so a pending flush picks up the new data
+    entry = _cache.get(user_id) or {}
+    entry.update(data=data, raw=raw, etag=etag, expires=time.monotonic() + SESSION_CACHE_TTL, dirty=dirty)
+    _cache[user_id] = entry
+    _cache.move_to_end(user_id)
+    while len(_cache) > SESSION_CACHE_SIZE:
+        # dirty entries are still referenced by their pending flush
+        _cache.popitem(last=False)
+    return entry
+
+
+async def _flush(user_id: str, entry: dict) -> None:
+    """Writes a dirty cache entry to the backend, guarded by its ETag."""
+    raw = entry["raw"]
+    try:
+        with span("session.backend_write"):
+            entry["etag"] = await get_backend().write(user_id, entry["data"], entry["etag"])
+    except SessionConflictError:
+        # Someone else wrote this session first: drop ours so the next read is fresh
+        log_error(f"[session_manager] concurrent update of session for user_id={user_id}; local changes dropped")
+        if _cache.get(user_id) is entry:
+            del _cache[user_id]
+        raise
+    if entry["raw"] == raw:
+        entry["dirty"] = False
+
+
+async def _flush_in_background(user_id: str, entry: dict) -> None:
+    try:
+        while entry["dirty"]:
+            await _flush(user_id, entry)
+    except Exception as e:
+        log_error(f"[session_manager] background write failed for user_id={user_id}: {e}")
+    finally:
+        _flushes.pop(user_id, None)
+
+
+async def save_user_session(user_id: str, session_data: dict) -> None:
     """
-    Upserts a single entity per user into the 'sessions' table.
-    - PartitionKey = session
-    - RowKey       = "default_user" (a constant)
-    - Data  = JSON blob of the session_data dict
+    Stores the session for `user_id` in the worker cache and writes it to the
+    backend, skipping the write when nothing changed. With
+    SESSION_WRITE_BEHIND the write happens in the background; otherwise it
+    is awaited and a SessionConflictError is raised if another writer got
+    there first.
     """
-    entity = {
-        "PartitionKey": "session",            # EXACT casing required
-        "RowKey":       user_id,          # EXACT casing required
-        "Data":  json.dumps(session_data)
-    }
+    raw = json.dumps(session_data)
+    cached = _cache.get(user_id)
+    if cached is not None and cached["raw"] == raw:
+        log_info(f"[session_manager] session unchanged for user_id={user_id}, skipping write")
+        return
 
-    log_info(f"[session_manager] upserting entity keys={list(entity.keys())} for user_id={user_id}")
-    _table.upsert_entity(entity=entity, mode=UpdateMode.MERGE)
+    entry = _remember(user_id, session_data, raw, cached["etag"] if cached else None, dirty=True)
+    if SESSION_WRITE_BEHIND:
+        if user_id not in _flushes:
+            _flushes[user_id] = asyncio.ensure_future(_flush_in_background(user_id, entry))
+    else:
+        await _flush(user_id, entry)
 
 
-def get_user_session(user_id: str) -> dict:
+async def get_user_session(user_id: str) -> dict:
     """
-    Retrieves the saved session_data for a given user_id.
-    Returns an empty dict if none exists.
+    Retrieves the saved session_data for a given user_id, from the worker
+    cache when it is fresh. Returns an empty dict if none exists.
+    The returned dict is shared with the cache and must not be mutated.
     """
-    try:
-        ent = _table.get_entity(partition_key="session", row_key=user_id)
-        return json.loads(ent["Data"])
-    except ResourceNotFoundError:
-        log_error("[session_manager] no existing session for user_id={user_id}")
+    cached = _cache.get(user_id)
+    if cached is not None and (cached["dirty"] or cached["expires"] > time.monotonic()):
+        _cache.move_to_end(user_id)
+        return cached["data"]
+
+    with span("session.backend_read"):
+        stored = await get_backend().read(user_id)
+    if stored is None:
+        log_info(f"[session_manager] no existing session for user_id={user_id}")
+        _cache.pop(user_id, None)
         return {}
+    data, etag = stored
+    _remember(user_id, data, json.dumps(data), etag)
+    return data
+
 
-def delete_user_session(user_id: str) -> None:
+async def delete_user_session(user_id: str) -> None:
     """
     Deletes the stored session for the given user_id.
     """
-    _table.delete_entity(partition_key="session", row_key=user_id)
+    pending = _flushes.get(user_id)
+    if pending is not None:
+        await asyncio.gather(pending, return_exceptions=True)
+    _cache.pop(user_id, None)
+    await get_backend().delete(user_id)
+
+
+async def flush_sessions() -> None:
+    """Waits for every pending background write to finish."""
+    while _flushes:
+        await asyncio.gather(*list(_flushes.values()), return_exceptions=True)
@@ -148,6 +148,30 @@ FUNCTION_SPECS = [
             "required": ["user_id", "experience"]
         }
     },
+    {
+        "name": "search_portfolio",
+        "description": "Find existing projects and experience entries by approximate title, role, company or technology. Read-only; use it to check what exists or to get the exact title or role before an update.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "user_id": {"type": "string", "default": "default_user"},
+                "query": {
+                    "type": "string",
+                    "description": "What to look for, e.g. 'portfolio ai' or 'kubernetes'."
+                },
+                "kind": {
+                    "type": "string",
+                    "enum": ["project", "experience"],
+                    "description": "Only return entries of this kind."
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Most results to return (default 5, at most 10)."
+                }
+            },
+            "required": ["query"]
+        }
+    },
     {
         "name": "get_user_session",
         "description": "Retrieve conversation state for a user.",
@@ -195,4 +219,7 @@ FUNCTION_SPECS = [
             "required": ["path", "content"],
         },
     }
-]
\ No newline at end of file
+]
+
+# Specs of internal plumbing, documented here but never offered to the model
+INTERNAL_TOOLS = frozenset({"get_user_session", "save_user_session", "generate_ai_response", "commit_html"})
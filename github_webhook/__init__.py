@@ -0,0 +1,142 @@
+# File: github_webhook/__init__.py
+"""
+Receives GitHub push webhooks for the portfolio repository and brings this
+worker's caches up to date with the pushed files.
+
+Every delivery must carry a valid X-Hub-Signature-256 (HMAC-SHA256 of the
+body with GITHUB_WEBHOOK_SECRET); unsigned or mis-signed requests get a
+401. For a push to GITHUB_BRANCH of GITHUB_REPO, each changed file this
+worker has cached is read at the head of the branch, not at the pushed
+commit, so a late or out-of-order delivery cannot bring back an older
+version:
+
+  - unchanged (e.g. the push was this worker's own commit): kept, and
+    marked as just confirmed
+  - changed: replaced by the current version (HTML is parsed right away),
+    which retires the old version's parsed index, search index, model and
+    cached replies through the doc_cache subscribers
+  - removed or unreadable: dropped, so the next read fetches it again
+
+When the payload cannot list every changed file (a forced push, a deleted
+branch, or more commits than GitHub includes) the whole cache is dropped.
+With DOC_CACHE_MAX_AGE set, workers use cached pages that long without
+asking GitHub; the webhook keeps the receiving worker current within it.
+"""
+import json
+import hmac
+import base64
+import hashlib
+import asyncio
+import logging as log
+from urllib.parse import parse_qs
+import azure.functions as func
+from update_content import doc_cache
+from update_content.github_client import request
+from update_content.html_parser import parse_html
+from config.env import GITHUB_REPO, GITHUB_BRANCH, GITHUB_WEBHOOK_SECRET
+from telemetry import request_metrics, span, incr
+
+# GitHub lists at most this many commits in a push payload
+MAX_LISTED_COMMITS = 20
+
+
+def verify_signature(body: bytes, signature: str | None, secret: str) -> bool:
+    """Checks an X-Hub-Signature-256 header ("sha256=<hex>") against `body`."""
+    if not signature or not signature.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(signature[len("sha256="):], expected)
+
+
+def parse_payload(body: bytes, content_type: str) -> dict:
+    """The event payload, sent as JSON or form-encoded in a `payload` field."""
+    if content_type.startswith("application/x-www-form-urlencoded"):
+        return json.loads(parse_qs(body.decode("utf-8"))["payload"][0])
+    return json.loads(body)
+
+
+def changed_paths(push: dict) -> set[str] | None:
+    """
+    Every path the push added, modified or removed, or None when the
+    payload does not list them all.
+    """
+    commits = push.get("commits") or []
+    if push.get("forced") or push.get("deleted") or len(commits) >= MAX_LISTED_COMMITS:
+        return None
+    paths = set()
+    for commit in commits:
+        for key in ("added", "modified", "removed"):
+            paths.update(commit.get(key) or ())
+    return paths
+
+
+async def refresh(path: str) -> str:
+    """
+    Brings the cached `path` to its version at the head of GITHUB_BRANCH.
+    Returns "unchanged", "refreshed" or "invalidated".
+    """
+    cached = doc_cache.get(path)
+    try:
+        data = (await request("GET", f"contents/{path}", params={"ref": GITHUB_BRANCH})).data
+        if cached is not None and data.get("sha") == cached["sha"]:
+            doc_cache.confirm(path)
+            return "unchanged"
+        html = base64.b64decode(data.get("content", "")).decode()
+        soup = await asyncio.to_thread(parse_html, html) if path.endswith(".html") else None
+    except Exception as e:
+        # a 404 means the push removed it; either way the next read fetches it again
+        log.warning(f"[github_webhook] could not refresh {path}: {e}")
+        doc_cache.invalidate(path)
+        return "invalidated"
+    doc_cache.store(path, data["sha"], html, soup=soup)
+    return "refreshed"
+
+
+def _respond(report: dict, status_code: int = 200) -> func.HttpResponse:
+    return func.HttpResponse(json.dumps(report), status_code=status_code, mimetype="application/json")
+
+
+async def main(req: func.HttpRequest) -> func.HttpResponse:
+    """Handles one webhook delivery (ping or push)."""
+    with request_metrics("github_webhook") as metrics:
+        event = req.headers.get("X-GitHub-Event", "")
+        metrics.update(event=event, delivery=req.headers.get("X-GitHub-Delivery"))
+        if not GITHUB_WEBHOOK_SECRET:
+            log.error("[github_webhook] GITHUB_WEBHOOK_SECRET is not set; refusing the delivery")
+            metrics["ok"] = False
+            return _respond({"status": "error", "error": "webhook secret is not configured"}, 503)
+        body = req.get_body()
+        if not verify_signature(body, req.headers.get("X-Hub-Signature-256"), GITHUB_WEBHOOK_SECRET):
+            incr("webhook.bad_signature")
+            metrics["ok"] = False
+            return _respond({"status": "error", "error": "invalid signature"}, 401)
+
+        if event == "ping":
+            return _respond({"status": "pong"})
+        if event != "push":
+            return _respond({"status": "ignored", "reason": f"'{event}' events are not handled"})
+        try:
+            push = parse_payload(body, req.headers.get("Content-Type", ""))
+        except (ValueError, KeyError) as e:
+            return _respond({"status": "error", "error": f"unreadable payload: {e}"}, 400)
+
+        repo = (push.get("repository") or {}).get("full_name", "")
+        if repo.lower() != GITHUB_REPO.lower() or push.get("ref") != f"refs/heads/{GITHUB_BRANCH}":
+            return _respond({"status": "ignored", "reason": f"push to {repo} {push.get('ref')}"})
+
+        paths = changed_paths(push)
+        if paths is None:
+            doc_cache.invalidate()
+            incr("webhook.invalidated_all")
+            log.info(f"[github_webhook] push {push.get('after')} does not list its files; cache dropped")
+            return _respond({"status": "success", "invalidated": "all"})
+
+        cached = sorted(path for path in paths if doc_cache.get(path) is not None)
+        with span("webhook.refresh"):
+            outcomes = await asyncio.gather(*(refresh(path) for path in cached))
+        report = {"status": "success", "changed": len(paths)}
+        for path, outcome in zip(cached, outcomes):
+            report.setdefault(outcome, []).append(path)
+            incr(f"webhook.{outcome}")
+        log.info(f"[github_webhook] push {push.get('after')}: {report}")
+        return _respond(report)
@@ -0,0 +1,114 @@
+# File: telemetry.py
+"""
+Per-request timing and counters for the agent pipeline.
+
+    with request_metrics("copilot", user_id=...):   # one per invocation
+        with span("openai.chat"):                    # time a stage
+            resp = await client.chat.completions.create(...)
+        record_usage(resp)                           # token counts
+        record_http("github", 304)                   # HTTP status counts
+        incr("github.retries")                       # any other counter
+
+Stages and counters recorded by tasks started inside the block are
+collected into the same request. On exit the request is logged once as a
+JSON line prefixed with "metrics", with secrets redacted.
+"""
+import re
+import json
+import time
+import logging
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from config.env import AZURE_OPENAI_KEY, GITHUB_TOKEN, AZURE_STORAGE_CONNECTION_STRING
+
+_current: ContextVar["dict | None"] = ContextVar("request_metrics", default=None)
+
+# Configured secrets masked verbatim (short values would mask ordinary text)
+_SECRETS = [s for s in (AZURE_OPENAI_KEY, GITHUB_TOKEN, AZURE_STORAGE_CONNECTION_STRING) if s and len(s) >= 8]
+_SECRET_PATTERNS = [
+    re.compile(r"(AccountKey=)[^;]+", re.IGNORECASE),
+    re.compile(r"((?:token|bearer)\s+)[A-Za-z0-9_\-\.]{8,}", re.IGNORECASE),
+    re.compile(r"((?:api[_-]?key|authorization)[\"']?\s*[:=]\s*[\"']?)[^\s\"',;]+", re.IGNORECASE),
+]
+
+
+def redact(text: str) -> str:
+    """Masks configured secrets and anything shaped like a credential."""
+    for secret in _SECRETS:
+        text = text.replace(secret, "[REDACTED]")
+    for pattern in _SECRET_PATTERNS:
+        text = pattern.sub(r"\1[REDACTED]", text)
+    return text
+
+
+@contextmanager
+def request_metrics(name: str, **fields):
+    """Collects the stages and counters of one invocation and logs them on exit."""
+    metrics = {"request": name, **fields, "stages": {}, "counters": {}, "tokens": {}}
+    token = _current.set(metrics)
+    start = time.perf_counter()
+    try:
+        yield metrics
+    except BaseException:
+        metrics["ok"] = False
+        raise
+    else:
+        metrics.setdefault("ok", True)
+    finally:
+        metrics["total_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        _current.reset(token)
+        logging.info("metrics " + redact(json.dumps(metrics, default=str)))
+
+
+def record_stage(stage: str, elapsed_ms: float) -> None:
+    """Adds one timed occurrence of `stage`; repeats accumulate ms and count."""
+    metrics = _current.get()
+    if metrics is not None:
+        entry = metrics["stages"].setdefault(stage, {"ms": 0.0, "count": 0})
+        entry["ms"] = round(entry["ms"] + elapsed_ms, 2)
+        entry["count"] += 1
+
+
+@contextmanager
+def span(stage: str):
+    """Times the enclosed block as one occurrence of `stage`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, (time.perf_counter() - start) * 1000)
+
+
+def traced(stage: str):
+    """Decorator form of span() for coroutine functions."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with span(stage):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def incr(counter: str, amount: int = 1) -> None:
+    metrics = _current.get()
+    if metrics is not None:
+        metrics["counters"][counter] = metrics["counters"].get(counter, 0) + amount
+
+
+def record_http(service: str, status: int) -> None:
+    incr(f"{service}.requests")
+    incr(f"{service}.status.{status}")
+
+
+def record_usage(response) -> None:
+    """Adds the prompt/completion token counts of an OpenAI response."""
+    usage = getattr(response, "usage", None)
+    metrics = _current.get()
+    if usage is None or metrics is None:
+        return
+    tokens = metrics["tokens"]
+    for field in ("prompt_tokens", "completion_tokens", "total_tokens"):
+        tokens[field] = tokens.get(field, 0) + (getattr(usage, field, 0) or 0)
+    incr("openai.calls")
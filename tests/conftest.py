@@ -0,0 +1,36 @@
+# File: tests/conftest.py
+"""
+The function apps validate their settings on import; the tests never reach
+Azure OpenAI, GitHub or Table Storage, so placeholders are enough.
+"""
+import os
+
+os.environ.setdefault("AZURE_OPENAI_KEY", "test")
+os.environ.setdefault("GITHUB_TOKEN", "test")
+os.environ.setdefault("SESSION_BACKEND", "memory")
+os.environ.setdefault("COMMIT_COALESCE_WINDOW", "0")
+
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def on_github(monkeypatch):
+    """
+    Runs a coroutine function with GitHub served by a benchmarks.fakes
+    FakeGitHub: on_github(fake, work) -> what `work()` returns.
+    """
+    import config.clients as clients
+    from update_content import doc_cache
+
+    def run(github, work):
+        async def main():
+            monkeypatch.setattr(clients, "_http_session", github)
+            monkeypatch.setattr(clients, "_http_loop", asyncio.get_running_loop())
+            return await work()
+        return asyncio.run(main())
+
+    doc_cache.invalidate()
+    yield run
+    doc_cache.invalidate()
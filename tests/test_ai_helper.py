@@ -0,0 +1,51 @@
+# File: tests/test_ai_helper.py
+import asyncio
+
+import pytest
+
+from benchmarks.synthetic import generate_portfolio
+from update_content import github_helper, search_index
+from update_content.ai_helper import edit_experience, edit_project
+from update_content.commit_queue import CommitQueue, MemoryDocuments
+from update_content.html_parser import parse_html
+from update_content.portfolio_model import extract
+from update_content.replies import render_reply
+
+
+@pytest.fixture
+def docs():
+    docs = MemoryDocuments({"index.html": generate_portfolio(3).replace(">Project 1<", ">Weather Dashboard<")})
+    github_helper.set_commit_queue(CommitQueue(docs.commit, window=0))
+    yield docs
+    github_helper.set_commit_queue(None)
+
+
+def test_reply_names_the_fuzzy_matched_project(docs):
+    args = {"project": {"title": "Wether Dashbord", "description": "Forecasts"}}
+    result = asyncio.run(edit_project(**args))
+    assert result["title"] == "Weather Dashboard"
+    reply = render_reply([("update_project", args, result)])
+    assert "“Weather Dashboard”" in reply and "Wether" not in reply
+
+
+def test_reply_names_the_fuzzy_matched_experience(docs):
+    args = {"experience": {"role": "Enginer 2", "company": "Compny 2", "description": "Shipped"}}
+    result = asyncio.run(edit_experience(**args))
+    assert (result["role"], result["company"]) == ("Engineer 2", "Company 2")
+    assert render_reply([("update_experience", args, result)]).startswith("Updated Engineer 2 at Company 2")
+
+
+def test_search_index_is_built_once_per_page_version():
+    built = []
+
+    def build():
+        built.append(1)
+        return extract(parse_html(generate_portfolio(2)))
+
+    async def run():
+        first = await search_index.for_document("sha-search", build)
+        return first, await search_index.for_document("sha-search", build)
+
+    first, second = asyncio.run(run())
+    assert first is second and len(built) == 1
+    assert first.search("Project 1", kind="project")[0][2].title == "Project 1"
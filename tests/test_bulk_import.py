@@ -0,0 +1,90 @@
+# File: tests/test_bulk_import.py
+import json
+import asyncio
+
+import azure.functions as func
+import pytest
+
+import bulk_import
+from benchmarks.synthetic import generate_portfolio
+from bulk_import.records import parse_body, prepare
+from update_content import github_helper
+from update_content.commit_queue import CommitQueue, MemoryDocuments
+from update_content.html_parser import parse_html
+from update_content.portfolio_model import extract
+
+NEW_PROJECT = {"type": "project", "title": "Bulk CLI", "description": "Imported.", "technologies": ["Go"]}
+# entry 1 names its company in plain text, so it has nothing to put a link on
+UNLINKABLE = generate_portfolio(3).replace(
+    '<span class="place"><a href="https://company1.example.com" target="_blank">Company 1</a></span>', "Company 1 ")
+
+
+@pytest.fixture
+def docs():
+    docs = MemoryDocuments({"index.html": UNLINKABLE})
+    github_helper.set_commit_queue(CommitQueue(docs.commit, window=0))
+    yield docs
+    github_helper.set_commit_queue(None)
+
+
+def _import(records) -> tuple[int, dict]:
+    body = records if isinstance(records, bytes) else json.dumps(records).encode()
+    resp = asyncio.run(bulk_import.main(func.HttpRequest("POST", "/api/bulk_import", headers={}, body=body)))
+    return resp.status_code, json.loads(resp.get_body())
+
+
+def test_body_may_be_an_array_an_object_or_jsonl():
+    records = [NEW_PROJECT, {"experience": {"role": "Engineer 1"}}]
+    assert parse_body(json.dumps(records).encode()) == records
+    assert parse_body(json.dumps({"records": records}).encode()) == records
+    assert parse_body(json.dumps(NEW_PROJECT).encode()) == [NEW_PROJECT]
+    assert parse_body(("﻿" + "\n".join(json.dumps(r) for r in records) + "\n\n").encode()) == records
+    assert parse_body(b"  ") == []
+    with pytest.raises(ValueError, match="line 2"):
+        parse_body(json.dumps(NEW_PROJECT).encode() + b"\n{not json")
+
+
+def test_records_are_validated_and_deduplicated():
+    entries = prepare([
+        NEW_PROJECT,
+        {"type": "talk", "title": "Keynote"},
+        ["not", "an", "object"],
+        {"project": {"title": "  bulk   CLI "}},
+        {"experience": {"role": "Engineer 1", "company": "Company 1", "end_date": "Present"}},
+        {"type": "project", "description": "No title"},
+    ])
+    assert [entry["status"] for entry in entries] == [None, "invalid", "invalid", "duplicate", None, "invalid"]
+    assert entries[3]["error"] == "same project as record 0"
+    # an update-only record cannot create an entry
+    assert entries[4]["can_insert"] is False and entries[4]["missing"]
+
+
+def test_records_land_in_one_commit(docs):
+    status, report = _import([NEW_PROJECT, {"experience": {"role": "Engineer 2", "company": "Company 2", "end_date": "Present"}}])
+    assert status == 200 and report["status"] == "success"
+    assert report["summary"] == {"inserted": 1, "updated": 1} and len(docs.commits) == 1
+    model = extract(parse_html(docs.files["index.html"]))
+    assert model.find_project("Bulk CLI").technologies == ["Go"]
+
+
+def test_record_that_fails_partway_leaves_nothing_behind(docs):
+    status, report = _import([
+        NEW_PROJECT,
+        {"experience": {"role": "Engineer 1", "company": "Company 1", "description": "Half applied",
+                        "company_link": "https://company1.example.org"}},
+        {"experience": {"role": "Engineer 2", "company": "Company 2", "description": "Fully applied"}},
+    ])
+    assert status == 200 and report["status"] == "partial"
+    assert [record["status"] for record in report["records"]] == ["inserted", "failed", "updated"]
+    assert "no company element" in report["records"][1]["error"]
+
+    page = docs.files["index.html"]
+    assert "Half applied" not in page and "Fully applied" in page and "Bulk CLI" in page
+    assert len(docs.commits) == 1
+
+
+def test_import_where_every_record_fails_commits_nothing(docs):
+    status, report = _import([{"experience": {"role": "Engineer 9", "company": "Nowhere", "end_date": "2020"}}])
+    assert status == 400 and report["status"] == "error"
+    assert report["error"] == "none of the records could be applied"
+    assert report["records"][0]["status"] == "failed" and docs.commits == []
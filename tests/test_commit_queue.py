@@ -0,0 +1,240 @@
+# File: tests/test_commit_queue.py
+import asyncio
+
+import pytest
+
+from benchmarks.synthetic import generate_portfolio
+from update_content import github_helper
+from update_content.commit_queue import CommitQueue, MemoryDocuments, commit_combined
+from update_content.html_parser import parse_html, update_experience, update_project
+from update_content.portfolio_model import extract, render_changes
+from telemetry import incr, request_metrics
+
+NO_DETAILS = """<html><body>
+<section class="experience section"><div class="section-inner"><div class="content">
+<div class="item"><h3 class="title">Engineer - <span class="place"><a href="#">Acme</a></span><span class="year">(2020 - 2022)</span></h3></div>
+</div></div></section>
+<section class="projects section"><div class="section-inner"><div class="content">
+<div class="item"><h3 class="title"><a href="#">Alpha</a></h3><p class="summary">Alpha desc<br/><b>Technology Stack -</b> Python.</p></div>
+</div></div></section></body></html>"""
+
+
+def _fails_halfway(soup):
+    # changes the page, then gives up
+    update_project(soup, {"title": "Alpha", "link": "https://half.example.com"})
+    raise ValueError("second step failed")
+
+
+def test_failed_edit_is_not_committed_with_the_others():
+    async def run():
+        docs = MemoryDocuments({"index.html": NO_DETAILS})
+        failed = {}
+        result = await commit_combined(docs.commit, [
+            (_fails_halfway, "projects"),
+            (lambda soup: update_project(soup, {"title": "Alpha", "description": "New desc"}), "projects"),
+        ], "index.html", failed)
+        return docs, result, failed
+
+    docs, result, failed = asyncio.run(run())
+    assert list(failed) == [0] and str(failed[0]) == "second step failed"
+    assert result["commit"]["sha"]
+    assert len(docs.commits) == 1
+    assert "half.example.com" not in docs.files["index.html"]
+    assert "New desc" in docs.files["index.html"]
+
+
+def test_commit_combined_raises_when_every_edit_fails():
+    def broken(soup):
+        raise ValueError("no such entry")
+
+    async def run():
+        docs = MemoryDocuments({"index.html": NO_DETAILS})
+        with pytest.raises(ValueError, match="no such entry"):
+            await commit_combined(docs.commit, [(broken, "projects"), (broken, "projects")], "index.html", {})
+        return docs
+
+    assert asyncio.run(run()).commits == []
+
+
+def test_queued_failing_edit_gets_its_own_error():
+    async def run():
+        docs = MemoryDocuments({"index.html": NO_DETAILS})
+        queue = CommitQueue(docs.commit, window=0.01)
+        results = await asyncio.gather(
+            queue.submit(_fails_halfway, "projects"),
+            queue.submit(lambda soup: update_project(soup, {"title": "Alpha", "description": "New desc"}), "projects"),
+            return_exceptions=True,
+        )
+        return docs, results
+
+    docs, (failed, committed) = asyncio.run(run())
+    assert isinstance(failed, ValueError) and str(failed) == "second step failed"
+    assert committed["commit"]["sha"]
+    assert len(docs.commits) == 1
+    assert "half.example.com" not in docs.files["index.html"]
+    assert "New desc" in docs.files["index.html"]
+
+
+def test_edits_run_on_the_document_they_are_given():
+    soups = []
+
+    async def commit(mutate, section, path):
+        soup = parse_html(NO_DETAILS)
+        soups.append(soup)
+        return mutate(soup)
+
+    def remember(soup):
+        soups.append(soup)
+        return soup
+
+    asyncio.run(commit_combined(commit, [(remember, "projects"), (remember, "projects")], "index.html", {}))
+    assert soups[0] is soups[1] is soups[2]
+
+
+class SlowDocuments(MemoryDocuments):
+    """MemoryDocuments whose commits take a while, so later edits find one in flight."""
+
+    async def commit(self, mutate, section, path="index.html"):
+        await asyncio.sleep(0.02)
+        return await super().commit(mutate, section, path)
+
+
+def _describe(title: str, text: str):
+    return lambda soup: update_project(soup, {"title": title, "description": text})
+
+
+def test_lone_edit_is_committed_without_waiting():
+    async def run():
+        docs = MemoryDocuments({"index.html": generate_portfolio(3)})
+        queue = CommitQueue(docs.commit)
+        started = asyncio.get_running_loop().time()
+        await queue.submit(_describe("Project 0", "alone"), "projects")
+        return docs, asyncio.get_running_loop().time() - started
+
+    docs, elapsed = asyncio.run(run())
+    assert len(docs.commits) == 1
+    assert elapsed < 0.1
+
+
+def test_edits_queued_behind_a_commit_share_the_next_one():
+    async def run():
+        docs = SlowDocuments({"index.html": generate_portfolio(3)})
+        queue = CommitQueue(docs.commit)
+        first = asyncio.ensure_future(queue.submit(_describe("Project 0", "first"), "projects"))
+        await asyncio.sleep(0)
+        rest = [queue.submit(_describe(f"Project {i}", f"queued {i}"), "projects") for i in (1, 2)]
+        return docs, await first, await asyncio.gather(*rest)
+
+    docs, first, (second, third) = asyncio.run(run())
+    assert len(docs.commits) == 2
+    assert second is third
+    assert first["commit"]["sha"] != second["commit"]["sha"]
+    for text in ("first", "queued 1", "queued 2"):
+        assert text in docs.files["index.html"]
+
+
+def test_window_coalesces_edits_into_one_commit():
+    async def run():
+        docs = MemoryDocuments({"index.html": generate_portfolio(3)})
+        queue = CommitQueue(docs.commit, window=0.01)
+        results = await asyncio.gather(*(queue.submit(_describe(f"Project {i}", f"edit {i}"), "projects") for i in range(3)))
+        await queue.drain()
+        return docs, results
+
+    docs, results = asyncio.run(run())
+    assert len(docs.commits) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_each_caller_gets_its_own_error():
+    async def run():
+        docs = MemoryDocuments({"index.html": generate_portfolio(3)})
+        queue = CommitQueue(docs.commit, window=0.01)
+        return docs, await asyncio.gather(
+            queue.submit(_describe("Project 0", "ok"), "projects"),
+            queue.submit(_describe("No Such Project", "lost"), "projects"),
+            return_exceptions=True,
+        )
+
+    docs, (ok, error) = asyncio.run(run())
+    assert ok["commit"]["sha"]
+    assert isinstance(error, ValueError) and "No Such Project" in str(error)
+    assert len(docs.commits) == 1
+
+
+def test_commit_failure_reaches_every_caller():
+    async def failing(mutate, section, path="index.html"):
+        raise RuntimeError("GitHub is down")
+
+    async def run():
+        queue = CommitQueue(failing, window=0.01)
+        return await asyncio.gather(
+            queue.submit(_describe("Project 0", "a"), "projects"),
+            queue.submit(_describe("Project 1", "b"), "projects"),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_combined_model_edits_all_reach_the_page():
+    html = generate_portfolio(3)
+
+    async def commit(mutate, section, path):
+        return render_changes(html, mutate(extract(parse_html(html))))
+
+    page = asyncio.run(commit_combined(commit, [
+        (lambda m: m.update_project({"title": "Project 0", "description": "first"}), "projects"),
+        (lambda m: m.update_project({"title": "Project 2", "description": "second"}), "projects"),
+    ], "index.html", {}))
+    model = extract(parse_html(page))
+    assert model.find_project("Project 0").description == "first"
+    assert model.find_project("Project 2").description == "second"
+
+
+def test_batched_tool_call_that_fails_is_left_out_of_the_commit():
+    async def run():
+        docs = MemoryDocuments({"index.html": NO_DETAILS})
+        github_helper.set_commit_queue(CommitQueue(docs.commit))
+        try:
+            results = await github_helper.run_batched([
+                github_helper.submit_edit(_fails_halfway, "projects"),
+                github_helper.submit_edit(lambda soup: update_project(soup, {"title": "Alpha", "description": "New desc"}), "projects"),
+            ])
+        finally:
+            github_helper.set_commit_queue(None)
+        return docs, results
+
+    docs, (failed, committed) = asyncio.run(run())
+    assert isinstance(failed, ValueError)
+    assert committed["commit"]["sha"] and len(docs.commits) == 1
+    assert "half.example.com" not in docs.files["index.html"]
+    assert "New desc" in docs.files["index.html"]
+
+
+def test_details_are_added_to_an_entry_without_them():
+    soup = update_experience(parse_html(NO_DETAILS), {"role": "Engineer", "end_date": "2030", "environment": ["Go"]})
+    entry = extract(soup).find_experience("Engineer", "Acme")
+    assert (entry.end_date, entry.environment) == ("2030", ["Go"])
+
+
+def test_each_group_is_counted_in_its_callers_request():
+    async def commit(mutate, section, path="index.html"):
+        incr("test.commits")
+        await asyncio.sleep(0.02)
+        return {"commit": {"sha": section}}
+
+    async def request(queue, name, delay):
+        await asyncio.sleep(delay)
+        with request_metrics(name) as metrics:
+            await queue.submit(lambda soup: soup, name)
+        return metrics
+
+    async def run():
+        queue = CommitQueue(commit)
+        return await asyncio.gather(request(queue, "first", 0), request(queue, "second", 0.005))
+
+    first, second = asyncio.run(run())
+    assert first["counters"]["test.commits"] == 1
+    assert second["counters"]["test.commits"] == 1
@@ -0,0 +1,97 @@
+# File: tests/test_fast_path.py
+import asyncio
+
+import pytest
+
+from benchmarks.synthetic import generate_portfolio
+from copilot import fast_path
+from update_content import github_helper
+from update_content.commit_queue import CommitQueue, MemoryDocuments
+from update_content.html_parser import parse_html, index_for
+from update_content.portfolio_model import extract
+
+
+@pytest.fixture
+def docs():
+    docs = MemoryDocuments({"index.html": generate_portfolio(3)})
+    github_helper.set_commit_queue(CommitQueue(docs.commit, window=0.01))
+    yield docs
+    github_helper.set_commit_queue(None)
+
+
+def _command(html: str, message: str) -> fast_path.Command:
+    return fast_path.build(index_for(parse_html(html)), fast_path.parse(message))
+
+
+def test_parse_recognizes_list_edits():
+    intent = fast_path.parse("add Rust, Go to technologies of project Project 1")
+    assert (intent.op, intent.field, intent.target, intent.value) == ("add", "technologies", "project Project 1", ["Rust", "Go"])
+    assert fast_path.parse("what does Project 1 do?") is None
+
+
+def test_concurrent_list_edits_are_both_kept(docs):
+    html = docs.files["index.html"]
+    rust = _command(html, "add Rust to technologies of project Project 1")
+    kotlin = _command(html, "add Kotlin to technologies of project Project 1")
+
+    async def run():
+        return await asyncio.gather(fast_path.dispatch(rust), fast_path.dispatch(kotlin))
+
+    results = asyncio.run(run())
+    assert all(result["status"] == "success" for result in results)
+    technologies = extract(parse_html(docs.files["index.html"])).find_project("Project 1").technologies
+    assert "Rust" in technologies and "Kotlin" in technologies
+
+
+def test_removal_is_applied_to_the_committed_list(docs):
+    html = docs.files["index.html"]
+    add = _command(html, "add Kotlin to technologies of project Project 0")
+    remove = _command(html, "remove Python from technologies of project Project 0")
+
+    async def run():
+        await fast_path.dispatch(add)
+        await fast_path.dispatch(remove)
+
+    asyncio.run(run())
+    technologies = extract(parse_html(docs.files["index.html"])).find_project("Project 0").technologies
+    assert "Kotlin" in technologies and "Python" not in technologies
+
+
+def test_new_start_date_keeps_the_committed_end_date(docs):
+    html = docs.files["index.html"]
+    end = _command(html, "set the end date of Engineer 2 at Company 2 to 2030")
+    start = _command(html, "set the start date of Engineer 2 at Company 2 to 2001")
+
+    async def run():
+        await asyncio.gather(fast_path.dispatch(end), fast_path.dispatch(start))
+
+    asyncio.run(run())
+    entry = extract(parse_html(docs.files["index.html"])).find_experience("Engineer 2", "Company 2", exact=True)
+    assert (entry.start_date, entry.end_date) == ("2001", "2030")
+
+
+@pytest.mark.parametrize("title, typed", [
+    ("Capstone Project", "Capstone Project"),
+    ("Project Atlas", "Project Atlas"),
+    ("Project Atlas", "project Project Atlas"),
+    ("Atlas", "the project Atlas"),
+])
+def test_project_titles_match_as_typed_first(title, typed):
+    html = generate_portfolio(1).replace(">Project 0<", f">{title}<")
+    command = _command(html, f"change description of {typed} to Rebuilt")
+    assert command is not None and command.args["project"]["title"] == title
+
+
+def test_company_link_is_committed(docs):
+    command = _command(docs.files["index.html"], "set the company link of Engineer 1 at Company 1 to https://new.example.com")
+    asyncio.run(fast_path.dispatch(command))
+    entry = extract(parse_html(docs.files["index.html"])).find_experience("Engineer 1", "Company 1", exact=True)
+    assert entry.company_link == "https://new.example.com"
+
+
+def test_new_description_keeps_the_technology_stack(docs):
+    before = extract(parse_html(docs.files["index.html"])).find_project("Project 1").technologies
+    asyncio.run(fast_path.dispatch(_command(docs.files["index.html"], "change description of project Project 1 to Rebuilt")))
+    project = extract(parse_html(docs.files["index.html"])).find_project("Project 1")
+    assert project.description == "Rebuilt"
+    assert project.technologies == before != []
@@ -0,0 +1,137 @@
+# File: tests/test_github_client.py
+import asyncio
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+
+from benchmarks.fakes import _Response
+from update_content import github_client
+from update_content.github_client import GitHubError, request, stats
+from telemetry import request_metrics
+
+NOW = 1_700_000_000.0
+
+
+class _Failing:
+    def __init__(self, error: Exception):
+        self.error = error
+
+    async def __aenter__(self):
+        raise self.error
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class ScriptedGitHub:
+    """Answers each request with the next of `script`: a _Response, or an exception to raise."""
+    closed = False
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.methods = []
+
+    def request(self, method, url, params=None, json=None, headers=None, timeout=None):
+        self.methods.append(method)
+        answer = self.script.pop(0)
+        return _Failing(answer) if isinstance(answer, Exception) else answer
+
+
+@pytest.fixture
+def github(monkeypatch):
+    """
+    Runs request() against a ScriptedGitHub on a clock that starts at NOW
+    and only moves when request() waits; the waits are recorded.
+    """
+    import config.clients as clients
+    waits = []
+    clock = SimpleNamespace(now=NOW)
+
+    async def wait(seconds, stage):
+        if seconds > 0:
+            waits.append((stage, round(seconds, 1)))
+            clock.now += seconds
+
+    monkeypatch.setattr(github_client, "time", SimpleNamespace(time=lambda: clock.now))
+    monkeypatch.setattr(github_client, "_wait", wait)
+    monkeypatch.setattr(github_client, "_backoff", lambda attempt: 0.0)
+    monkeypatch.setattr(github_client, "_counters", dict.fromkeys(github_client._counters, 0))
+    monkeypatch.setattr(github_client, "_budget", {"limit": None, "remaining": None, "reset": 0.0})
+
+    def run(session, *calls):
+        async def main():
+            monkeypatch.setattr(clients, "_http_session", session)
+            monkeypatch.setattr(clients, "_http_loop", asyncio.get_running_loop())
+            with request_metrics("test") as metrics:
+                results = [await call() for call in calls]
+            return results, metrics
+        return asyncio.run(main())
+
+    run.waits = waits
+    return run
+
+
+def test_reads_are_retried(github):
+    session = ScriptedGitHub(_Response(502, {}), aiohttp.ClientConnectionError("reset"), _Response(200, {"sha": "abc"}))
+    [resp], metrics = github(session, lambda: request("GET", "contents/index.html"))
+
+    assert resp.data == {"sha": "abc"} and session.methods == ["GET"] * 3
+    assert metrics["counters"]["github.retries"] == 2
+
+
+def test_writes_are_not_retried(github):
+    for failure in (_Response(502, {"message": "bad gateway"}), aiohttp.ClientConnectionError("reset")):
+        session = ScriptedGitHub(failure, _Response(200, {}))
+        with pytest.raises(GitHubError):
+            github(session, lambda: request("PUT", "contents/index.html", json={}))
+        assert session.methods == ["PUT"]
+
+
+def test_error_carries_status_and_body(github):
+    session = ScriptedGitHub(_Response(422, {"message": "Update is not a fast forward"}))
+    with pytest.raises(GitHubError) as raised:
+        github(session, lambda: request("PATCH", "git/refs/heads/main", json={}))
+    assert raised.value.status == 422
+    assert "Update is not a fast forward" in str(raised.value)
+
+
+def test_rate_limits_are_waited_out_even_for_writes(github):
+    reset = NOW + 5
+    session = ScriptedGitHub(
+        _Response(403, {}, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset)}),
+        _Response(200, {"sha": "abc"}),
+        _Response(429, {}, {"Retry-After": "3"}),
+        _Response(201, {"sha": "def"}),
+    )
+    github(session, lambda: request("GET", "contents/index.html"), lambda: request("PUT", "contents/index.html", json={}))
+
+    assert session.methods == ["GET", "GET", "PUT", "PUT"]
+    assert [stage for stage, _ in github.waits] == ["github.rate_limit", "github.rate_limit"]
+    assert github.waits[0][1] == 5 and github.waits[1][1] == 3
+
+
+def test_low_budget_spreads_requests_over_the_window(github):
+    reset = NOW + 100
+    session = ScriptedGitHub(
+        _Response(200, {}, {"X-RateLimit-Remaining": "9", "X-RateLimit-Reset": str(reset)}),
+        _Response(200, {}),
+    )
+    github(session, lambda: request("GET", "contents/a.html"), lambda: request("GET", "contents/b.html"))
+
+    # nine requests left for 100 seconds: one every ten
+    [(stage, seconds)] = github.waits
+    assert stage == "github.throttle" and seconds == 10
+
+
+def test_counters_cover_retries_and_conditional_reads(github):
+    session = ScriptedGitHub(_Response(503, {}), _Response(200, {}), _Response(304, None, {"ETag": '"abc"'}))
+    [_, not_modified], metrics = github(session, lambda: request("GET", "contents/index.html"),
+                                        lambda: request("GET", "contents/index.html", etag='"abc"'))
+
+    assert not_modified.status == 304 and not_modified.data is None
+    assert {k: stats()[k] for k in ("requests", "retries", "not_modified")} == {"requests": 3, "retries": 1, "not_modified": 1}
+    assert metrics["counters"]["github.requests"] == 3
+    assert metrics["counters"]["github.retries"] == 1
+    assert metrics["counters"]["github.not_modified"] == 1
+    assert stats()["rate_limit"]["remaining"] == 5000
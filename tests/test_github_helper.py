@@ -0,0 +1,98 @@
+# File: tests/test_github_helper.py
+import base64
+
+import pytest
+
+from benchmarks.fakes import FakeGitHub, _blob_sha
+from benchmarks.synthetic import generate_portfolio
+from update_content import github_helper
+from update_content.github_client import GitHubError
+from update_content.github_helper import MAX_COMMIT_ATTEMPTS, CommitConflictError, commit_files, edit_document
+from update_content.html_parser import parse_html, update_project
+from update_content.portfolio_model import extract
+
+FILES = {"index.html": "<html>one</html>", "data/portfolio.json": "{}", "data/old/notes.txt": "notes"}
+
+
+def test_commit_lists_only_the_directories_of_its_paths(on_github):
+    github = FakeGitHub(FILES)
+    expected = {"index.html": _blob_sha(FILES["index.html"]), "data/portfolio.json": _blob_sha("{}")}
+    on_github(github, lambda: commit_files({"index.html": "<html>two</html>", "data/portfolio.json": "[]"}, "edit", expected))
+
+    assert github.files == {**FILES, "index.html": "<html>two</html>", "data/portfolio.json": "[]"}
+    listed = [(path, params) for method, path, params in github.requests if path.startswith("git/trees/")]
+    assert listed == [("git/trees/tree0", None), ("git/trees/tree0:data", None)]
+
+
+def test_moved_or_new_file_is_a_conflict(on_github):
+    github = FakeGitHub(FILES)
+    for expected in ({"index.html": _blob_sha("<html>stale</html>")},
+                     {"data/old/notes.txt": None},
+                     {"data/new/notes.txt": _blob_sha("notes")}):
+        with pytest.raises(CommitConflictError):
+            on_github(github, lambda: commit_files({"index.html": "x"}, "edit", expected))
+    assert github.commits == []
+
+
+class RacedGitHub(FakeGitHub):
+    """
+    FakeGitHub where another writer commits just before each of the next
+    `races` writes of index.html (a contents PUT or a ref update) lands.
+    """
+
+    def __init__(self, files, races: int):
+        super().__init__(files)
+        self.races = races
+        self.raced = 0
+
+    def _handle(self, method, path, body, headers):
+        if self.races and (method == "PUT" or method == "PATCH"):
+            self.races -= 1
+            self.raced += 1
+            text = self.files["index.html"].replace("</body>", f"<!-- other writer {self.raced} --></body>")
+            self._move(self._advance({**self.files, "index.html": text}, self.head))
+        return super()._handle(method, path, body, headers)
+
+
+def _add_go(soup):
+    return update_project(soup, {"title": "Project 1", "technologies": ["Go"]})
+
+
+@pytest.fixture(params=["splice", "full", "model"])
+def mode(request, monkeypatch):
+    monkeypatch.setattr(github_helper, "EDIT_MODE", request.param)
+    monkeypatch.setattr(github_helper, "RETRY_BASE_DELAY", 0)
+    return request.param
+
+
+def test_conflicting_write_is_retried_on_the_new_version(on_github, mode):
+    github = RacedGitHub({"index.html": generate_portfolio(3)}, races=2)
+    on_github(github, lambda: edit_document(_add_go, "projects"))
+
+    page = github.files["index.html"]
+    assert extract(parse_html(page)).find_project("Project 1").technologies == ["Go"]
+    assert "other writer 1" in page and "other writer 2" in page
+    assert github.conflicts == 2
+
+
+def test_conflicts_give_up_after_max_commit_attempts(on_github, mode):
+    github = RacedGitHub({"index.html": generate_portfolio(3)}, races=MAX_COMMIT_ATTEMPTS + 1)
+    with pytest.raises((CommitConflictError, GitHubError)) as raised:
+        on_github(github, lambda: edit_document(_add_go, "projects"))
+
+    assert raised.value.status in (409, 422)
+    assert github.raced == MAX_COMMIT_ATTEMPTS and github.conflicts == MAX_COMMIT_ATTEMPTS
+    assert "Go" not in github.files["index.html"]
+
+
+def test_failed_mutation_is_not_retried(on_github, mode):
+    calls = []
+
+    def broken(soup):
+        calls.append(1)
+        raise ValueError("no such project")
+
+    github = FakeGitHub({"index.html": generate_portfolio(3)})
+    with pytest.raises(ValueError):
+        on_github(github, lambda: edit_document(broken, "projects"))
+    assert len(calls) == 1 and github.commits == []
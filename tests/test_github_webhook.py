@@ -0,0 +1,91 @@
+# File: tests/test_github_webhook.py
+import hmac
+import json
+import hashlib
+
+import azure.functions as func
+import pytest
+
+import github_webhook
+from benchmarks.fakes import FakeGitHub, _blob_sha
+from config.env import GITHUB_BRANCH, GITHUB_REPO
+from update_content import doc_cache
+
+SECRET = "webhook-test-secret"
+OLD, NEW, ABOUT = "<html><p>old</p></html>", "<html><p>new</p></html>", "<html><p>about</p></html>"
+
+
+@pytest.fixture(autouse=True)
+def secret(monkeypatch):
+    monkeypatch.setattr(github_webhook, "GITHUB_WEBHOOK_SECRET", SECRET)
+
+
+def _sign(body: bytes) -> str:
+    return "sha256=" + hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+
+
+def _delivery(event: str, payload: dict, signature: str | None = "valid") -> func.HttpRequest:
+    body = json.dumps(payload).encode()
+    headers = {"X-GitHub-Event": event, "Content-Type": "application/json"}
+    if signature is not None:
+        headers["X-Hub-Signature-256"] = _sign(body) if signature == "valid" else signature
+    return func.HttpRequest("POST", "/api/github_webhook", headers=headers, body=body)
+
+
+def _push(**fields) -> dict:
+    return {"ref": f"refs/heads/{GITHUB_BRANCH}", "repository": {"full_name": GITHUB_REPO}, "after": "c1", **fields}
+
+
+def _answer(on_github, github, req) -> tuple[int, dict]:
+    resp = on_github(github, lambda: github_webhook.main(req))
+    return resp.status_code, json.loads(resp.get_body())
+
+
+def test_signed_delivery_is_accepted(on_github):
+    assert _answer(on_github, FakeGitHub({}), _delivery("ping", {"zen": "Keep it simple."})) == (200, {"status": "pong"})
+
+
+@pytest.mark.parametrize("signature", [None, "sha256=" + "0" * 64, "sha1=abc"], ids=["missing", "wrong", "not sha256"])
+def test_unsigned_or_missigned_delivery_is_refused(on_github, signature):
+    github = FakeGitHub({"index.html": NEW})
+    doc_cache.store("index.html", _blob_sha(OLD), OLD)
+
+    status, report = _answer(on_github, github, _delivery("push", _push(commits=[{"modified": ["index.html"]}]), signature))
+    assert status == 401 and report["error"] == "invalid signature"
+    assert github.requests == [] and doc_cache.get("index.html")["html"] == OLD
+
+
+def test_signature_must_cover_the_body():
+    body = b'{"ref": "refs/heads/main"}'
+    assert github_webhook.verify_signature(body, _sign(body), SECRET)
+    assert not github_webhook.verify_signature(body + b" ", _sign(body), SECRET)
+
+
+def test_push_refreshes_the_changed_cached_paths(on_github):
+    github = FakeGitHub({"index.html": NEW, "about.html": ABOUT, "notes.md": "notes"})
+    doc_cache.store("index.html", _blob_sha(OLD), OLD)
+    doc_cache.store("about.html", _blob_sha(ABOUT), ABOUT)
+    doc_cache.store("gone.html", _blob_sha(OLD), OLD)
+    push = _push(commits=[{"modified": ["index.html", "about.html"]}, {"added": ["notes.md"], "removed": ["gone.html"]}])
+
+    status, report = _answer(on_github, github, _delivery("push", push))
+    assert status == 200
+    assert report == {"status": "success", "changed": 4, "invalidated": ["gone.html"],
+                      "refreshed": ["index.html"], "unchanged": ["about.html"]}
+    index = doc_cache.get("index.html")
+    assert (index["sha"], index["html"]) == (_blob_sha(NEW), NEW) and index["soup"] is not None
+    assert doc_cache.get("gone.html") is None and doc_cache.get("notes.md") is None
+
+
+def test_push_that_does_not_list_its_files_drops_the_cache(on_github):
+    doc_cache.store("index.html", _blob_sha(OLD), OLD)
+    status, report = _answer(on_github, FakeGitHub({}), _delivery("push", _push(forced=True, commits=[])))
+    assert (status, report) == (200, {"status": "success", "invalidated": "all"})
+    assert doc_cache.get("index.html") is None
+
+
+def test_push_to_another_branch_is_ignored(on_github):
+    doc_cache.store("index.html", _blob_sha(OLD), OLD)
+    push = _push(ref="refs/heads/feature", commits=[{"modified": ["index.html"]}])
+    status, report = _answer(on_github, FakeGitHub({"index.html": NEW}), _delivery("push", push))
+    assert report["status"] == "ignored" and doc_cache.get("index.html")["html"] == OLD
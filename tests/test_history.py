@@ -0,0 +1,45 @@
+# File: tests/test_history.py
+import asyncio
+
+import pytest
+
+from copilot import history
+
+
+@pytest.fixture
+def folds(monkeypatch):
+    calls = []
+
+    async def fold(summary, turns):
+        calls.append(len(turns))
+        return f"{summary}+{len(turns)}"
+
+    monkeypatch.setattr(history, "_fold", fold)
+    monkeypatch.setattr(history, "HISTORY_KEEP_TURNS", 3)
+    monkeypatch.setattr(history, "HISTORY_TOKEN_BUDGET", 10_000)
+    return calls
+
+
+def _turns(count: int) -> list:
+    return [m for i in range(count) for m in ({"role": "user", "content": f"ask {i}"},
+                                               {"role": "assistant", "content": f"reply {i}"})]
+
+
+def test_history_grows_to_twice_the_kept_turns_without_folding(folds):
+    session = asyncio.run(history.compact("", _turns(6)))
+    assert folds == []
+    assert session["history"] == _turns(6)
+
+
+def test_folding_keeps_only_the_recent_turns(folds):
+    session = asyncio.run(history.compact("s", _turns(7)))
+    assert folds == [4]
+    assert session["summary"] == "s+4"
+    assert session["history"] == _turns(7)[-6:]
+
+
+def test_token_budget_still_forces_a_fold(folds, monkeypatch):
+    monkeypatch.setattr(history, "HISTORY_TOKEN_BUDGET", history.estimate_tokens(_turns(2)))
+    session = asyncio.run(history.compact("", _turns(3)))
+    assert folds == [2]
+    assert len(session["history"]) == 2
@@ -0,0 +1,62 @@
+# File: tests/test_html_parser.py
+import base64
+
+from benchmarks.fakes import FakeGitHub, _blob_sha
+from telemetry import request_metrics
+from update_content import doc_cache, html_parser
+from update_content.html_parser import fetch_portfolio_html
+
+V1, V2 = "<html><p>one</p></html>", "<html><p>two</p></html>"
+
+
+def _fetches(on_github, github, count: int):
+    """Fetches index.html `count` times in one request; returns the results and its counters."""
+    async def work():
+        with request_metrics("test") as metrics:
+            results = [await fetch_portfolio_html() for _ in range(count)]
+        return results, metrics["counters"]
+    return on_github(github, work)
+
+
+def _push(github: FakeGitHub, text: str) -> None:
+    # another writer commits through the contents API
+    github._contents("PUT", "index.html", {"sha": _blob_sha(github.files["index.html"]),
+                                           "content": base64.b64encode(text.encode()).decode()}, {})
+
+
+def test_unchanged_page_is_revalidated_with_its_etag(on_github):
+    github = FakeGitHub({"index.html": V1})
+    results, counters = _fetches(on_github, github, 3)
+
+    assert results == [(V1, _blob_sha(V1))] * 3
+    assert counters["github.requests"] == 3 and counters["github.not_modified"] == 2
+    assert doc_cache.get("index.html")["etag"] == f'"{_blob_sha(V1)}"'
+
+
+def test_parsed_page_survives_a_304(on_github):
+    github = FakeGitHub({"index.html": V1})
+    _fetches(on_github, github, 1)
+    soup = html_parser.parse_html(V1)
+    doc_cache.attach_soup("index.html", _blob_sha(V1), soup)
+
+    _fetches(on_github, github, 1)
+    assert doc_cache.parsed("index.html", _blob_sha(V1)) is soup
+
+
+def test_changed_page_replaces_the_cached_copy(on_github):
+    github = FakeGitHub({"index.html": V1})
+    _fetches(on_github, github, 1)
+    _push(github, V2)
+
+    [(html, sha)], counters = _fetches(on_github, github, 1)
+    assert (html, sha) == (V2, _blob_sha(V2)) and "github.not_modified" not in counters
+    assert doc_cache.get("index.html")["sha"] == _blob_sha(V2)
+
+
+def test_recently_confirmed_page_is_used_without_asking(on_github, monkeypatch):
+    monkeypatch.setattr(html_parser, "DOC_CACHE_MAX_AGE", 60.0)
+    github = FakeGitHub({"index.html": V1})
+    results, counters = _fetches(on_github, github, 3)
+
+    assert results == [(V1, _blob_sha(V1))] * 3
+    assert counters["github.requests"] == 1 and counters["doc_cache.trusted"] == 2
@@ -0,0 +1,36 @@
+# File: tests/test_portfolio_model.py
+from benchmarks.synthetic import generate_portfolio
+from update_content.html_parser import parse_html
+from update_content.portfolio_model import extract, render_changes
+
+MARKED_UP = "Synthetic <a href=\"https://demo.example.com\">demo</a> <em>number</em> 1"
+
+
+def _edit(html: str, update: dict):
+    model = extract(parse_html(html)).copy()
+    model.update_project(update)
+    return render_changes(html, model)
+
+
+def test_plain_card_is_rendered_from_its_record():
+    html = generate_portfolio(3)
+    page = _edit(html, {"title": "Project 1", "link": "https://example.com/new"})
+    assert page is not None
+    assert extract(parse_html(page)).find_project("Project 1").link == "https://example.com/new"
+
+
+def test_card_with_inline_markup_goes_through_the_page():
+    html = generate_portfolio(3).replace("Synthetic project number 1", MARKED_UP)
+    assert _edit(html, {"title": "Project 1", "link": "https://example.com/new"}) is None
+    # other cards are still rendered from their records
+    assert _edit(html, {"title": "Project 2", "link": "https://example.com/new"}) is not None
+
+
+def test_card_with_extra_attributes_goes_through_the_page():
+    html = generate_portfolio(3)
+    card = '<div class="item">\n          <h3 class="title"><a href="https://github.com/example/project-1"'
+    for marked in (html.replace(card, card.replace('class="item"', 'class="item featured"')),
+                   html.replace('href="https://github.com/example/project-1" target="_blank"',
+                                'href="https://github.com/example/project-1" target="_blank" rel="noopener"'),
+                   html.replace('<p class="summary">Synthetic project number 1', '<p class="summary" id="p1">Synthetic project number 1')):
+        assert _edit(marked, {"title": "Project 1", "technologies": ["Go"]}) is None
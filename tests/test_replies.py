@@ -0,0 +1,53 @@
+# File: tests/test_replies.py
+from update_content.replies import commit_url, render_reply
+
+COMMIT = {"commit": {"sha": "abc", "html_url": "https://github.com/o/r/commit/abc"},
+          "content": {"html_url": "https://github.com/o/r/blob/main/index.html"}}
+
+
+def _ok(**fields) -> dict:
+    return {"status": "success", "commit": COMMIT, **fields}
+
+
+def test_each_tool_has_a_template():
+    calls = [
+        ("add_project", {"project": {"title": "Bulk CLI"}}, _ok()),
+        ("add_experience", {"experience": {"role": "Engineer", "company": "Acme"}}, _ok()),
+        ("update_project", {"project": {"title": "Bulk CLI", "link": "https://x", "technologies": ["Go"]}}, _ok()),
+        ("update_experience", {"experience": {"role": "Engineer", "end_date": "Present"}}, _ok()),
+    ]
+    assert render_reply(calls) == (
+        "Added the project “Bulk CLI” to your Projects section."
+        " Added Engineer at Acme to your Experience section."
+        " Updated the project “Bulk CLI” (link and technology stack)."
+        " Updated Engineer at the company (end date)."
+        " Commit: https://github.com/o/r/commit/abc"
+    )
+
+
+def test_changed_fields_are_listed_in_a_fixed_order():
+    args = {"project": {"title": "A", "technologies": ["Go"], "description": "d", "link": "l"}}
+    assert render_reply([("update_project", args, _ok())]).startswith(
+        "Updated the project “A” (description, link and technology stack).")
+    assert render_reply([("update_project", {"project": {"title": "A"}}, _ok())]).startswith("Updated the project “A”.")
+
+
+def test_distinct_commits_are_all_linked():
+    other = {"commit": {"html_url": "https://github.com/o/r/commit/def"}}
+    reply = render_reply([("add_project", {"project": {"title": "A"}}, _ok()),
+                          ("add_project", {"project": {"title": "B"}}, _ok(commit=other))])
+    assert reply.endswith("Commit: https://github.com/o/r/commit/abc, https://github.com/o/r/commit/def")
+
+
+def test_commit_url_falls_back_to_the_file_then_the_result():
+    assert commit_url({"commit": {"content": {"html_url": "https://f"}}}) == "https://f"
+    assert commit_url({"commit_url": "https://c"}) == "https://c"
+    assert commit_url({}) is None
+
+
+def test_model_writes_the_reply_when_a_call_cannot_be_templated():
+    done = ("add_project", {"project": {"title": "A"}}, _ok())
+    assert render_reply([]) is None
+    assert render_reply([done, ("search_portfolio", {"query": "Go"}, _ok())]) is None
+    assert render_reply([done, ("add_project", {"project": {"title": "B"}}, {"status": "error", "error": "boom"})]) is None
+    assert render_reply([done, ("add_project", {"project": {"title": "B"}}, ValueError("boom"))]) is None
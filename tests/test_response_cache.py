@@ -0,0 +1,58 @@
+# File: tests/test_response_cache.py
+import pytest
+
+from copilot import response_cache
+from update_content import doc_cache
+
+SYSTEM = [{"role": "system", "content": "You are an AI agent for managing a portfolio website."}]
+ASKED_ABOUT_PROJECTS = SYSTEM + [
+    {"role": "user", "content": "Which projects use Go?"},
+    {"role": "assistant", "content": "Project 1 and Project 2."},
+]
+
+
+@pytest.fixture(autouse=True)
+def empty():
+    response_cache.clear()
+    doc_cache.invalidate()
+    doc_cache.store("index.html", "sha1", "<html></html>")
+    yield
+    response_cache.clear()
+    doc_cache.invalidate()
+
+
+def test_unanswered_question_cannot_hit():
+    assert not response_cache.may_hit("alice", SYSTEM, "What is on my page?")
+
+
+def test_reply_is_found_again_in_the_same_conversation():
+    response_cache.remember("alice", SYSTEM, "What is on my page?", "Three projects.")
+
+    assert response_cache.may_hit("alice", SYSTEM, "what is on my page")
+    assert response_cache.get(response_cache.make_key("alice", SYSTEM, "what is on my page", "sha1")) == "Three projects."
+
+
+def test_users_never_share_an_entry():
+    response_cache.remember("alice", SYSTEM, "What did I just ask?", "You asked about Go.")
+    assert not response_cache.may_hit("bob", SYSTEM, "What did I just ask?")
+    assert response_cache.get(response_cache.make_key("bob", SYSTEM, "What did I just ask?", "sha1")) is None
+
+
+def test_conversations_never_share_an_entry():
+    response_cache.remember("alice", ASKED_ABOUT_PROJECTS, "the first one", "Project 1 is a CLI.")
+    assert not response_cache.may_hit("alice", SYSTEM, "the first one")
+    assert not response_cache.may_hit("alice", ASKED_ABOUT_PROJECTS[:-1], "the first one")
+
+
+def test_new_page_version_retires_the_reply():
+    response_cache.remember("alice", SYSTEM, "What is on my page?", "Three projects.")
+    doc_cache.store("index.html", "sha2", "<html>changed</html>")
+
+    assert not response_cache.may_hit("alice", SYSTEM, "What is on my page?")
+    assert response_cache.get(response_cache.make_key("alice", SYSTEM, "What is on my page?", "sha1")) is None
+
+
+def test_reply_is_not_cached_without_a_page_version():
+    doc_cache.invalidate()
+    response_cache.remember("alice", SYSTEM, "What is on my page?", "Three projects.")
+    assert not response_cache.may_hit("alice", SYSTEM, "What is on my page?")
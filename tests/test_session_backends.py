@@ -0,0 +1,121 @@
+# File: tests/test_session_backends.py
+import asyncio
+
+import pytest
+
+from copilot import session_manager
+from copilot.session_backends import MemorySessionBackend, SessionConflictError, SqliteSessionBackend
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemorySessionBackend()
+    return SqliteSessionBackend(str(tmp_path / "sessions.db"))
+
+
+def test_write_needs_the_current_etag(backend):
+    async def run():
+        etag = await backend.write("alice", {"summary": "one"}, None)
+        newer = await backend.write("alice", {"summary": "two"}, etag)
+        with pytest.raises(SessionConflictError):
+            await backend.write("alice", {"summary": "stale"}, etag)
+        with pytest.raises(SessionConflictError):
+            await backend.write("alice", {"summary": "again"}, None)
+        return newer, await backend.read("alice")
+
+    newer, (data, etag) = asyncio.run(run())
+    assert data == {"summary": "two"} and etag == newer
+
+
+def test_delete_removes_the_session(backend):
+    async def run():
+        await backend.write("alice", {"summary": "one"}, None)
+        await backend.delete("alice")
+        return await backend.read("alice")
+
+    assert asyncio.run(run()) is None
+
+
+class CountingBackend(MemorySessionBackend):
+    """MemorySessionBackend that counts its writes and can make them slow."""
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__()
+        self.delay = delay
+        self.writes = 0
+
+    async def write(self, user_id, data, etag):
+        self.writes += 1
+        await asyncio.sleep(self.delay)
+        return await super().write(user_id, data, etag)
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    def install(backend, write_behind=False):
+        monkeypatch.setattr(session_manager, "_backend", backend)
+        monkeypatch.setattr(session_manager, "SESSION_WRITE_BEHIND", write_behind)
+        return backend
+
+    session_manager._cache.clear()
+    yield install
+    session_manager._cache.clear()
+    session_manager._flushes.clear()
+
+
+def test_unchanged_session_is_not_written_again(sessions):
+    backend = sessions(CountingBackend())
+
+    async def run():
+        await session_manager.save_user_session("alice", {"summary": "one"})
+        await session_manager.save_user_session("alice", {"summary": "one"})
+
+    asyncio.run(run())
+    assert backend.writes == 1
+
+
+def test_conflicting_save_raises_and_forgets_the_local_copy(sessions):
+    backend = sessions(CountingBackend())
+
+    async def run():
+        await session_manager.save_user_session("alice", {"summary": "one"})
+        # another worker saves the session in between
+        _, etag = await backend.read("alice")
+        await backend.write("alice", {"summary": "elsewhere"}, etag)
+        with pytest.raises(SessionConflictError):
+            await session_manager.save_user_session("alice", {"summary": "two"})
+        return await session_manager.get_user_session("alice")
+
+    assert asyncio.run(run()) == {"summary": "elsewhere"}
+
+
+def test_write_behind_merges_saves_made_during_a_flush(sessions):
+    backend = sessions(CountingBackend(delay=0.01), write_behind=True)
+
+    async def run():
+        await session_manager.save_user_session("alice", {"summary": "0"})
+        await asyncio.sleep(0.005)
+        # the first write is in flight; these four share the next one
+        for i in range(1, 5):
+            await session_manager.save_user_session("alice", {"summary": str(i)})
+        await session_manager.flush_sessions()
+        return await backend.read("alice")
+
+    data, _ = asyncio.run(run())
+    assert data == {"summary": "4"}
+    assert backend.writes == 2
+
+
+def test_delete_waits_for_a_pending_flush(sessions):
+    backend = sessions(CountingBackend(delay=0.01), write_behind=True)
+
+    async def run():
+        await session_manager.save_user_session("alice", {"summary": "one"})
+        await session_manager.delete_user_session("alice")
+        await session_manager.flush_sessions()
+        return await backend.read("alice"), await session_manager.get_user_session("alice")
+
+    stored, session = asyncio.run(run())
+    assert stored is None and session == {}
+    assert backend.writes == 1
@@ -0,0 +1,61 @@
+# File: tests/test_session_codec.py
+import json
+
+import pytest
+
+from copilot import session_codec
+from copilot.session_codec import CHUNK_BYTES, MAX_CHUNKS, SessionTooLargeError, decode, encode, from_entity, to_entity
+
+SESSION = {"summary": "Talked about projects.", "history": [{"role": "user", "content": "Add my Go CLI, ñ ✓"}] * 50}
+
+
+def _sized(blob_bytes: int) -> dict:
+    """A session whose uncompressed blob is exactly `blob_bytes` long."""
+    overhead = len(encode({"x": ""}, "none"))
+    return {"x": "a" * (blob_bytes - overhead)}
+
+
+@pytest.mark.parametrize("codec", ["zlib", "zstd", "none"])
+def test_every_codec_round_trips(codec):
+    if codec == "zstd":
+        pytest.importorskip("zstandard")
+    blob = encode(SESSION, codec)
+    assert blob[:2] == bytes((session_codec.FORMAT_VERSION, session_codec._CODECS[codec]))
+    assert decode(blob) == SESSION
+    assert from_entity(to_entity(SESSION, codec)) == SESSION
+
+
+def test_zstd_without_the_package_falls_back_to_zlib(monkeypatch):
+    monkeypatch.setattr(session_codec, "_zstd", lambda: None)
+    blob = encode(SESSION, "zstd")
+    assert blob[1] == session_codec._CODECS["zlib"] and decode(blob) == SESSION
+
+
+def test_incompressible_session_is_stored_uncompressed():
+    assert encode({"x": ""}, "zlib")[1] == session_codec._CODECS["none"]
+
+
+def test_blob_is_split_at_chunk_bytes():
+    props = to_entity(_sized(CHUNK_BYTES), "none")
+    assert props["Chunks"] == 1 and len(props["Data0"]) == CHUNK_BYTES
+
+    props = to_entity(_sized(2 * CHUNK_BYTES + 1), "none")
+    assert props["Chunks"] == 3
+    assert [len(props[f"Data{i}"]) for i in range(3)] == [CHUNK_BYTES, CHUNK_BYTES, 1]
+    assert "Data3" not in props
+    assert from_entity(props) == _sized(2 * CHUNK_BYTES + 1)
+
+
+def test_session_beyond_max_chunks_is_refused():
+    assert to_entity(_sized(MAX_CHUNKS * CHUNK_BYTES), "none")["Chunks"] == MAX_CHUNKS
+    with pytest.raises(SessionTooLargeError):
+        to_entity(_sized(MAX_CHUNKS * CHUNK_BYTES + 1), "none")
+
+
+def test_legacy_data_property_is_read():
+    assert from_entity({"PartitionKey": "alice", "Data": json.dumps(SESSION)}) == SESSION
+
+
+def test_foreign_blob_is_rejected():
+    with pytest.raises(ValueError):
+        decode(b"\x01\x01" + encode(SESSION)[2:])
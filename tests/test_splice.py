@@ -0,0 +1,55 @@
+# File: tests/test_splice.py
+import asyncio
+
+import pytest
+
+from benchmarks.fakes import FakeGitHub
+from benchmarks.synthetic import generate_portfolio
+from update_content import github_helper, splice
+from update_content.github_helper import _splice_edit, edit_document, get_formatter
+from update_content.html_parser import parse_html, update_project
+
+HTML = generate_portfolio(3)
+
+
+def _retitle(soup):
+    return update_project(soup, {"title": "Project 1", "technologies": ["Rust", "Go"]})
+
+
+@pytest.fixture(params=[False, True], ids=["unverified", "verified"])
+def verify(request, monkeypatch):
+    monkeypatch.setattr(github_helper, "SPLICE_VERIFY", request.param)
+
+
+def test_text_outside_the_edited_section_is_kept(verify):
+    start, end = splice.find_section(HTML, "projects")
+    spliced = asyncio.run(_splice_edit(HTML, _retitle, "projects"))
+    assert spliced.startswith(HTML[:start])
+    assert spliced.endswith(HTML[end:])
+    assert spliced != HTML
+
+
+def test_spliced_page_reads_as_the_full_render(verify):
+    spliced = asyncio.run(_splice_edit(HTML, _retitle, "projects"))
+    full = _retitle(parse_html(HTML)).prettify(formatter=get_formatter())
+    assert splice.same_document(spliced, full, get_formatter())
+
+
+def test_commented_out_section_is_not_located():
+    start, end = splice.find_section(HTML, "projects")
+    commented = HTML[:start] + "<!--" + HTML[start:end] + "-->" + HTML[end:]
+    assert splice.locate(commented, ["projects"]) is None
+    assert asyncio.run(_splice_edit(commented, _retitle, "projects")) is None
+
+    # an old copy kept in a comment is skipped in favour of the live section
+    kept = HTML[:start] + "<!--\n" + HTML[start:end] + "\n-->\n" + HTML[start:]
+    assert splice.locate(kept, ["projects"]) == [(kept.rindex('<section class="projects'), len(kept) - len(HTML) + end)]
+
+
+def test_edit_falls_back_to_the_whole_page(on_github, monkeypatch):
+    monkeypatch.setattr(github_helper, "EDIT_MODE", "splice")
+    start, end = splice.find_section(HTML, "experience")
+    commented = HTML[:start] + "<!--" + HTML[start:end] + "-->" + HTML[end:]
+    github = FakeGitHub({"index.html": commented})
+    on_github(github, lambda: edit_document(_retitle, "experience"))
+    assert "Rust" in github.files["index.html"] and len(github.commits) == 1
@@ -0,0 +1,162 @@
+# File: tool_registry.py
+"""
+Builds the tool list sent with each model call from function_specs.py.
+
+FUNCTION_SPECS also describes internal plumbing (sessions, commits) that
+the model must never call, and its schemas are written for validation and
+documentation rather than for the prompt. tools_for() exposes only the
+user-facing tools an endpoint actually dispatches, in a compacted form
+(the wrap-up call after tool results sends none):
+
+  - user_id is dropped; the endpoint fills it in from the request
+  - defaults are dropped, and so are oneOf alternatives, whose meaning
+    ("give at least one of these") is stated in the description instead
+  - property descriptions are kept only where they carry a format or an
+    example the name and type do not
+
+validate() checks tool arguments against those schemas, for callers that
+build arguments without the model (the fast path, bulk_import).
+
+The payload for each set of tools is built once per worker. Every call
+records how many prompt tokens it saved against sending all of
+FUNCTION_SPECS (counter "tools.prompt_tokens_saved").
+
+    tools = tools_for(TOOLS)                      # Chat Completions tools=
+    functions = tools_for(TOOLS, style="functions")  # legacy functions=
+"""
+import re
+import copy
+import json
+from function_specs import FUNCTION_SPECS, INTERNAL_TOOLS
+from telemetry import incr
+
+# Arguments the endpoints supply themselves, never the model
+SERVER_FILLED = ("user_id",)
+
+_HINT_RE = re.compile(r"e\.g\.|'[^']+'|\bURL\b")
+
+_SPECS = {spec["name"]: spec for spec in FUNCTION_SPECS}
+_TYPES = {"object": dict, "array": list, "string": str}
+
+# (style, tool names) -> (payload, approx. prompt tokens)
+_payloads: dict[tuple, tuple[list, int]] = {}
+
+
+def estimate_tokens(payload) -> int:
+    """Rough prompt token count (~4 characters per token) of a JSON payload."""
+    return len(json.dumps(payload)) // 4
+
+
+def _first_sentence(text: str) -> str:
+    return text.split(". ")[0].rstrip(".") + "."
+
+
+def _compact_schema(schema: dict) -> dict:
+    out = {}
+    for key, value in schema.items():
+        if key in ("default", "oneOf"):
+            continue
+        if key == "description":
+            if _HINT_RE.search(value):
+                out[key] = value
+        elif key == "properties":
+            out[key] = {name: _compact_schema(prop) for name, prop in value.items() if name not in SERVER_FILLED}
+        elif key == "required":
+            out[key] = [name for name in value if name not in SERVER_FILLED]
+        elif isinstance(value, dict):
+            out[key] = _compact_schema(value)
+        else:
+            out[key] = copy.deepcopy(value)
+    return out
+
+
+def _at_least_one(schema: dict) -> list[str]:
+    """Fields named by the oneOf alternatives of the tool's argument objects."""
+    fields = []
+    for prop in schema.get("properties", {}).values():
+        for alternative in prop.get("oneOf", []):
+            fields.extend(alternative.get("required", []))
+    return fields
+
+
+def compact_spec(spec: dict) -> dict:
+    """The prompt-facing form of one FUNCTION_SPECS entry."""
+    description = _first_sentence(spec["description"])
+    fields = _at_least_one(spec["parameters"])
+    if fields:
+        description += f" Give at least one of: {', '.join(fields)}."
+    return {
+        "name":        spec["name"],
+        "description": description,
+        "parameters":  _compact_schema(spec["parameters"]),
+    }
+
+
+def validate(value, schema: dict, where: str = "") -> list[str]:
+    """
+    Checks `value` against the JSON-schema subset function_specs.py uses
+    (type, properties, required, items, oneOf) and returns the problems.
+    oneOf is read as "at least one alternative", which is what the update
+    schemas mean by it.
+    """
+    expected = schema.get("type")
+    if expected and not isinstance(value, _TYPES[expected]):
+        return [f"{where or 'record'} must be of type {expected}"]
+    errors = []
+    if expected == "object":
+        prefix = f"{where}." if where else ""
+        for name in schema.get("required", []):
+            if name not in value:
+                errors.append(f"missing {prefix}{name}")
+        for name, sub in schema.get("properties", {}).items():
+            if name in value:
+                errors += validate(value[name], sub, f"{prefix}{name}")
+        alternatives = schema.get("oneOf")
+        if alternatives and not any(not validate(value, alt, where) for alt in alternatives):
+            fields = ", ".join(alt["required"][0] for alt in alternatives)
+            errors.append(f"{where or 'record'} needs at least one of: {fields}")
+    elif expected == "array" and "items" in schema:
+        for i, item in enumerate(value):
+            errors += validate(item, schema["items"], f"{where}[{i}]")
+    return errors
+
+
+def exposed_names(handlers) -> list[str]:
+    """
+    The user-facing tools of an endpoint, in FUNCTION_SPECS order: those it
+    has a handler for, minus internal plumbing.
+    """
+    return [name for name in _SPECS if name in handlers and name not in INTERNAL_TOOLS]
+
+
+def _full_tokens(style: str) -> int:
+    key = (style, None)
+    if key not in _payloads:
+        payload = _wrap(FUNCTION_SPECS, style)
+        _payloads[key] = (payload, estimate_tokens(payload))
+    return _payloads[key][1]
+
+
+def _wrap(specs: list, style: str) -> list:
+    if style == "functions":
+        return list(specs)
+    return [{"type": "function", "function": spec} for spec in specs]
+
+
+def tools_for(handlers, style: str = "tools") -> list:
+    """
+    The cached tool payload for an endpoint dispatching through `handlers`,
+    in Chat Completions `tools` form or, with style="functions", the legacy
+    `functions` form. Returns [] when no tool applies; callers should then
+    omit the parameter.
+    """
+    names = tuple(exposed_names(handlers))
+    key = (style, names)
+    cached = _payloads.get(key)
+    if cached is None:
+        payload = _wrap([compact_spec(_SPECS[name]) for name in names], style)
+        cached = _payloads[key] = (payload, estimate_tokens(payload) if names else 0)
+    payload, tokens = cached
+    incr("tools.exposed", len(names))
+    incr("tools.prompt_tokens_saved", _full_tokens(style) - tokens)
+    return payload
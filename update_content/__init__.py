@@ -1,9 +1,11 @@
 import json, os
 import azure.functions as func
-from function_specs import FUNCTION_SPECS
-from openai import AzureOpenAI
+from tool_registry import tools_for
 from update_content.ai_helper import add_project, add_experience
-from config.env import AZURE_OPENAI_KEY, AZURE_OPENAI_ENDPOINT, DEPLOYMENT_NAME, AZURE_OPENAI_API_VERSION
+from update_content.replies import render_reply
+from config.env import DEPLOYMENT_NAME, TEMPLATE_REPLIES
+from config.clients import get_openai_client
+from telemetry import request_metrics, span, record_usage
 
 # map function-call names to actual implementations
 TOOLS = {
@@ -12,47 +14,50 @@ TOOLS = {
     # … other tools …
 }
 
-AZURE_OPENAI_ENDPOINT = AZURE_OPENAI_ENDPOINT
-client = AzureOpenAI(
-    api_key             = AZURE_OPENAI_KEY,        # or OPENAI_API_KEY
-    azure_endpoint      = AZURE_OPENAI_ENDPOINT,   # must end in a slash
-    api_version         = AZURE_OPENAI_API_VERSION
-)
-
 
 async def main(req: func.HttpRequest) -> func.HttpResponse:
-    user_msg = await req.get_json()
-    messages = user_msg["messages"]
-
-    # ask the LLM which tool to call
-    chat_resp = client.chat.completions.create(
-        model=DEPLOYMENT_NAME,
-        messages=messages,
-        functions=FUNCTION_SPECS,
-        function_call="auto"
-    )
-
-    msg = chat_resp.choices[0].message
-    if msg.finish_reason == "function_call":
-        fn_name = msg.function_call.name
-        args    = json.loads(msg.function_call.arguments)
-        # dispatch to our helper
-        result = await TOOLS[fn_name](**args)
-
-        # feed the result back for a natural-language wrap-up
-        followup = client.chat.completions.create(
-            model=DEPLOYMENT_NAME,
-            messages=[
-                *messages,
-                {"role":"function", "name":fn_name, "content": json.dumps(result)}
-            ]
+    with request_metrics("update_content"):
+        user_msg = req.get_json()
+        messages = user_msg["messages"]
+
+        # ask the LLM which tool to call
+        client = get_openai_client()
+        with span("openai.chat"):
+            chat_resp = await client.chat.completions.create(
+                model=DEPLOYMENT_NAME,
+                messages=messages,
+                functions=tools_for(TOOLS, style="functions"),
+                function_call="auto"
+            )
+        record_usage(chat_resp)
+
+        msg = chat_resp.choices[0].message
+        if chat_resp.choices[0].finish_reason == "function_call":
+            fn_name = msg.function_call.name
+            args    = json.loads(msg.function_call.arguments)
+            # dispatch to our helper
+            result = await TOOLS[fn_name](**args)
+
+            reply = None
+            if TEMPLATE_REPLIES and not user_msg.get("llm_reply"):
+                reply = render_reply([(fn_name, args, result)])
+            if reply is None:
+                # feed the result back for a natural-language wrap-up
+                with span("openai.followup"):
+                    followup = await client.chat.completions.create(
+                        model=DEPLOYMENT_NAME,
+                        messages=[
+                            *messages,
+                            {"role":"function", "name":fn_name, "content": json.dumps(result)}
+                        ]
+                    )
+                record_usage(followup)
+                reply = followup.choices[0].message.content
+        else:
+            reply = msg.content
+
+        return func.HttpResponse(
+            json.dumps({"reply": reply}),
+            status_code=200,
+            mimetype="application/json"
         )
-        reply = followup.choices[0].message.content
-    else:
-        reply = msg.content
-
-    return func.HttpResponse(
-        json.dumps({"reply": reply}),
-        status_code=200,
-        mimetype="application/json"
-    )
@@ -1,21 +1,27 @@
 # File: update_content/ai_helper.py
 
 import json
-
 import logging as log
-from .html_parser import read_portfolio_html, insert_project, insert_experience, update_project, update_experience
-from .github_helper import commit_html
+from dataclasses import asdict
+from .html_parser import insert_project, insert_experience, update_project, update_experience, fetch_portfolio_html, parse_html
+from .html_parser import matched_project, matched_experience
+from .github_helper import submit_edit
+from .portfolio_model import extract
+from . import search_index
+from telemetry import traced, span
 
-async def add_project(project: dict, user_id: str = "portfolio_user") -> dict:
-    html    = read_portfolio_html(user_id)
-    updated = insert_project(html, project)
+# Longest description returned by search_portfolio, to keep results small in the prompt
+SEARCH_DESCRIPTION_CHARS = 160
+SEARCH_MAX_RESULTS       = 10
 
+@traced("tool.add_project")
+async def add_project(project: dict, user_id: str = "portfolio_user") -> dict:
     try:
-        commit_result = commit_html(updated, "projects")
+        commit_result = await submit_edit(lambda soup: insert_project(soup, project), "projects")
     except Exception as e:
-        # If it’s an HTTPError from requests, grab the JSON body if possible
-        body = getattr(e, "response", None)
-        detail = body.text if body is not None else str(e)
+        # GitHubError carries the status and GitHub's response body in str(e);
+        # the GitHub client has already logged it
+        detail = str(e)
         log.error(f"[add_project] GitHub commit failed: {detail}")
         return {
             "status": "error",
@@ -27,25 +33,25 @@ async def add_project(project: dict, user_id: str = "portfolio_user") -> dict:
         "status":     "success",
         "section":    "projects",
         "project":    project,
-        "commit_url": commit_result.get("content", {}).get("html_url")
+        "commit_url": commit_result.get("content", {}).get("html_url"),
+        "commit":     commit_result
     }
 
+@traced("tool.add_experience")
 async def add_experience(experience: dict, user_id: str = "portfolio_user") -> dict:
     """
     Reads the user's portfolio HTML, inserts a new experience entry,
     and commits the updated HTML back to GitHub.
     """
-    html = read_portfolio_html(user_id)
-    updated = insert_experience(html, experience)
     try:
-        commit_result = commit_html(updated, "experience")
+        commit_result = await submit_edit(lambda soup: insert_experience(soup, experience), "experience")
     except Exception as e:
         log.error(f"[add_experience] commit_html threw: {e}")
         return {
             "status": "error",
             "error": f"GitHub commit exception: {e}"
         }
-    if not commit_result.get("commit_url") and not commit_result.get("sha"):
+    if not commit_result.get("commit") and not commit_result.get("content"):
         log.error(f"[add_experience] commit_html returned failure: {commit_result}")
         return {
             "status": "error",
@@ -60,14 +66,52 @@ async def add_experience(experience: dict, user_id: str = "portfolio_user") -> d
         "commit": commit_result
     }
 
+@traced("tool.update_project")
 async def edit_project(project: dict, user_id: str = "default_user") -> dict:
-    html     = read_portfolio_html(user_id)
-    updated  = update_project(html, project)
-    resp     = commit_html(content=updated, section="projects")
-    return {"status":"success", "commit":resp}
+    # a fuzzy match may edit a differently spelled title; report the one edited
+    matched = {}
+
+    def mutate(soup):
+        soup = update_project(soup, project)
+        matched["title"] = matched_project(soup, project["title"]).title
+        return soup
 
+    resp = await submit_edit(mutate, "projects")
+    return {"status":"success", "title":matched.get("title", project["title"]), "commit":resp}
+
+@traced("tool.update_experience")
 async def edit_experience(experience: dict, user_id: str = "default_user") -> dict:
-    html     = read_portfolio_html(user_id)
-    updated  = update_experience(html, experience)
-    resp     = commit_html(content=updated, section="experience")
-    return {"status":"success", "commit":resp}
+    matched = {}
+
+    def mutate(soup):
+        soup = update_experience(soup, experience)
+        entry = matched_experience(soup, experience.get("role"), experience.get("company"))
+        matched.update(role=entry.role, company=entry.company)
+        return soup
+
+    resp = await submit_edit(mutate, "experience")
+    return {"status":"success", **matched, "commit":resp}
+
+def _brief(record) -> dict:
+    fields = {k: v for k, v in asdict(record).items() if v not in (None, "", [], "#")}
+    description = fields.get("description", "")
+    if len(description) > SEARCH_DESCRIPTION_CHARS:
+        fields["description"] = description[:SEARCH_DESCRIPTION_CHARS].rsplit(" ", 1)[0] + "…"
+    return fields
+
+@traced("tool.search_portfolio")
+async def search_portfolio(query: str, kind: str | None = None, limit: int = 5, user_id: str = "default_user") -> dict:
+    """
+    Read-only: ranks the projects and experience entries closest to `query`
+    (by title, role, company or technology) without returning the page.
+    """
+    html, sha = await fetch_portfolio_html("index.html")
+    # parsed privately: the cached soup may be edited on the loop meanwhile
+    search = await search_index.for_document(sha, lambda: extract(parse_html(html)))
+    with span("search.query"):
+        hits = search.search(query, kind=kind, limit=max(1, min(limit, SEARCH_MAX_RESULTS)))
+    return {
+        "status":  "success",
+        "query":   query,
+        "results": [{"kind": hit_kind, "score": score, **_brief(record)} for score, hit_kind, record in hits],
+    }
@@ -0,0 +1,145 @@
+# File: update_content/commit_queue.py
+"""
+Coalesces edits to the same file that arrive close together.
+
+An edit submitted while no commit of its path is running is committed
+right away. Edits submitted while one is in flight queue up and, once it
+finishes, are applied in order to the document and published as a single
+commit. Each caller gets the shared commit result back, or its
+own error if just its edit failed. With COMMIT_COALESCE_WINDOW > 0 the
+first edit also waits that many seconds for others to join it.
+
+    queue = CommitQueue(edit_document)
+    result = await queue.submit(mutate, "projects")
+
+MemoryDocuments is an in-process stand-in for the repository, so the queue
+can be exercised without GitHub:
+
+    docs  = MemoryDocuments({"index.html": html})
+    queue = CommitQueue(docs.commit)
+"""
+import asyncio
+import hashlib
+import contextvars
+from .html_parser import parse_html
+from telemetry import incr
+
+
+async def commit_combined(commit, edits: list[tuple], path: str, failed: dict[int, Exception]) -> dict:
+    """
+    Commits (mutate, section) pairs with `commit(mutate, section, path)` as
+    one mutation that applies them in order to the same document. An edit
+    that raises leaves that document half-changed, so the attempt is
+    dropped (edit_document discards its cached soup) and redone without
+    it; the edits that failed are recorded in `failed` by position. Raises
+    the first edit's error when every edit failed, or the commit's own.
+    """
+    while True:
+        live = [i for i in range(len(edits)) if i not in failed]
+        if not live:
+            raise failed[min(failed)]
+        broke: dict[int, Exception] = {}
+
+        def mutate_all(doc):
+            broke.clear()
+            for i in live:
+                try:
+                    doc = edits[i][0](doc)
+                except Exception as e:
+                    broke[i] = e
+                    raise
+            return doc
+
+        label = ", ".join(dict.fromkeys(name.strip() for i in live for name in edits[i][1].split(",")))
+        try:
+            return await commit(mutate_all, label, path)
+        except Exception:
+            if not broke:
+                raise
+            failed.update(broke)
+            incr("commit_queue.replayed")
+
+
+class CommitQueue:
+    """
+    Per-path coalescing in front of `commit(mutate, section, path) -> dict`
+    (edit_document in production). `window` is how long the first edit of
+    an idle path waits for company; 0 commits it immediately.
+    """
+
+    def __init__(self, commit, window: float = 0.0):
+        self.commit = commit
+        self.window = window
+        self._pending: dict[str, list[tuple]] = {}
+        self._runners: dict[str, asyncio.Task] = {}
+
+    async def submit(self, mutate, section: str, path: str = "index.html") -> dict:
+        future = asyncio.get_running_loop().create_future()
+        # the caller's context, so the commit's stages reach its request metrics
+        self._pending.setdefault(path, []).append((mutate, section, future, contextvars.copy_context()))
+        if path not in self._runners:
+            self._runners[path] = asyncio.ensure_future(self._run(path))
+        result, shared = await future
+        if shared > 1:
+            incr("commit_queue.coalesced")
+        return result
+
+    async def _run(self, path: str) -> None:
+        """Commits the queued edits of `path`, one group at a time, until none are left."""
+        try:
+            if self.window > 0:
+                await asyncio.sleep(self.window)
+            while self._pending.get(path):
+                await self._commit_group(path, self._pending.pop(path))
+        finally:
+            self._runners.pop(path, None)
+
+    async def _commit_group(self, path: str, edits: list[tuple]) -> None:
+        failed: dict[int, Exception] = {}
+        # the runner belongs to whichever request started it; the commit is
+        # timed and counted in the request of the group's first caller instead
+        commit = commit_combined(self.commit, [(mutate, section) for mutate, section, _, _ in edits], path, failed)
+        try:
+            result = await asyncio.get_running_loop().create_task(commit, context=edits[0][3])
+        except Exception as e:
+            for i, (_, _, future, _) in enumerate(edits):
+                if not future.done():
+                    future.set_exception(failed.get(i, e))
+            return
+        shared = len(edits) - len(failed)
+        for i, (_, _, future, _) in enumerate(edits):
+            if future.done():
+                continue
+            if i in failed:
+                future.set_exception(failed[i])
+            else:
+                future.set_result((result, shared))
+
+    async def drain(self) -> None:
+        """Waits until every queued edit has been committed."""
+        while self._runners:
+            await asyncio.gather(*list(self._runners.values()), return_exceptions=True)
+
+
+class MemoryDocuments:
+    """
+    In-memory stand-in for the portfolio repository: `commit` applies a
+    mutation to the stored file and returns a contents-API shaped result.
+    Every commit is recorded in `commits`.
+    """
+
+    def __init__(self, files: dict[str, str] | None = None):
+        self.files = dict(files or {})
+        self.commits: list[dict] = []
+
+    async def commit(self, mutate, section: str, path: str = "index.html") -> dict:
+        from .github_helper import get_formatter
+        html = mutate(parse_html(self.files[path])).prettify(formatter=get_formatter())
+        self.files[path] = html
+        sha = hashlib.sha1(html.encode("utf-8")).hexdigest()
+        self.commits.append({"path": path, "section": section, "sha": sha})
+        number = len(self.commits)
+        return {
+            "content": {"path": path, "sha": sha, "html_url": f"memory://{path}"},
+            "commit":  {"sha": f"{number:040x}", "html_url": f"memory://commits/{number}"},
+        }
@@ -0,0 +1,131 @@
+# File: update_content/doc_cache.py
+"""
+In-process cache of the portfolio documents fetched from GitHub.
+
+One entry per repo path, holding the blob SHA, the decoded HTML and the
+ETag of the contents-API response it came from (None when the entry was
+written after a commit and has not been revalidated yet). An entry can
+also carry the parsed soup for that SHA and the lookup index built over it,
+so repeated edits of an unchanged page skip both the parse and the scan.
+
+Each entry remembers when GitHub last confirmed it (`checked`). Within
+DOC_CACHE_MAX_AGE seconds of that, fresh() lets readers use it without
+revalidating; the github_webhook function drops or replaces entries as
+soon as a push changes their file.
+"""
+import time
+
+_entries: dict[str, dict] = {}
+
+# Callbacks told when a cached version of a path is superseded or dropped
+_listeners: list = []
+
+
+def subscribe(listener) -> None:
+    """
+    Registers `listener(path, old_sha)`, called whenever the cached version
+    of `path` at `old_sha` stops being current.
+    """
+    _listeners.append(listener)
+
+
+def _notify(path: str, old_sha: str | None) -> None:
+    if old_sha is None:
+        return
+    for listener in _listeners:
+        listener(path, old_sha)
+
+
+def get(path: str) -> dict | None:
+    """
+    Returns the cached entry for `path`, or None if nothing is cached.
+    """
+    return _entries.get(path)
+
+
+def store(path: str, sha: str, html: str, etag: str | None = None, soup=None) -> dict:
+    """
+    Records `html` as the current content of `path` at blob `sha`.
+    If `soup` is the document already cached for `path`, its index is kept.
+    """
+    previous = _entries.get(path)
+    index = None
+    if soup is not None and previous is not None and previous["soup"] is soup:
+        index = previous["index"]
+    entry = {"sha": sha, "html": html, "etag": etag, "soup": soup, "index": index, "checked": time.monotonic()}
+    _entries[path] = entry
+    if previous is not None and previous["sha"] != sha:
+        _notify(path, previous["sha"])
+    return entry
+
+
+def fresh(path: str, max_age: float) -> dict | None:
+    """
+    Returns the cached entry for `path` if it was confirmed current within
+    the last `max_age` seconds.
+    """
+    entry = _entries.get(path)
+    if entry is None or max_age <= 0 or time.monotonic() - entry["checked"] >= max_age:
+        return None
+    return entry
+
+
+def confirm(path: str) -> None:
+    """
+    Records that GitHub just reported the cached version of `path` unchanged.
+    """
+    entry = _entries.get(path)
+    if entry is not None:
+        entry["checked"] = time.monotonic()
+
+
+def parsed(path: str, sha: str):
+    """
+    Returns the cached soup for `path` if it was parsed at blob `sha`.
+    """
+    entry = _entries.get(path)
+    if entry is None or entry["sha"] != sha:
+        return None
+    return entry["soup"]
+
+
+def attach_soup(path: str, sha: str, soup) -> None:
+    """
+    Caches `soup` as the parsed form of `path` at blob `sha`.
+    """
+    entry = _entries.get(path)
+    if entry is not None and entry["sha"] == sha:
+        entry["soup"] = soup
+        entry["index"] = None
+
+
+def discard_soup(path: str) -> None:
+    """
+    Forgets the parsed soup and index for `path` (e.g. after a failed edit
+    left it modified), keeping the HTML and ETag for revalidation.
+    """
+    entry = _entries.get(path)
+    if entry is not None:
+        entry["soup"] = None
+        entry["index"] = None
+
+
+def entry_for(soup) -> dict | None:
+    """
+    Returns the cache entry whose parsed document is `soup`, if any.
+    """
+    for entry in _entries.values():
+        if entry["soup"] is soup:
+            return entry
+    return None
+
+
+def invalidate(path: str | None = None) -> None:
+    """
+    Drops the cached entry for `path`, or every entry when no path is given.
+    """
+    dropped = list(_entries.items()) if path is None else [(path, _entries.get(path))]
+    for p, entry in dropped:
+        _entries.pop(p, None)
+        if entry is not None:
+            _notify(p, entry["sha"])
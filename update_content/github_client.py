@@ -0,0 +1,197 @@
+# File: update_content/github_client.py
+"""
+The one client this app uses for the GitHub REST API.
+
+Every call goes through request(), which:
+  - sends the shared headers (token, API version) for the configured repo,
+    over the worker's pooled HTTP session with a per-request timeout
+  - retries server errors, timeouts and connection failures of reads with
+    jittered exponential backoff; writes are only retried when GitHub
+    rate-limited them, since a failed write may still have been applied
+  - tracks the X-RateLimit-* budget from every response, spreads requests
+    out as it runs low, and waits out a primary or secondary rate limit
+    (up to GITHUB_MAX_WAIT seconds) instead of failing straight away
+
+    resp = await request("GET", "contents/index.html", params={"ref": GITHUB_BRANCH})
+    resp.data["sha"]
+
+Failures raise GitHubError carrying the HTTP status. Requests, retries,
+304s and throttling are counted per request (telemetry) and for the
+lifetime of the worker (stats()).
+"""
+import time
+import random
+import asyncio
+import logging as log
+from dataclasses import dataclass
+from config.env import (
+    API_BASE, GITHUB_REPO, GITHUB_TOKEN,
+    GITHUB_TIMEOUT, GITHUB_MAX_RETRIES, GITHUB_RATE_RESERVE, GITHUB_MAX_WAIT,
+)
+from config.clients import get_http_session
+from telemetry import record_http, record_stage, incr
+
+REPO_API = f"{API_BASE}/repos/{GITHUB_REPO}"
+
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY  = 8.0
+RETRY_STATUSES   = {500, 502, 503, 504}
+IDEMPOTENT       = {"GET", "HEAD"}
+
+# Process-wide counters, see stats()
+_counters = {"requests": 0, "retries": 0, "not_modified": 0, "throttled": 0, "rate_limited": 0}
+
+# Last rate-limit state GitHub reported; reset is an epoch timestamp
+_budget: dict = {"limit": None, "remaining": None, "reset": 0.0}
+
+
+class GitHubError(Exception):
+    """A GitHub API call that failed with `status` (None: no response)."""
+
+    def __init__(self, status: int | None, message: str):
+        super().__init__(f"GitHub returned {status}: {message}" if status else message)
+        self.status = status
+
+
+@dataclass(slots=True)
+class GitHubResponse:
+    status: int
+    headers: dict
+    data: dict | None
+
+
+def _count(counter: str) -> None:
+    _counters[counter] += 1
+    incr(f"github.{counter}")
+
+
+def stats() -> dict:
+    """Counters since the worker started, with the last known rate-limit budget."""
+    return {**_counters, "rate_limit": dict(_budget)}
+
+
+def repo_url(path: str = "") -> str:
+    """The API URL of `path` under the configured repo ("contents/index.html")."""
+    return f"{REPO_API}/{path}" if path else REPO_API
+
+
+def headers(extra: dict | None = None) -> dict:
+    if not GITHUB_TOKEN:
+        raise ValueError("GITHUB_TOKEN environment variable is not set.")
+    return {
+        "Authorization":        f"token {GITHUB_TOKEN}",
+        "Accept":               "application/vnd.github.v3+json",
+        "X-GitHub-Api-Version": "2022-11-28",
+        **(extra or {}),
+    }
+
+
+def _observe(resp_headers) -> None:
+    remaining = resp_headers.get("X-RateLimit-Remaining")
+    if remaining is None:
+        return
+    _budget["remaining"] = int(remaining)
+    _budget["limit"] = int(resp_headers.get("X-RateLimit-Limit", _budget["limit"] or 0)) or None
+    _budget["reset"] = float(resp_headers.get("X-RateLimit-Reset", _budget["reset"]))
+
+
+def _pace_delay(now: float) -> float:
+    """
+    How long to hold the next request so the remaining budget lasts until
+    the window resets: nothing while above GITHUB_RATE_RESERVE, then the
+    rest of the window shared evenly between the requests left.
+    """
+    remaining, reset = _budget["remaining"], _budget["reset"]
+    if remaining is None or reset <= now or remaining > GITHUB_RATE_RESERVE:
+        return 0.0
+    return (reset - now) / (remaining + 1)
+
+
+def _rate_limit_wait(status: int, resp_headers, now: float) -> float | None:
+    """
+    Seconds GitHub asks us to wait before retrying, if this response is a
+    primary (budget exhausted) or secondary (abuse) rate limit; else None.
+    """
+    if status not in (403, 429):
+        return None
+    if "Retry-After" in resp_headers:
+        return float(resp_headers["Retry-After"])
+    if resp_headers.get("X-RateLimit-Remaining") == "0":
+        return max(0.0, float(resp_headers.get("X-RateLimit-Reset", now)) - now)
+    return None if status == 403 else RETRY_BASE_DELAY
+
+
+def _backoff(attempt: int) -> float:
+    # full jitter, so concurrent workers do not retry in lockstep
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+
+async def _wait(seconds: float, stage: str) -> None:
+    if seconds > 0:
+        await asyncio.sleep(seconds)
+        record_stage(stage, seconds * 1000)
+
+
+async def request(method: str, path: str, *, params: dict | None = None, json: dict | None = None,
+                  etag: str | None = None) -> GitHubResponse:
+    """
+    Calls the GitHub API at `path` (relative to the repo, or a full URL).
+    With `etag` the request is conditional and an unchanged resource comes
+    back as a 304 response with no data. Any other status >= 400 that is
+    left after retrying raises GitHubError.
+    """
+    import aiohttp
+    url = path if path.startswith("https://") else repo_url(path)
+    send_headers = headers({"If-None-Match": etag} if etag else None)
+    timeout = aiohttp.ClientTimeout(total=GITHUB_TIMEOUT)
+    retry_failures = method in IDEMPOTENT
+    waited = 0.0
+
+    for attempt in range(GITHUB_MAX_RETRIES + 1):
+        last = attempt == GITHUB_MAX_RETRIES
+        pace = _pace_delay(time.time())
+        if pace > 0:
+            _count("throttled")
+            pace = min(pace, GITHUB_MAX_WAIT)
+            await _wait(pace, "github.throttle")
+
+        _counters["requests"] += 1  # record_http counts it for the request
+        try:
+            async with get_http_session().request(method, url, params=params, json=json,
+                                                  headers=send_headers, timeout=timeout) as resp:
+                record_http("github", resp.status)
+                _observe(resp.headers)
+                if resp.status == 304:
+                    _count("not_modified")
+                    return GitHubResponse(304, dict(resp.headers), None)
+                if resp.status < 400:
+                    data = await resp.json(content_type=None)
+                    return GitHubResponse(resp.status, dict(resp.headers), data)
+                body = await resp.text()
+                status, resp_headers = resp.status, resp.headers
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            if not retry_failures or last:
+                raise GitHubError(None, f"{method} {path} failed: {e!r}") from e
+            log.warning(f"[github] {method} {path} failed ({e!r}), retrying")
+            _count("retries")
+            await _wait(_backoff(attempt), "github.backoff")
+            continue
+
+        limited = _rate_limit_wait(status, resp_headers, time.time())
+        if limited is not None:
+            _count("rate_limited")
+            if not last and waited + limited <= GITHUB_MAX_WAIT:
+                log.warning(f"[github] {method} {path} rate limited, retrying in {limited:.1f}s")
+                waited += limited
+                _count("retries")
+                await _wait(limited + _backoff(0), "github.rate_limit")
+                continue
+        elif status in RETRY_STATUSES and retry_failures and not last:
+            log.warning(f"[github] {method} {path} returned {status}, retrying")
+            _count("retries")
+            await _wait(_backoff(attempt), "github.backoff")
+            continue
+
+        if status != 404:
+            log.error(f"[github] {method} {path} returned {status}: {body}")
+        raise GitHubError(status, body)
@@ -1,45 +1,82 @@
 import os
+import json
 import base64
-import requests
-from bs4 import BeautifulSoup
-from bs4.formatter import HTMLFormatter
-from config.env import GITHUB_TOKEN, REPO_OWNER, REPO_NAME, API_BASE, GITHUB_BRANCH
+import hashlib
+import posixpath
+import random
+import asyncio
+import logging as log
+from contextvars import ContextVar
+from typing import TYPE_CHECKING
+from config.env import (
+    GITHUB_REPO, GITHUB_BRANCH, EDIT_MODE, SPLICE_VERIFY, COMMIT_COALESCE_WINDOW, MODEL_FILE,
+)
+from telemetry import span, incr
+from . import doc_cache, splice
+from .github_client import GitHubError, request
+from .commit_queue import CommitQueue, commit_combined
+from .html_parser import fetch_portfolio_html, parse_html
+from .portfolio_model import PortfolioModel, extract, render_changes
 
-FORMATTER = HTMLFormatter(indent=4)
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
+_formatter = None
 
-def _get_file_sha(path: str) -> str | None:
+
+def get_formatter():
+    """
+    Returns the bs4 formatter used to prettify committed HTML (4-space indent).
+    """
+    global _formatter
+    if _formatter is None:
+        from bs4.formatter import HTMLFormatter
+        _formatter = HTMLFormatter(indent=4)
+    return _formatter
+
+# Bounded retry policy for commits that lose a SHA race
+MAX_COMMIT_ATTEMPTS = 4
+RETRY_BASE_DELAY    = 0.5
+
+# One lock per repo path so edits within this worker queue up instead of racing
+_locks: dict[str, asyncio.Lock] = {}
+
+# Set while a group of tool calls is running through run_batched
+_batch: ContextVar["EditBatch | None"] = ContextVar("edit_batch", default=None)
+
+
+async def _get_file_sha(path: str) -> str | None:
     """
     Returns the SHA of the file at `path` on the target branch,
     or None if the file does not yet exist.
     """
-    url = f"{API_BASE}/repos/{REPO_OWNER}/{REPO_NAME}/contents/{path}"
-    _headers = {
-        "Authorization": f"token {GITHUB_TOKEN}",
-        "Accept":        "application/vnd.github.v3+json"
-    }
-    resp = requests.get(url, params={"ref": GITHUB_BRANCH}, headers=_headers)
-    if resp.status_code == 200:
-        return resp.json().get("sha")
-    if resp.status_code == 404:
-        return None
-    resp.raise_for_status()
+    try:
+        resp = await request("GET", f"contents/{path}", params={"ref": GITHUB_BRANCH})
+    except GitHubError as e:
+        if e.status == 404:
+            return None
+        raise
+    return resp.data.get("sha")
 
-def commit_html(content: str, section: str) -> dict:
+async def commit_html(content: "str | BeautifulSoup", section: str, sha: str | None = None, path: str = "index.html",
+                      as_is: bool = False) -> dict:
     """
     Commits the updated HTML content to veeravn/veeravn.github.io on the master branch.
-    Assumes the site structure has a folder per section under the repo root, e.g.:
-      projects/index.html
-      experience/index.html
+    `content` may be an already-parsed document, which is serialized as-is.
+    With as_is=True a string is committed verbatim instead of being prettified.
+    Pass the `sha` the content was read at to skip the extra lookup; GitHub
+    rejects the commit with a 409 if the file has moved on since.
     """
-    # Path within the repo to update
-    path = f"index.html"
-    sha = _get_file_sha(path)
-
-    url = f"{API_BASE}/repos/{REPO_OWNER}/{REPO_NAME}/contents/{path}"
+    if sha is None:
+        sha = await _get_file_sha(path)
 
-    # Prettify the HTML for cleaner formatting
-    pretty_html = BeautifulSoup(content, "html.parser").prettify(formatter=FORMATTER)
+    # Prettify the HTML for cleaner formatting, off the event loop
+    if as_is:
+        soup, pretty_html = None, content
+    else:
+        soup = await asyncio.to_thread(parse_html, content) if isinstance(content, str) else content
+        with span("html.prettify"):
+            pretty_html = await asyncio.to_thread(soup.prettify, formatter=get_formatter())
 
     # GitHub expects base64-encoded content
     b64_content = base64.b64encode(pretty_html.encode("utf-8")).decode("utf-8")
@@ -49,14 +86,369 @@ def commit_html(content: str, section: str) -> dict:
         "content": b64_content,
         "branch":  GITHUB_BRANCH,
     }
-    headers = {
-        "Authorization": f"token {GITHUB_TOKEN}",
-        "Accept":        "application/vnd.github.v3+json"
-    }
     if sha:
         payload["sha"] = sha
-    
-    
-    resp = requests.put(url, json=payload, headers=headers)
-    resp.raise_for_status()
-    return resp.json()
\ No newline at end of file
+
+    with span("github.commit"):
+        result = (await request("PUT", f"contents/{path}", json=payload)).data
+
+    # Keep the document cache on the version we just wrote
+    new_sha = result.get("content", {}).get("sha")
+    if new_sha:
+        doc_cache.store(path, new_sha, pretty_html, soup=soup)
+    else:
+        doc_cache.invalidate(path)
+    return result
+
+
+def git_blob_sha(text: str) -> str:
+    """The blob SHA git (and so GitHub) gives `text` stored as UTF-8."""
+    data = text.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class CommitConflictError(Exception):
+    """The branch or a file moved on between reading it and committing."""
+    status = 409
+
+
+async def _blob_shas(tree_sha: str, paths) -> dict[str, str | None]:
+    """
+    The blob SHAs of `paths` in tree `tree_sha` (None where missing),
+    listing only the directories on their way rather than the whole
+    repository.
+    """
+    listings: dict[str, dict | None] = {}
+
+    async def listing(directory: str) -> dict | None:
+        if directory not in listings:
+            sha = tree_sha
+            if directory:
+                parent, name = posixpath.split(directory)
+                entry = (await listing(parent) or {}).get(name)
+                sha = entry["sha"] if entry and entry["type"] == "tree" else None
+            listings[directory] = None if sha is None else {
+                entry["path"]: entry for entry in (await request("GET", f"git/trees/{sha}")).data["tree"]
+            }
+        return listings[directory]
+
+    shas = {}
+    for path in paths:
+        directory, name = posixpath.split(path)
+        entry = (await listing(directory) or {}).get(name)
+        shas[path] = entry["sha"] if entry and entry["type"] == "blob" else None
+    return shas
+
+
+async def commit_files(files: dict[str, str], message: str, expected: dict[str, str | None]) -> dict:
+    """
+    Commits several files to GITHUB_BRANCH as one commit through the Git
+    Data API. `expected` maps paths to the blob SHA they were read at (None
+    for a file that should not exist yet). If any of them has moved on, or
+    the branch advances before the ref is updated, CommitConflictError is
+    raised and edit_document retries as it does for a stale contents-API SHA.
+    Returns a result shaped like the contents API's, for the first file.
+    """
+    with span("github.commit"):
+        head = (await request("GET", f"git/ref/heads/{GITHUB_BRANCH}")).data["object"]["sha"]
+        base_tree = (await request("GET", f"git/commits/{head}")).data["tree"]["sha"]
+        current = await _blob_shas(base_tree, expected)
+        for path, sha in expected.items():
+            if current.get(path) != sha:
+                raise CommitConflictError(f"{path} changed since it was read")
+
+        new_tree = (await request("POST", "git/trees", json={
+            "base_tree": base_tree,
+            "tree": [{"path": path, "mode": "100644", "type": "blob", "content": content} for path, content in files.items()],
+        })).data
+        commit = (await request("POST", "git/commits", json={
+            "message": message, "tree": new_tree["sha"], "parents": [head],
+        })).data
+        try:
+            await request("PATCH", f"git/refs/heads/{GITHUB_BRANCH}", json={"sha": commit["sha"], "force": False})
+        except GitHubError as e:
+            # 422: not a fast-forward any more, someone else pushed first
+            if e.status == 422:
+                raise CommitConflictError(f"{GITHUB_BRANCH} moved during the commit") from e
+            raise
+
+    for path, content in files.items():
+        doc_cache.store(path, git_blob_sha(content), content)
+    first = next(iter(files))
+    return {
+        "content": {
+            "path":     first,
+            "sha":      git_blob_sha(files[first]),
+            "html_url": f"https://github.com/{GITHUB_REPO}/blob/{GITHUB_BRANCH}/{first}",
+        },
+        "commit": {"sha": commit["sha"], "html_url": commit.get("html_url")},
+    }
+
+
+def _is_sha_conflict(e: Exception) -> bool:
+    # or a 409 from the contents API
+    if isinstance(e, CommitConflictError):
+        return True
+    return isinstance(e, GitHubError) and e.status == 409
+
+
+# page path -> (page blob SHA, model of that page, blob SHA of the stored model file)
+_models: dict[str, tuple[str, PortfolioModel, str | None]] = {}
+
+
+def model_path(path: str) -> str:
+    """Where the structured model of `path` is stored (MODEL_FILE beside it)."""
+    return posixpath.join(posixpath.dirname(path), MODEL_FILE)
+
+
+def _forget_model(path: str, old_sha: str) -> None:
+    """Drops the model cached for a page, or for the model file, at a version that was retired."""
+    for page, (page_sha, _, model_sha) in list(_models.items()):
+        if (page == path and page_sha == old_sha) or (model_path(page) == path and model_sha == old_sha):
+            del _models[page]
+
+
+doc_cache.subscribe(_forget_model)
+
+
+async def load_model(path: str, html: str, sha: str) -> tuple[PortfolioModel, str | None]:
+    """
+    Returns the model of `path` at page blob `sha`, with the blob SHA of the
+    stored model file (None if there is none yet). The stored model is used
+    when it was written for this page version; otherwise, e.g. after a hand
+    edit of the page, the model is extracted from the page again.
+    """
+    cached = _models.get(path)
+    if cached and cached[0] == sha:
+        return cached[1], cached[2]
+
+    stored, model_sha = None, None
+    try:
+        text, model_sha = await fetch_portfolio_html(model_path(path))
+        stored = json.loads(text)
+        if stored.get("page_sha") == sha:
+            model = PortfolioModel.from_dict(stored)
+        else:
+            stored = None
+    except Exception as e:
+        # a missing (404) or unreadable model file is rebuilt from the page
+        if isinstance(e, GitHubError) and e.status != 404:
+            raise
+        stored = None
+    if stored is None:
+        with span("model.extract"):
+            soup = doc_cache.parsed(path, sha) or await asyncio.to_thread(parse_html, html)
+            model = extract(soup)
+        incr("model.extracted")
+    _models[path] = (sha, model, model_sha)
+    return model, model_sha
+
+
+async def _model_edit(html: str, sha: str, mutate, section: str, path: str) -> dict | None:
+    """
+    Applies `mutate` to a copy of the page's structured model, renders the
+    changed cards into the page and commits page and model together.
+    Returns None when the page cannot be updated from the model.
+    """
+    model, model_sha = await load_model(path, html, sha)
+    with span("model.mutate"):
+        edited = mutate(model.copy())
+    with span("model.render"):
+        page = render_changes(html, edited)
+    if page is None:
+        incr("model.fallback")
+        return None
+
+    page_sha = git_blob_sha(page)
+    stored = edited.dumps(page_sha=page_sha)
+    result = await commit_files(
+        {path: page, model_path(path): stored},
+        f"Agent update to {section} section",
+        expected={path: sha, model_path(path): model_sha},
+    )
+    _models[path] = (page_sha, edited, git_blob_sha(stored))
+    return result
+
+
+async def _splice_edit(html: str, mutate, section: str) -> str | None:
+    """
+    Applies `mutate` to just the sections named in `section` ("projects",
+    "projects, experience", ...) and splices them back into `html`.
+    Returns None when the sections cannot be isolated, so the caller falls
+    back to editing the whole document.
+    """
+    spans = splice.locate(html, [name.strip() for name in section.split(",")])
+    if spans is None:
+        incr("html.splice_fallback")
+        return None
+    with span("html.parse"):
+        soup = await asyncio.to_thread(parse_html, splice.fragment(html, spans))
+    with span("html.mutate"):
+        soup = mutate(soup)
+    sections = splice.top_level_sections(soup)
+    if len(sections) != len(spans):
+        incr("html.splice_fallback")
+        return None
+    with span("html.prettify"):
+        spliced = await asyncio.to_thread(splice.render, html, spans, sections, get_formatter())
+
+    if SPLICE_VERIFY:
+        # the spliced page must read the same as re-rendering the whole
+        # document; both are compared as they parse back from the committed text
+        with span("html.splice_verify"):
+            full_soup = mutate(await asyncio.to_thread(parse_html, html))
+            full = await asyncio.to_thread(full_soup.prettify, formatter=get_formatter())
+            same = await asyncio.to_thread(splice.same_document, spliced, full, get_formatter())
+        if not same:
+            incr("html.splice_mismatch")
+            log.warning(f"[edit_document] spliced edit of {section} differs from the full render; committing the full render")
+            return full
+    return spliced
+
+
+async def edit_document(mutate, section: str, path: str = "index.html") -> dict:
+    """
+    Reads `path`, applies `mutate(soup) -> soup` and commits the result
+    against the SHA it was read at. With EDIT_MODE "model" the mutation is
+    applied to the page's structured model and page and model are committed
+    together; with "splice" only the edited sections are parsed and
+    re-serialized. Otherwise, or when those cannot handle the page, the
+    whole page is parsed once (reusing the cached soup and its index when
+    the SHA is unchanged) and prettified. If another writer got there first,
+    the file is re-fetched and the mutation re-applied, up to MAX_COMMIT_ATTEMPTS.
+    """
+    lock = _locks.setdefault(path, asyncio.Lock())
+    async with lock:
+        for attempt in range(1, MAX_COMMIT_ATTEMPTS + 1):
+            html, sha = await fetch_portfolio_html(path)
+            try:
+                if EDIT_MODE == "model":
+                    result = await _model_edit(html, sha, mutate, section, path)
+                    if result is not None:
+                        return result
+                spliced = None
+                if EDIT_MODE in ("splice", "model"):
+                    spliced = await _splice_edit(html, mutate, section)
+                if spliced is not None:
+                    return await commit_html(spliced, section, sha=sha, path=path, as_is=True)
+                soup = doc_cache.parsed(path, sha)
+                if soup is None:
+                    with span("html.parse"):
+                        soup = await asyncio.to_thread(parse_html, html)
+                    doc_cache.attach_soup(path, sha, soup)
+                with span("html.mutate"):
+                    updated = mutate(soup)
+                return await commit_html(updated, section, sha=sha, path=path)
+            except Exception as e:
+                # the cached soup now holds uncommitted changes
+                doc_cache.discard_soup(path)
+                if not _is_sha_conflict(e) or attempt == MAX_COMMIT_ATTEMPTS:
+                    raise
+            doc_cache.invalidate(path)
+            delay = RETRY_BASE_DELAY * 2 ** (attempt - 1)
+            incr("github.sha_conflicts")
+            log.warning(f"[edit_document] SHA conflict on {path} (attempt {attempt}), retrying in ~{delay}s")
+            await asyncio.sleep(delay + random.uniform(0, delay))
+
+
+_queue: CommitQueue | None = None
+
+
+def get_commit_queue() -> CommitQueue:
+    """
+    Returns the worker's commit queue, which coalesces edits to the same file
+    submitted while a commit of it is in flight (or within
+    COMMIT_COALESCE_WINDOW seconds) into one edit_document call.
+    """
+    global _queue
+    if _queue is None:
+        _queue = CommitQueue(edit_document, COMMIT_COALESCE_WINDOW)
+    return _queue
+
+
+def set_commit_queue(queue: CommitQueue | None) -> None:
+    """Replaces the worker's commit queue (e.g. with one over MemoryDocuments)."""
+    global _queue
+    _queue = queue
+
+
+async def submit_edit(mutate, section: str, path: str = "index.html") -> dict:
+    """
+    Commits `mutate` through the commit queue, or, when called from inside
+    run_batched, queues it so it lands in the batch's shared commit.
+    """
+    batch = _batch.get()
+    if batch is None or batch.path != path:
+        return await get_commit_queue().submit(mutate, section, path)
+    return await batch.add(mutate, section)
+
+
+class EditBatch:
+    """
+    Collects the mutations submitted by concurrently running tool calls and
+    applies them, in submission order, to one copy of the document that is
+    committed once. Every caller gets the shared commit result back.
+    """
+
+    def __init__(self, path: str = "index.html"):
+        self.path = path
+        self._edits: list[tuple] = []
+        self._queued = asyncio.Event()
+
+    def add(self, mutate, section: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._edits.append((mutate, section, future))
+        self._queued.set()
+        return future
+
+    async def run(self, coros) -> list:
+        """
+        Runs `coros` concurrently and flushes queued edits whenever every
+        still-running call is waiting on one. Results come back in order,
+        with exceptions returned in place rather than raised.
+        """
+        token = _batch.set(self)
+        try:
+            tasks = [asyncio.ensure_future(c) for c in coros]
+        finally:
+            _batch.reset(token)
+
+        while True:
+            pending = [t for t in tasks if not t.done()]
+            if not pending:
+                break
+            if self._edits and len(pending) == len(self._edits):
+                await self._flush()
+                continue
+            self._queued.clear()
+            waiter = asyncio.ensure_future(self._queued.wait())
+            await asyncio.wait([*pending, waiter], return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+        if self._edits:
+            await self._flush()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _flush(self) -> None:
+        edits, self._edits = self._edits, []
+        failed: dict[int, Exception] = {}
+        try:
+            result = await commit_combined(get_commit_queue().submit, [(mutate, section) for mutate, section, _ in edits],
+                                           self.path, failed)
+        except Exception as e:
+            for i, (_, _, future) in enumerate(edits):
+                future.set_exception(failed.get(i, e))
+            return
+        log.info(f"[EditBatch] committed {len(edits) - len(failed)} edit(s) to {self.path} in one commit")
+        for i, (_, _, future) in enumerate(edits):
+            if i in failed:
+                future.set_exception(failed[i])
+            else:
+                future.set_result(result)
+
+
+async def run_batched(coros, path: str = "index.html") -> list:
+    """
+    Runs tool-call coroutines concurrently, publishing every edit they make
+    to `path` as a single commit.
+    """
+    return await EditBatch(path).run(coros)
@@ -1,36 +1,195 @@
 # File: update_content/html_parser.py
-import requests
 import base64
-from bs4 import BeautifulSoup
-import logging as log
 import re
-from config.env import GITHUB_REPO, GITHUB_TOKEN
+from typing import TYPE_CHECKING
+from config.env import GITHUB_BRANCH, HTML_PARSER, DOC_CACHE_MAX_AGE
+from telemetry import span, incr
+from . import doc_cache
+from .github_client import request
+from .portfolio_model import PortfolioModel, Project, Experience, project_from_item, experience_from_item
+from .search_index import KeyMatcher
+
+# bs4 is imported by parse_html on first use, keeping it off the cold-start path
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
 def _normalize(text: str) -> str:
     return re.sub(r"\s+", " ", text.strip().lower())
 
-def read_portfolio_html(user_id: str) -> str:
+def parse_html(html: str) -> "BeautifulSoup":
+    """
+    Parses portfolio HTML with the configured BeautifulSoup backend (HTML_PARSER).
+    """
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, HTML_PARSER)
+
+def _as_soup(doc: "str | BeautifulSoup") -> "BeautifulSoup":
+    return parse_html(doc) if isinstance(doc, str) else doc
+
+_YEAR_RE = re.compile(r"\(\d{4}\s*[–-]\s*\d{4}\)")
+
+def _experience_keys(h3) -> tuple[str, str, str]:
+    """
+    Returns (role, company, company_text) for an experience title, where
+    company_text is everything after the dash minus a closed year range.
+    """
+    norm_text = _normalize(h3.get_text(separator=" ").replace("\n", " "))
+    role, _, company_text = norm_text.partition(" - ")
+    company_text = _YEAR_RE.sub("", company_text).strip()
+    place = h3.find("span", class_="place")
+    company = _normalize(place.get_text(separator=" ")) if place else company_text
+    return role, company, company_text
+
+class PortfolioIndex:
+    """
+    Lookup tables over one parsed document: normalized project titles and
+    (role, company) pairs mapped to their div.item nodes, in document order.
+    Built once per document version and kept current by the insert_* helpers.
+    matcher() adds fuzzy lookups over the same keys.
+    """
+
+    def __init__(self, soup: "BeautifulSoup"):
+        self.projects_section   = soup.find("section", class_="projects section")
+        self.experience_section = soup.find("section", class_="experience section")
+        self.projects: dict[str, object] = {}
+        self.experience: dict[tuple[str, str], object] = {}
+        self._experience_text: list[tuple[str, str, object]] = []
+        self._matcher: KeyMatcher | None = None
+
+        if self.projects_section:
+            for item in self.projects_section.find_all("div", class_="item"):
+                self.add_project(item)
+        if self.experience_section:
+            for item in self.experience_section.find_all("div", class_="item"):
+                self.add_experience(item)
+
+    def add_project(self, item) -> None:
+        h3 = item.find("h3", class_="title")
+        if h3:
+            self.projects.setdefault(_normalize(h3.get_text(separator=" ")), item)
+            self._matcher = None
+
+    def add_experience(self, item) -> None:
+        h3 = item.find("h3", class_="title")
+        if h3:
+            role, company, company_text = _experience_keys(h3)
+            self.experience.setdefault((role, company), item)
+            self._experience_text.append((role, company_text, item))
+            self._matcher = None
+
+    def matcher(self) -> KeyMatcher:
+        if self._matcher is None:
+            self._matcher = KeyMatcher(
+                list(self.projects.items()),
+                [(role, company, item) for (role, company), item in self.experience.items()],
+            )
+        return self._matcher
+
+    def find_project(self, title: str):
+        return self.projects.get(_normalize(title))
+
+    def find_experience(self, role: str | None, company: str | None, exact: bool = False):
+        """
+        Exact (role, company) hit first; otherwise (unless `exact`) the first
+        entry whose role and company text contain the given fragments.
+        """
+        norm_role    = _normalize(role)    if role    else None
+        norm_company = _normalize(company) if company else None
+        if norm_role and norm_company:
+            item = self.experience.get((norm_role, norm_company))
+            if item is not None or exact:
+                return item
+        if exact:
+            return None
+        for item_role, company_text, item in self._experience_text:
+            if norm_role and norm_role not in item_role:
+                continue
+            if norm_company and norm_company not in company_text:
+                continue
+            return item
+        return None
+
+def index_for(soup: "BeautifulSoup") -> PortfolioIndex:
+    """
+    Returns the lookup index for `soup`, reusing the one cached for its
+    document version when the soup came from the document cache.
+    A PortfolioModel is its own index.
+    """
+    if isinstance(soup, PortfolioModel):
+        return soup
+    entry = doc_cache.entry_for(soup)
+    if entry is None:
+        return PortfolioIndex(soup)
+    if entry["index"] is None:
+        entry["index"] = PortfolioIndex(soup)
+    return entry["index"]
+
+def _cached_index(soup: "BeautifulSoup") -> PortfolioIndex | None:
+    entry = doc_cache.entry_for(soup)
+    return entry["index"] if entry else None
+
+def matched_project(doc: "BeautifulSoup | PortfolioModel", title: str) -> Project:
+    """
+    The record of the project update_project edits for `title`: the exact
+    title if present, else its closest fuzzy match.
+    """
+    index = index_for(doc)
+    entry = index.find_project(title) or index.matcher().project(title)
+    return entry if isinstance(doc, PortfolioModel) else project_from_item(entry)
+
+def matched_experience(doc: "BeautifulSoup | PortfolioModel", role: str | None, company: str | None) -> Experience:
+    """The record of the experience entry update_experience edits for role/company."""
+    index = index_for(doc)
+    entry = index.find_experience(role, company) or index.matcher().experience(role, company)
+    return entry if isinstance(doc, PortfolioModel) else experience_from_item(entry)
+
+async def fetch_portfolio_html(path: str = "index.html") -> tuple[str, str]:
+    """
+    Fetches a portfolio file from the GitHub repository and returns its
+    decoded content together with the blob SHA it was read at.
+    Served from the in-process cache when GitHub reports the blob unchanged,
+    or without asking when it was confirmed within DOC_CACHE_MAX_AGE seconds.
+    """
+    cached = doc_cache.fresh(path, DOC_CACHE_MAX_AGE)
+    if cached is not None:
+        incr("doc_cache.trusted")
+        return cached["html"], cached["sha"]
+
+    # Revalidate the cached copy; an unchanged page comes back as a 304
+    cached = doc_cache.get(path)
+    with span("github.read"):
+        resp = await request("GET", f"contents/{path}", params={"ref": GITHUB_BRANCH},
+                             etag=cached["etag"] if cached else None)
+    if resp.status == 304:
+        doc_cache.confirm(path)
+        return cached["html"], cached["sha"]
+    data, etag = resp.data, resp.headers.get("ETag")
+
+    sha = data.get("sha")
+    if cached and sha and cached["sha"] == sha:
+        doc_cache.store(path, sha, cached["html"], etag, soup=cached["soup"])
+        return cached["html"], sha
+    html = base64.b64decode(data.get("content", "")).decode()
+    doc_cache.store(path, sha, html, etag)
+    return html, sha
+
+async def read_portfolio_html(user_id: str) -> str:
     """
     Fetches the portfolio HTML (index.html) from the GitHub repository.
     """
-    token = GITHUB_TOKEN
-    log.info(f"[read_portfolio_html] token: {token}")
-    if not token:
-        raise ValueError("GITHUB_TOKEN environment variable is not set.")
-    repo = GITHUB_REPO
-    path = "index.html"
-    url = f"https://api.github.com/repos/{repo}/contents/{path}"
-    headers = {"Authorization": f"token {token}"}
-    resp = requests.get(url, headers=headers)
-    resp.raise_for_status()
-    content_b64 = resp.json().get("content", "")
-    return base64.b64decode(content_b64).decode()
-
-def insert_project(html: str, project: dict) -> str:
+    html, _ = await fetch_portfolio_html("index.html")
+    return html
+
+def insert_project(doc: "str | BeautifulSoup", project: dict, index: PortfolioIndex | None = None) -> "BeautifulSoup":
     """
-    Inserts a new project card into the #projects section of the HTML.
+    Inserts a new project card into the #projects section of the document.
+    A parsed document is modified in place and returned; the new card is
+    added to `index` (or the document's cached index) if there is one.
+    A PortfolioModel is edited through its record operations instead.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    if isinstance(doc, PortfolioModel):
+        return doc.insert_project(project)
+    soup = _as_soup(doc)
     section = soup.find("section", class_="projects section")
     if section is None:
         raise ValueError("Projects section not found in HTML.")
@@ -72,13 +231,21 @@ def insert_project(html: str, project: dict) -> str:
     item.append(p)
     content.append(item)
 
-    return str(soup)
+    index = index or _cached_index(soup)
+    if index:
+        index.add_project(item)
+    return soup
 
-def insert_experience(html: str, experience: dict) -> str:
+def insert_experience(doc: "str | BeautifulSoup", experience: dict, index: PortfolioIndex | None = None) -> "BeautifulSoup":
     """
-    Inserts a new work experience entry into the #experience section of the HTML.
+    Inserts a new work experience entry into the #experience section of the document.
+    A parsed document is modified in place and returned; the new entry is
+    added to `index` (or the document's cached index) if there is one.
+    A PortfolioModel is edited through its record operations instead.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    if isinstance(doc, PortfolioModel):
+        return doc.insert_experience(experience)
+    soup = _as_soup(doc)
     section = soup.find("section", class_="experience section")
     if section is None:
         raise ValueError("Experience section not found in HTML.")
@@ -125,146 +292,133 @@ def insert_experience(html: str, experience: dict) -> str:
     item.append(desc_p)
     
     content.append(item)
-    return str(soup)
 
-def update_project(html: str, project: dict) -> str:
+    index = index or _cached_index(soup)
+    if index:
+        index.add_experience(item)
+    return soup
+
+def update_project(doc: "str | BeautifulSoup", project: dict, index: PortfolioIndex | None = None) -> "BeautifulSoup":
     """
     Update an existing project <div class="item"> by matching its title text,
     without assuming it’s wrapped in an <a>. If a new link is provided, wrap
-    the title in an <a> (or update the existing one).
+    the title in an <a> (or update the existing one). Pass `index` to reuse
+    one already built over this document.
+    A PortfolioModel is edited through its record operations instead.
     """
-    soup = BeautifulSoup(html, "html.parser")
-    container = soup.find("section", class_="projects section")
-    if not container:
+    if isinstance(doc, PortfolioModel):
+        return doc.update_project(project)
+    soup = _as_soup(doc)
+    index = index or index_for(soup)
+    if not index.projects_section:
         raise ValueError("Could not find .projects container")
 
-    for item in container.find_all("div", class_="item"):
-        h3 = item.find("h3", class_="title")
-        if not h3:
-            continue
-
-        # Full title text, stripping inner tags
-        title_text = h3.get_text(separator=" ").strip()
-        if title_text == project["title"]:
-            # 1) Handle link update/wrap
-            link = project.get("link")
-            existing_a = h3.find("a")
-            if link:
-                if existing_a:
-                    existing_a["href"] = link
-                else:
-                    # wrap the text node in a new <a>
-                    new_a = soup.new_tag("a", href=link, target="_blank")
-                    new_a.string = project["title"]
-                    h3.string = ""            # clear old text
-                    h3.append(new_a)
-
-            # 2) Update description if present
-            if project.get("description"):
-                p = item.find("p", class_="summary")
-                if p:
-                    # clear all text in <p> and rebuild
-                    p.clear()
-                    p.append(project["description"])
-                    p.append(soup.new_tag("br"))
-
-                    # re-add tech stack if it exists
-                    techs = project.get("technologies")
-                    if techs:
-                        b = soup.new_tag("b")
-                        b.string = "Technology Stack -"
-                        p.append(b)
-                        p.append(" " + ", ".join(techs) + ".")
-
-            # 3) If only techs changed
-            if project.get("technologies") and not project.get("description"):
-                p = item.find("p", class_="summary")
-                if p:
-                    # remove old tech section
-                    for b in p.find_all("b"):
-                        if "Technology Stack" in b.get_text():
-                            # remove b and its siblings
-                            for sib in list(b.next_siblings) + [b]:
-                                sib.extract()
-                    # append new one
-                    p.append(soup.new_tag("br"))
-                    b = soup.new_tag("b")
-                    b.string = "Technology Stack -"
-                    p.append(b)
-                    p.append(" " + ", ".join(project["technologies"]) + ".")
-
-            return str(soup)
-
-    raise ValueError(f"No project titled '{project['title']}' found")
-
-def update_experience(html: str, experience: dict) -> str:
+    item = index.find_project(project["title"])
+    if item is None:
+        # a misspelled or reworded title still finds a clear closest match
+        item = index.matcher().project(project["title"])
+        incr("match.fuzzy")
+    h3 = item.find("h3", class_="title")
+
+    # 1) Handle link update/wrap
+    link = project.get("link")
+    existing_a = h3.find("a")
+    if link:
+        if existing_a:
+            existing_a["href"] = link
+        else:
+            # wrap the text node in a new <a>
+            new_a = soup.new_tag("a", href=link, target="_blank")
+            new_a.string = h3.get_text(strip=True)
+            h3.string = ""            # clear old text
+            h3.append(new_a)
+
+    # 2) Update description if present
+    if project.get("description"):
+        p = item.find("p", class_="summary")
+        if p:
+            # keep the current stack unless new technologies are given
+            techs = project.get("technologies") or project_from_item(item).technologies
+
+            # clear all text in <p> and rebuild
+            p.clear()
+            p.append(project["description"])
+            p.append(soup.new_tag("br"))
+
+            # re-add tech stack if it exists
+            if techs:
+                b = soup.new_tag("b")
+                b.string = "Technology Stack -"
+                p.append(b)
+                p.append(" " + ", ".join(techs) + ".")
+
+    # 3) If only techs changed
+    if project.get("technologies") and not project.get("description"):
+        p = item.find("p", class_="summary")
+        if p:
+            # remove old tech section
+            for b in p.find_all("b"):
+                if "Technology Stack" in b.get_text():
+                    # remove b and its siblings
+                    for sib in list(b.next_siblings) + [b]:
+                        sib.extract()
+            # append new one
+            p.append(soup.new_tag("br"))
+            b = soup.new_tag("b")
+            b.string = "Technology Stack -"
+            p.append(b)
+            p.append(" " + ", ".join(project["technologies"]) + ".")
+
+    return soup
+
+def update_experience(doc: "str | BeautifulSoup", experience: dict, index: PortfolioIndex | None = None) -> "BeautifulSoup":
     """
     Update an existing experience entry, matching on role (and optionally company),
     and patch only the provided fields. Now respects absence of 'description'.
+    Pass `index` to reuse one already built over this document.
+    A PortfolioModel is edited through its record operations instead.
     """
-    soup = BeautifulSoup(html, "html.parser")
-    container = soup.find("section", class_="experience section")
-    if not container:
+    if isinstance(doc, PortfolioModel):
+        return doc.update_experience(experience)
+    soup = _as_soup(doc)
+    index = index or index_for(soup)
+    if not index.experience_section:
         raise ValueError("Could not find experience container")
 
     role    = experience.get("role")
     company = experience.get("company")
-    norm_role    = _normalize(role)    if role    else None
-    norm_company = _normalize(company) if company else None
     # Notice: we do _not_ pull `description` yet
 
-    candidates = []
-    for item in container.find_all("div", class_="item"):
-        h3 = item.find("h3", class_="title")
-        if not h3:
-            continue
-
-        full_text = h3.get_text(separator=" ").replace("\n", " ")
-        norm_text = _normalize(full_text)
-        
-        # Extract role and company fragments
-        before_dash, _, after_dash = norm_text.partition(" - ")
-        # strip off the year span at end for matching
-        after_dash = re.sub(r"\(\d{4}\s*[–-]\s*\d{4}\)", "", after_dash).strip()
-
-        # Check role match
-        if norm_role and norm_role not in before_dash:
-            continue
-        # Check company match, if provided
-        if norm_company and norm_company not in after_dash:
-            continue
-
-        candidates.append((item, before_dash, after_dash))
-
-    if not candidates:
-        crit = f"role='{role}'"
-        if company:
-            crit += f", company='{company}'"
-        raise ValueError(f"No experience entry matching {crit} found")
-    
-    # If multiple candidates but only role was specified, pick the first
-    item, _, _ = candidates[0]
+    # If several entries match but only role was specified, the first wins
+    item = index.find_experience(role, company)
+    if item is None:
+        # a misspelled or reworded role/company still finds a clear closest match
+        item = index.matcher().experience(role, company)
+        incr("match.fuzzy")
 
     # 1) Update start/end dates if provided
     if "start_date" in experience or "end_date" in experience:
         year_span = item.find("span", class_="year")
         if year_span:
-            start = experience.get("start_date", "") or year_span.text.strip("()").split(" - ")[0]
+            start = experience.get("start_date", "") or year_span.text.strip().strip("()").split(" - ")[0].strip()
             end   = experience.get("end_date", "")   or "Present"
             year_span.string = f"({start} - {end})"
 
+    # an entry without details gets a paragraph for them
+    if ("description" in experience or "environment" in experience) and item.find("p") is None:
+        item.append(soup.new_tag("p"))
+
     # 2) Update description only if explicitly provided
     if "description" in experience:
         p = item.find("p")
-        if p:
-            # Remove existing text up to the <strong>
-            for node in list(p.contents):
-                if getattr(node, "name", "") == "strong":
-                    break
-                node.extract()
-            # Insert new description + <br>
-            p.insert(0, experience["description"])
-            p.insert(1, soup.new_tag("br"))
+        # Remove existing text up to the <strong>
+        for node in list(p.contents):
+            if getattr(node, "name", "") == "strong":
+                break
+            node.extract()
+        # Insert new description + <br>
+        p.insert(0, experience["description"])
+        p.insert(1, soup.new_tag("br"))
 
     # 3) Update environment only if explicitly provided
     if "environment" in experience:
@@ -280,4 +434,18 @@ def update_experience(html: str, experience: dict) -> str:
             sib.extract()
         strong.insert_after(f" {', '.join(experience['environment'])}.")
 
-    return str(soup)
\ No newline at end of file
+    # 4) Point the company name at a new link
+    if experience.get("company_link"):
+        place = item.find("span", class_="place")
+        if place is None:
+            raise ValueError(f"the entry for role='{role}' has no company element to link")
+        a = place.find("a")
+        if a:
+            a["href"] = experience["company_link"]
+        else:
+            a = soup.new_tag("a", href=experience["company_link"], target="_blank")
+            a.string = place.get_text(strip=True)
+            place.clear()
+            place.append(a)
+
+    return soup
\ No newline at end of file
@@ -0,0 +1,423 @@
+# File: update_content/portfolio_model.py
+"""
+Structured model of the portfolio page.
+
+The projects and experience entries of index.html as typed records, in
+page order and looked up the way the edit tools address them (title, or
+role and company). A model is extracted from the page once and saved as
+JSON next to it together with the blob SHA of the page it describes, so
+later edits load the records instead of parsing the page.
+
+Edits are record operations with the same contract as the html_parser
+helpers, which hand a model to the methods below. render_changes() then
+writes only the created and updated items back into the page text, from
+templates that follow the markup insert_project/insert_experience build;
+every other byte of the page is left alone.
+"""
+import re
+import json
+import copy
+from html import escape
+from dataclasses import dataclass, field, asdict
+from . import splice
+from .search_index import KeyMatcher
+
+MODEL_VERSION = 1
+
+_YEAR_RE = re.compile(r"\(\s*([^()]*?)\s*[–-]\s*([^()]*?)\s*\)")
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _text(node) -> str:
+    return " ".join(node.get_text(separator=" ").split()) if node is not None else ""
+
+
+def _list(value) -> list[str]:
+    if isinstance(value, list):
+        return [str(v) for v in value]
+    return [v.strip() for v in str(value).split(",") if v.strip()]
+
+
+@dataclass(slots=True, eq=False)
+class Project:
+    title: str
+    description: str = ""
+    technologies: list[str] = field(default_factory=list)
+    link: str | None = None
+
+
+@dataclass(slots=True, eq=False)
+class Experience:
+    role: str
+    company: str
+    start_date: str = ""
+    end_date: str = ""
+    description: str = ""
+    environment: list[str] = field(default_factory=list)
+    company_link: str | None = None
+
+
+def _compact(record) -> dict:
+    return {k: v for k, v in asdict(record).items() if v not in (None, "", [])}
+
+
+class PortfolioModel:
+    """
+    The records of one page version. `changed` holds the (kind, position)
+    of every record created or updated since the model was loaded or copied.
+    """
+
+    def __init__(self, projects: list[Project] | None = None, experience: list[Experience] | None = None):
+        self.projects: list[Project] = list(projects or [])
+        self.experience: list[Experience] = list(experience or [])
+        self.changed: set[tuple[str, int]] = set()
+        self._loaded = {"project": len(self.projects), "experience": len(self.experience)}
+        self._project_keys: dict[str, int] = {}
+        self._experience_keys: dict[tuple[str, str], int] = {}
+        self._matcher: KeyMatcher | None = None
+        for i, project in enumerate(self.projects):
+            self._project_keys.setdefault(_normalize(project.title), i)
+        for i, entry in enumerate(self.experience):
+            self._experience_keys.setdefault((_normalize(entry.role), _normalize(entry.company)), i)
+
+    def copy(self, keep_changes: bool = False) -> "PortfolioModel":
+        """An independent copy to edit, with no pending changes (with keep_changes, the same ones)."""
+        clone = PortfolioModel(copy.deepcopy(self.projects), copy.deepcopy(self.experience))
+        if keep_changes:
+            clone.changed = set(self.changed)
+            clone._loaded = dict(self._loaded)
+        return clone
+
+    # Lookups, with the same contract as PortfolioIndex
+
+    def find_project(self, title: str) -> Project | None:
+        i = self._project_keys.get(_normalize(title))
+        return None if i is None else self.projects[i]
+
+    def find_experience(self, role: str | None, company: str | None, exact: bool = False) -> Experience | None:
+        norm_role    = _normalize(role)    if role    else None
+        norm_company = _normalize(company) if company else None
+        if norm_role and norm_company:
+            i = self._experience_keys.get((norm_role, norm_company))
+            if i is not None or exact:
+                return None if i is None else self.experience[i]
+        if exact:
+            return None
+        for entry in self.experience:
+            if norm_role and norm_role not in _normalize(entry.role):
+                continue
+            if norm_company and norm_company not in _normalize(entry.company):
+                continue
+            return entry
+        return None
+
+    def matcher(self) -> KeyMatcher:
+        """Fuzzy lookups over the titles and (role, company) pairs."""
+        if self._matcher is None:
+            self._matcher = KeyMatcher(
+                [(p.title, p) for p in self.projects],
+                [(e.role, e.company, e) for e in self.experience],
+            )
+        return self._matcher
+
+    # Record operations, called by the html_parser helpers for a model
+
+    def insert_project(self, project: dict) -> "PortfolioModel":
+        record = Project(
+            title=project["title"],
+            description=project["description"],
+            technologies=_list(project.get("technologies", [])),
+            link=project.get("link", "#"),
+        )
+        self.projects.append(record)
+        self._project_keys.setdefault(_normalize(record.title), len(self.projects) - 1)
+        self._matcher = None
+        self.changed.add(("project", len(self.projects) - 1))
+        return self
+
+    def insert_experience(self, experience: dict) -> "PortfolioModel":
+        record = Experience(
+            role=experience["role"],
+            company=experience["company"],
+            start_date=experience["start_date"],
+            end_date=experience.get("end_date", "Present"),
+            description=experience["description"],
+            environment=_list(experience.get("environment", [])),
+            company_link=experience.get("company_link", "#"),
+        )
+        self.experience.append(record)
+        key = (_normalize(record.role), _normalize(record.company))
+        self._experience_keys.setdefault(key, len(self.experience) - 1)
+        self._matcher = None
+        self.changed.add(("experience", len(self.experience) - 1))
+        return self
+
+    def update_project(self, project: dict) -> "PortfolioModel":
+        record = self.find_project(project["title"]) or self.matcher().project(project["title"])
+        if project.get("link"):
+            record.link = project["link"]
+        if project.get("description"):
+            record.description = project["description"]
+        if project.get("technologies"):
+            record.technologies = _list(project["technologies"])
+        self.changed.add(("project", self.projects.index(record)))
+        return self
+
+    def update_experience(self, experience: dict) -> "PortfolioModel":
+        role, company = experience.get("role"), experience.get("company")
+        record = self.find_experience(role, company) or self.matcher().experience(role, company)
+        if "start_date" in experience or "end_date" in experience:
+            record.start_date = experience.get("start_date") or record.start_date
+            record.end_date   = experience.get("end_date") or "Present"
+        if "description" in experience:
+            record.description = experience["description"]
+        if "environment" in experience:
+            record.environment = _list(experience["environment"])
+        if experience.get("company_link"):
+            record.company_link = experience["company_link"]
+        self.changed.add(("experience", self.experience.index(record)))
+        return self
+
+    # Serialization
+
+    def to_dict(self, page_sha: str | None = None) -> dict:
+        return {
+            "version":    MODEL_VERSION,
+            "page_sha":   page_sha,
+            "projects":   [_compact(p) for p in self.projects],
+            "experience": [_compact(e) for e in self.experience],
+        }
+
+    def dumps(self, page_sha: str | None = None) -> str:
+        return json.dumps(self.to_dict(page_sha), indent=2, ensure_ascii=False) + "\n"
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PortfolioModel":
+        if data.get("version") != MODEL_VERSION:
+            raise ValueError(f"unsupported portfolio model version {data.get('version')!r}")
+        return cls(
+            [Project(**p) for p in data.get("projects", [])],
+            [Experience(**e) for e in data.get("experience", [])],
+        )
+
+
+def _split_labelled(paragraph, label_tag: str, label: str) -> tuple[str, list[str]]:
+    """
+    Splits a card paragraph into its description (the text before the first
+    <br> or label tag) and the comma-separated list after the label tag.
+    """
+    if paragraph is None:
+        return "", []
+    description, listed = [], None
+    in_description = True
+    for node in paragraph.children:
+        name = getattr(node, "name", None)
+        text = node.get_text(separator=" ") if name else str(node)
+        if name == label_tag and label in text:
+            listed, in_description = [], False
+        elif listed is not None:
+            listed.append(text)
+        elif name in ("br", label_tag):
+            in_description = False
+        elif in_description:
+            description.append(text)
+    rest = " ".join("".join(listed or []).split()).rstrip(".").strip()
+    return " ".join("".join(description).split()), _list(rest) if rest else []
+
+
+def project_from_item(item) -> Project:
+    """The record of one div.item card of the projects section."""
+    h3 = item.find("h3", class_="title")
+    a = h3.find("a") if h3 else None
+    description, technologies = _split_labelled(item.find("p", class_="summary") or item.find("p"), "b", "Technology Stack")
+    return Project(
+        title=_text(h3),
+        description=description,
+        technologies=technologies,
+        link=a.get("href") if a else None,
+    )
+
+
+def experience_from_item(item) -> Experience:
+    """The record of one div.item card of the experience section."""
+    h3 = item.find("h3", class_="title")
+    place = h3.find("span", class_="place") if h3 else None
+    year = h3.find("span", class_="year") if h3 else None
+    link = place.find("a") if place else None
+    role = " ".join(str(s) for s in h3.find_all(string=True, recursive=False)) if h3 else ""
+    role = " ".join(role.split()).rstrip("-").strip()
+    company = _text(place)
+    if not place:
+        # "Role - Company" in plain text
+        role, _, company = _text(h3).partition(" - ")
+    dates = _YEAR_RE.search(_text(year)) if year else None
+    description, environment = _split_labelled(item.find("p"), "strong", "Environment")
+    return Experience(
+        role=role,
+        company=company,
+        start_date=dates.group(1) if dates else "",
+        end_date=dates.group(2) if dates else "",
+        description=description,
+        environment=environment,
+        company_link=link.get("href") if link else None,
+    )
+
+
+def extract(soup) -> PortfolioModel:
+    """
+    Builds the model of a parsed page, with records in the same order as
+    the div.item cards of each section.
+    """
+    projects = soup.find("section", class_="projects section")
+    experience = soup.find("section", class_="experience section")
+    return PortfolioModel(
+        [project_from_item(item) for item in projects.find_all("div", class_="item")] if projects else [],
+        [experience_from_item(item) for item in experience.find_all("div", class_="item")] if experience else [],
+    )
+
+
+# Templates, laid out the way prettify() writes the cards (4-space indent)
+
+def render_project(project: Project) -> list[str]:
+    title = escape(project.title, quote=False)
+    if project.link is not None:
+        title_lines = [f'    <a href="{escape(project.link)}" target="_blank">', f"        {title}", "    </a>"]
+    else:
+        title_lines = [title]
+    return [
+        '<div class="item">',
+        '    <h3 class="title">',
+        *("    " + line for line in title_lines),
+        "    </h3>",
+        '    <p class="summary">',
+        f"        {escape(project.description, quote=False)}",
+        "        <br/>",
+        "        <b>",
+        "            Technology Stack -",
+        "        </b>",
+        f"        {escape(', '.join(project.technologies), quote=False)}.",
+        "    </p>",
+        "</div>",
+    ]
+
+
+def render_experience(entry: Experience) -> list[str]:
+    company = escape(entry.company, quote=False)
+    if entry.company_link is not None:
+        place = [f'    <a href="{escape(entry.company_link)}" target="_blank">', f"        {company}", "    </a>"]
+    else:
+        place = [company]
+    year = []
+    if entry.start_date or entry.end_date:
+        year = [
+            '        <span class="year">',
+            f"            ({escape(entry.start_date, quote=False)} - {escape(entry.end_date, quote=False)})",
+            "        </span>",
+        ]
+    return [
+        '<div class="item">',
+        '    <h3 class="title">',
+        f"        {escape(entry.role, quote=False)} -",
+        '        <span class="place">',
+        *("        " + line for line in place),
+        "        </span>",
+        *year,
+        "    </h3>",
+        "    <p>",
+        f"        {escape(entry.description, quote=False)}",
+        "        <br/>",
+        "        <strong>",
+        "            Environment -",
+        "        </strong>",
+        f"        {escape(', '.join(entry.environment), quote=False)}.",
+        "    </p>",
+        "</div>",
+    ]
+
+
+_SECTIONS = {
+    "project":    ("projects",   "projects",   render_project),
+    "experience": ("experience", "experience", render_experience),
+}
+
+_TAG_RE = re.compile(r"<([a-zA-Z][\w-]*)((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>")
+_ATTR_RE = re.compile(r"""([^\s=/]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?""")
+
+
+def _tags(markup: str) -> list[tuple[str, dict]]:
+    """The opening tags of `markup` as (name, attributes); hrefs are record fields and left out."""
+    tags = []
+    for name, rest in _TAG_RE.findall(markup):
+        attrs = {}
+        for key, *values in _ATTR_RE.findall(rest):
+            key = key.lower()
+            value = next((v for v in values if v), "")
+            if key != "href":
+                attrs[key] = " ".join(sorted(value.split())) if key == "class" else value
+        tags.append((name.lower(), attrs))
+    return tags
+
+
+def _reproducible(card: str, rendered: str) -> bool:
+    """
+    Whether replacing `card` with `rendered` (its record through the
+    template) loses no markup: every tag of the card, with all its
+    attributes, must appear in the rendered card in the same order. Inline
+    links or emphasis, comments and extra ids, classes or rel attributes
+    all fail the check.
+    """
+    if "<!--" in card:
+        return False
+    tags = iter(_tags(rendered))
+    return all(tag in tags for tag in _tags(card))
+
+
+def render_changes(html: str, model: PortfolioModel) -> str | None:
+    """
+    Writes the model's created and updated records into the page it was
+    loaded from. Updated cards are replaced in place and new ones appended
+    to their section. Returns None when the page's cards do not line up
+    with the model, or an updated card holds markup the templates cannot
+    reproduce, in which case the edit must go through the page itself.
+    """
+    edits = []  # (start, end, text), applied back to front
+    for kind, (section_name, attr, render) in _SECTIONS.items():
+        positions = sorted(i for k, i in model.changed if k == kind)
+        if not positions:
+            continue
+        section = splice.find_section(html, section_name)
+        if section is None:
+            return None
+        content = splice.find_element(html, "div", "content", *section)
+        if content is None:
+            return None
+        items = splice.child_elements(html, "div", "item", content[1], content[2])
+        if items is None or len(items) != model._loaded[kind]:
+            return None
+
+        records = getattr(model, attr)
+        if items:
+            indent = splice.indent_at(html, items[-1][0])
+        else:
+            indent = splice.indent_at(html, content[0]) + "    "
+        appended = []
+        for i in positions:
+            lines = render(records[i])
+            if i < len(items):
+                start, end = items[i]
+                if not _reproducible(html[start:end], "\n".join(lines)):
+                    return None
+                item_indent = splice.indent_at(html, start)
+                edits.append((start, end, "\n".join([lines[0]] + [item_indent + line for line in lines[1:]])))
+            else:
+                appended.append("\n" + "\n".join(indent + line for line in lines))
+        if appended:
+            at = items[-1][1] if items else content[1]
+            edits.append((at, at, "".join(appended)))
+
+    for start, end, text in sorted(edits, reverse=True):
+        html = html[:start] + text + html[end:]
+    return html
@@ -0,0 +1,92 @@
+# File: update_content/replies.py
+"""
+Deterministic user-facing replies for successful tool calls, so a write
+does not need a second model round-trip just to say "done".
+"""
+
+_FIELD_LABELS = {
+    "description":  "description",
+    "link":         "link",
+    "technologies": "technology stack",
+    "start_date":   "start date",
+    "end_date":     "end date",
+    "environment":  "environment",
+    "company_link": "company link",
+}
+
+
+def commit_url(result: dict) -> str | None:
+    """
+    Picks the most useful link out of a tool result: the commit page if the
+    GitHub response is attached, else the file URL.
+    """
+    commit = result.get("commit")
+    if isinstance(commit, dict):
+        url = (commit.get("commit") or {}).get("html_url") or (commit.get("content") or {}).get("html_url")
+        if url:
+            return url
+    return result.get("commit_url")
+
+
+def _changed(fields: dict, keys: tuple) -> str:
+    labels = [_FIELD_LABELS[k] for k in _FIELD_LABELS if k in fields and k not in keys]
+    if not labels:
+        return ""
+    if len(labels) == 1:
+        return f" ({labels[0]})"
+    return f" ({', '.join(labels[:-1])} and {labels[-1]})"
+
+
+def _add_project(args: dict, result: dict) -> str:
+    title = args.get("project", {}).get("title", "your project")
+    return f"Added the project “{title}” to your Projects section."
+
+
+def _add_experience(args: dict, result: dict) -> str:
+    exp = args.get("experience", {})
+    return f"Added {exp.get('role', 'the role')} at {exp.get('company', 'the company')} to your Experience section."
+
+
+def _update_project(args: dict, result: dict) -> str:
+    # the result names the entry actually edited, which a fuzzy match may spell differently
+    project = args.get("project", {})
+    title = result.get("title") or project.get("title", "")
+    return f"Updated the project “{title}”{_changed(project, ('title',))}."
+
+
+def _update_experience(args: dict, result: dict) -> str:
+    exp = args.get("experience", {})
+    role = result.get("role") or exp.get("role") or "the role"
+    company = result.get("company") or exp.get("company") or "the company"
+    return f"Updated {role} at {company}{_changed(exp, ('role', 'company'))}."
+
+
+TEMPLATES = {
+    "add_project":       _add_project,
+    "add_experience":    _add_experience,
+    "update_project":    _update_project,
+    "update_experience": _update_experience,
+}
+
+
+def render_reply(calls: list[tuple[str, dict, object]]) -> str | None:
+    """
+    Renders one reply for a turn's (tool name, arguments, result) triples.
+    Returns None when any call failed or has no template, in which case the
+    caller should ask the model to write the reply instead.
+    """
+    if not calls:
+        return None
+    lines, urls = [], []
+    for name, args, result in calls:
+        template = TEMPLATES.get(name)
+        if template is None or not isinstance(result, dict) or result.get("status") != "success":
+            return None
+        lines.append(template(args, result))
+        url = commit_url(result)
+        if url and url not in urls:
+            urls.append(url)
+    reply = " ".join(lines)
+    if urls:
+        reply += " Commit: " + ", ".join(urls)
+    return reply
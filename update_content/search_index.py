@@ -0,0 +1,224 @@
+# File: update_content/search_index.py
+"""
+Fuzzy lookups over portfolio entries.
+
+Strings are compared by the Dice similarity of their character trigrams,
+which tolerates typos, missing words and reordering ("Portfolo AI" finds
+"Portfolio AI"). A TrigramIndex keeps inverted trigram postings, so a
+query only scores the entries it shares a trigram with; the best of those
+are re-scored by edit similarity, which is kinder to transposed letters in
+short words ("Alpah").
+
+  - KeyMatcher backs the update tools: when a title or (role, company) has
+    no exact match, the closest entry is used if it is a clear winner, and
+    otherwise the ValueError names the nearest candidates.
+  - PortfolioSearch ranks whole entries (title, role, company and the
+    technologies) for the read-only search_portfolio tool. One is built
+    per document SHA (for_document) and reused until the page changes,
+    when the document cache retires that SHA.
+"""
+import re
+import heapq
+import asyncio
+from functools import lru_cache
+from itertools import chain
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from . import doc_cache
+
+# A fuzzy match is accepted at this similarity, if it leads the runner-up by MATCH_MARGIN
+MATCH_THRESHOLD = 0.55
+MATCH_MARGIN    = 0.1
+
+# Field weights for search ranking; technologies are many and short
+_WEIGHTS = {"title": 1.0, "role": 1.0, "company": 1.0, "technology": 0.9}
+
+_SEARCH_CACHE_SIZE = 4
+
+# Candidates per query re-scored by edit similarity, if their trigram score reaches the floor
+_RESCORE       = 8
+_RESCORE_FLOOR = 0.3
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text.strip().lower())
+
+
+@lru_cache(maxsize=4096)
+def trigrams(text: str) -> frozenset[str]:
+    padded = f"  {_normalize(text)} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class TrigramIndex:
+    """
+    Similarity of a query against many short strings, each added under the
+    id of the entry it belongs to. An entry may own several strings, and a
+    string (a technology, say) may belong to many entries; each distinct
+    string is indexed and scored once.
+    """
+
+    def __init__(self):
+        self._slots: dict[str, int] = {}
+        self._postings: dict[str, list[int]] = defaultdict(list)
+        self._owners: list[list[int]] = []
+        self._sizes: list[int] = []
+        self._texts: list[str] = []
+
+    def add(self, text: str, id: int) -> None:
+        norm = _normalize(text)
+        slot = self._slots.get(norm)
+        if slot is None:
+            grams = trigrams(norm)
+            slot = self._slots[norm] = len(self._texts)
+            self._owners.append([])
+            self._sizes.append(len(grams))
+            self._texts.append(norm)
+            for gram in grams:
+                self._postings[gram].append(slot)
+        self._owners[slot].append(id)
+
+    def scores(self, query: str) -> dict[int, float]:
+        """
+        Similarity in [0, 1] of every entry with a string sharing a trigram
+        with `query`, as that of its best-matching string.
+        """
+        grams = trigrams(query)
+        shared = Counter(chain.from_iterable(self._postings.get(gram, ()) for gram in grams))
+        sizes, total = self._sizes, len(grams)
+        slots = {slot: 2 * count / (total + sizes[slot]) for slot, count in shared.items()}
+        norm = _normalize(query)
+        matcher = SequenceMatcher(b=norm, autojunk=False)
+        for slot in heapq.nlargest(_RESCORE, slots, key=slots.get):
+            if slots[slot] < _RESCORE_FLOOR:
+                break
+            text = self._texts[slot]
+            if norm and norm in text:
+                # a fragment of the text, e.g. "acme" for "acme corp"
+                slots[slot] = max(slots[slot], 0.9)
+                continue
+            matcher.set_seq1(text)
+            if matcher.real_quick_ratio() > slots[slot] and matcher.quick_ratio() > slots[slot]:
+                slots[slot] = max(slots[slot], matcher.ratio())
+        out: dict[int, float] = {}
+        owners = self._owners
+        for slot, score in slots.items():
+            for id in owners[slot]:
+                if score > out.get(id, 0.0):
+                    out[id] = score
+        return out
+
+
+def _ranked(scores: dict[int, float]) -> list[tuple[int, float]]:
+    return sorted(scores.items(), key=lambda pair: (-pair[1], pair[0]))
+
+
+def _pick(ranked: list[tuple[int, float]]) -> int | None:
+    if not ranked or ranked[0][1] < MATCH_THRESHOLD:
+        return None
+    if len(ranked) > 1 and ranked[0][1] - ranked[1][1] < MATCH_MARGIN:
+        return None
+    return ranked[0][0]
+
+
+class KeyMatcher:
+    """
+    Fuzzy lookup over entry keys: `projects` is [(title, entry)] and
+    `experience` is [(role, company, entry)], in document order.
+    """
+
+    def __init__(self, projects: list[tuple], experience: list[tuple]):
+        self._projects = projects
+        self._experience = experience
+        self._titles = TrigramIndex()
+        self._roles = TrigramIndex()
+        self._companies = TrigramIndex()
+        for i, (title, _) in enumerate(projects):
+            self._titles.add(title, i)
+        for i, (role, company, _) in enumerate(experience):
+            self._roles.add(role, i)
+            self._companies.add(company, i)
+
+    def project(self, title: str):
+        """The closest project entry to `title`, or ValueError with suggestions."""
+        ranked = _ranked(self._titles.scores(title))
+        found = _pick(ranked)
+        if found is not None:
+            return self._projects[found][1]
+        suggestions = [f"'{self._projects[i][0]}'" for i, _ in ranked[:3]]
+        raise ValueError(f"No project titled '{title}' found"
+                         + (f"; closest: {', '.join(suggestions)}" if suggestions else ""))
+
+    def experience(self, role: str | None, company: str | None):
+        """The closest experience entry to role and/or company, or ValueError with suggestions."""
+        parts = [index.scores(text) for index, text in ((self._roles, role), (self._companies, company)) if text]
+        combined = {id: sum(part.get(id, 0.0) for part in parts) / len(parts) for id in set().union(*parts)} if parts else {}
+        ranked = _ranked(combined)
+        found = _pick(ranked)
+        if found is not None:
+            return self._experience[found][2]
+        crit = f"role='{role}'" + (f", company='{company}'" if company else "")
+        suggestions = [f"'{self._experience[i][0]} at {self._experience[i][1]}'" for i, _ in ranked[:3]]
+        raise ValueError(f"No experience entry matching {crit} found"
+                         + (f"; closest: {', '.join(suggestions)}" if suggestions else ""))
+
+
+class PortfolioSearch:
+    """Ranked search over the records of a PortfolioModel."""
+
+    def __init__(self, model):
+        self._entries = [("project", record) for record in model.projects]
+        self._entries += [("experience", record) for record in model.experience]
+        self._fields = {field: TrigramIndex() for field in _WEIGHTS}
+        for i, (kind, record) in enumerate(self._entries):
+            if kind == "project":
+                self._fields["title"].add(record.title, i)
+                listed = record.technologies
+            else:
+                self._fields["role"].add(record.role, i)
+                self._fields["company"].add(record.company, i)
+                listed = record.environment
+            for item in listed:
+                self._fields["technology"].add(item, i)
+
+    def search(self, query: str, kind: str | None = None, limit: int = 5, min_score: float = 0.3) -> list[tuple[float, str, object]]:
+        """
+        The best `limit` entries for `query` as (score, kind, record), best
+        first. An entry scores as its best-matching field.
+        """
+        best: dict[int, float] = {}
+        for field, index in self._fields.items():
+            for id, score in index.scores(query).items():
+                score *= _WEIGHTS[field]
+                if score > best.get(id, 0.0):
+                    best[id] = score
+        candidates = [
+            (score, id) for id, score in best.items()
+            if score >= min_score and (not kind or self._entries[id][0] == kind)
+        ]
+        top = heapq.nsmallest(limit, candidates, key=lambda pair: (-pair[0], pair[1]))
+        return [(round(score, 3), *self._entries[id]) for score, id in top]
+
+
+# document SHA -> PortfolioSearch, most recent last
+_searches: dict[str, PortfolioSearch] = {}
+
+
+async def for_document(sha: str, build_model) -> PortfolioSearch:
+    """
+    The search index of the page at blob `sha`, built from `build_model()`
+    the first time that version is searched. The build runs in a worker
+    thread, so `build_model` must work on a document of its own; the cache
+    itself is only read and written on the event loop.
+    """
+    search = _searches.pop(sha, None)
+    if search is None:
+        search = await asyncio.to_thread(lambda: PortfolioSearch(build_model()))
+    _searches[sha] = search
+    while len(_searches) > _SEARCH_CACHE_SIZE:
+        _searches.pop(next(iter(_searches)))
+    return search
+
+
+# A commit or a pushed change retires the index of the old version
+doc_cache.subscribe(lambda path, old_sha: _searches.pop(old_sha, None))
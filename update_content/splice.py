@@ -0,0 +1,165 @@
+# File: update_content/splice.py
+"""
+Section-scoped editing of the portfolio page.
+
+Instead of parsing and re-prettifying all of index.html, an edit can locate
+the <section> elements it touches in the raw text, parse just those, and
+splice their re-serialized markup back into the original. Everything
+outside the edited sections stays exactly as it was, so commits only
+rewrite the lines that actually changed.
+"""
+import re
+from bisect import bisect_right
+
+_TAG_RES: dict[str, re.Pattern] = {}
+_WHITESPACE_RE = re.compile(r"\s+")
+_COMMENT_RE = re.compile(r"<!--.*?(?:-->|$)", re.DOTALL)
+_CLASS_RE = re.compile(r"""\bclass\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.IGNORECASE)
+
+
+def _class_of(open_tag: str) -> str:
+    match = _CLASS_RE.search(open_tag)
+    if not match:
+        return ""
+    return " ".join(next(g for g in match.groups() if g is not None).split())
+
+
+def _tag_re(tag: str) -> re.Pattern:
+    pattern = _TAG_RES.get(tag)
+    if pattern is None:
+        pattern = _TAG_RES[tag] = re.compile(rf"<(/?){tag}\b[^>]*>", re.IGNORECASE)
+    return pattern
+
+
+def _tags(html: str, tag: str, start: int, end: int):
+    """The <tag> and </tag> matches in html[start:end] that are not inside a comment."""
+    matches = _tag_re(tag).finditer(html, start, end)
+    if "<!--" not in html:
+        yield from matches
+        return
+    comments = [m.span() for m in _COMMENT_RE.finditer(html)]
+    starts = [c[0] for c in comments]
+    for match in matches:
+        i = bisect_right(starts, match.start()) - 1
+        if i < 0 or comments[i][1] <= match.start():
+            yield match
+
+
+def _class_matches(open_tag: str, cls: str) -> bool:
+    # bs4's class_ semantics: "a b" must be the whole attribute, "a" any one class
+    classes = _class_of(open_tag)
+    return classes == cls if " " in cls else cls in classes.split()
+
+
+def find_element(html: str, tag: str, cls: str, start: int = 0, end: int | None = None) -> tuple[int, int, int, int] | None:
+    """
+    Finds the first <tag> with class `cls` in html[start:end] and returns
+    (start, open_end, close_start, end) offsets: its whole span and the span
+    of its contents. None if it is missing or not properly closed.
+    """
+    end = len(html) if end is None else end
+    found = depth = None
+    for match in _tags(html, tag, start, end):
+        closing = match.group(1) == "/"
+        if found is None:
+            if not closing and _class_matches(match.group(0), cls):
+                found, depth = match, 1
+            continue
+        depth += -1 if closing else 1
+        if depth == 0:
+            return found.start(), found.end(), match.start(), match.end()
+    return None
+
+
+def child_elements(html: str, tag: str, cls: str, start: int, end: int) -> list[tuple[int, int]] | None:
+    """
+    Spans of the <tag class=cls> elements directly inside html[start:end]
+    (nested ones are skipped), or None if the tags there are unbalanced.
+    """
+    spans, depth, opened = [], 0, None
+    for match in _tags(html, tag, start, end):
+        if match.group(1) != "/":
+            depth += 1
+            if depth == 1:
+                opened = match if _class_matches(match.group(0), cls) else None
+            continue
+        depth -= 1
+        if depth < 0:
+            return None
+        if depth == 0 and opened is not None:
+            spans.append((opened.start(), match.end()))
+            opened = None
+    return spans if depth == 0 else None
+
+
+def find_section(html: str, name: str) -> tuple[int, int] | None:
+    """
+    Returns the (start, end) offsets of the first <section class="{name} section">
+    element in `html`, matching what soup.find("section", class_=...) selects,
+    or None if it is missing or not properly closed.
+    """
+    found = find_element(html, "section", f"{name} section")
+    return (found[0], found[3]) if found else None
+
+
+def locate(html: str, names: list[str]) -> list[tuple[int, int]] | None:
+    """
+    Returns the spans of the named sections in document order, or None when
+    any of them cannot be located or two of them overlap.
+    """
+    spans = []
+    for name in dict.fromkeys(names):
+        span = find_section(html, name)
+        if span is None:
+            return None
+        spans.append(span)
+    spans.sort()
+    for (_, end), (start, _) in zip(spans, spans[1:]):
+        if start < end:
+            return None
+    return spans
+
+
+def fragment(html: str, spans: list[tuple[int, int]]) -> str:
+    """The markup of the located sections, for parsing on its own."""
+    return "\n".join(html[start:end] for start, end in spans)
+
+
+def top_level_sections(soup) -> list:
+    """The outermost <section> elements of a parsed fragment, in order."""
+    return [tag for tag in soup.find_all("section") if tag.find_parent("section") is None]
+
+
+def indent_at(html: str, pos: int) -> str:
+    """The whitespace that precedes `pos` on its line ("" if there is text)."""
+    line_start = html.rfind("\n", 0, pos) + 1
+    prefix = html[line_start:pos]
+    return prefix if prefix.isspace() else ""
+
+
+def render(html: str, spans: list[tuple[int, int]], sections: list, formatter) -> str:
+    """
+    Splices the prettified `sections` into `html` in place of `spans`,
+    indented to sit where the originals started.
+    """
+    parts, pos = [], 0
+    for (start, end), tag in zip(spans, sections):
+        indent = indent_at(html, start)
+        lines = tag.prettify(formatter=formatter).rstrip("\n").split("\n")
+        parts.append(html[pos:start])
+        parts.append("\n".join([lines[0]] + [indent + line if line else line for line in lines[1:]]))
+        pos = end
+    parts.append(html[pos:])
+    return "".join(parts)
+
+
+def same_document(a: str, b: str, formatter) -> bool:
+    """
+    True when two pages parse to the same document. Both are prettified as
+    they parse back, with whitespace runs collapsed as a browser renders them.
+    """
+    from .html_parser import parse_html
+
+    def normalized(html: str) -> str:
+        return _WHITESPACE_RE.sub(" ", parse_html(html).prettify(formatter=formatter))
+    return normalized(a) == normalized(b)